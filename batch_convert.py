@@ -0,0 +1,285 @@
+"""
+batch_convert.py - STREAMED CSV → freee用Excel をコマンドラインで一括変換する（ブラウザ・Streamlit不要）
+
+使い方:
+    python batch_convert.py data/ --freee-csv freee_partners.csv --output-dir out/
+    python batch_convert.py "data/2025*/*.csv" --freee-csv freee_partners.csv --jobs 4
+    python batch_convert.py data/ --freee-csv freee_partners.csv --metrics report.json --profile run.prof
+
+終了コード:
+    0: すべてのファイルを変換した（行単位のエラーは標準エラー出力に表示）
+    1: 変換に失敗したファイルがある
+    2: 入力ファイルがない、またはマスタを読み込めない
+
+起動を速くするため、pandas・openpyxl や Reader / Processor / Exporter は
+変換を始める時点で読み込む（--help だけなら読み込まない）。
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from pathlib import Path
+
+# マスタのコンパイル済みスナップショットの保存先（Streamlit版と共有。標準ライブラリのみで軽量）
+from processor.master_cache import DEFAULT_CACHE_DIR
+
+
+# プロジェクトのルートディレクトリ
+PROJECT_ROOT = Path(__file__).parent
+
+
+def find_input_files(inputs: list[str]) -> list[Path]:
+    """入力指定（ファイル・ディレクトリ・globパターン）からSTREAMED CSVの一覧を作成する
+
+    ディレクトリの場合は直下の .csv ファイルを対象とする。
+
+    Args:
+        inputs: list[str] - 入力指定
+
+    Returns:
+        list[Path] - 重複を除いた入力ファイル（指定順、ディレクトリ・glob内は名前順）
+    """
+    files = []
+    seen = set()
+
+    for value in inputs:
+        path = Path(value)
+        if path.is_dir():
+            candidates = sorted(p for p in path.iterdir() if p.is_file() and p.suffix.lower() == '.csv')
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = sorted(Path(p) for p in glob.glob(value, recursive=True) if Path(p).is_file())
+
+        for candidate in candidates:
+            key = candidate.resolve()
+            if key not in seen:
+                seen.add(key)
+                files.append(candidate)
+
+    return files
+
+
+def convert_batch(input_files: list[Path], output_type: str, output_dir: str, master_paths: tuple,
+                  cache_dir=None, jobs: int = 1, metrics=None, on_result=None) -> list:
+    """STREAMED CSVを順番に、または並列に変換する
+
+    マスタは並列処理の場合も先にこのプロセスで1回だけ読み込む（読み込めなければ例外を送出し、
+    ファイルごとのエラーにはしない）。スナップショットもここで作成し、各ワーカーはそれを読み込む。
+
+    Args:
+        input_files: list[Path] - 入力ファイル
+        output_type: str - 出力形式（"test", "freee"）
+        output_dir: str - 出力ディレクトリ
+        master_paths: tuple - (dept_mapping_path, partner_list_path, freee_csv_path)
+        cache_dir: str - MasterCache の保存先（省略時はスナップショットを使わない）
+        jobs: int - 並列数（1 の場合は順番に処理）
+        metrics: RunMetrics - 計測結果の記録先（省略可）
+        on_result: Callable[[int, int, str, object], None] - 1ファイル完了ごとに
+            (完了数, 全体数, ファイル名, 結果) で呼ばれる（並列処理の場合、結果は None）
+
+    Returns:
+        list - input_files と同じ順序の (output_path, errors) または発生した Exception
+    """
+    from pipeline import convert_file, convert_files_parallel, STREAMING_THRESHOLD_BYTES
+
+    streaming = [path.stat().st_size >= STREAMING_THRESHOLD_BYTES for path in input_files]
+
+    # マスタを読み込んで検証し、スナップショットを作成（ワーカーが同時にコンパイルしないように）
+    dept_normalizer, partner_resolver = load_masters(master_paths, cache_dir, metrics)
+
+    if jobs > 1 and len(input_files) > 1:
+        jobs_list = [(str(path), path.name, is_streaming) for path, is_streaming in zip(input_files, streaming)]
+
+        def on_progress(completed, total, name):
+            if on_result:
+                on_result(completed, total, name, None)
+
+        return convert_files_parallel(
+            jobs_list,
+            "streamed",
+            output_type,
+            output_dir,
+            master_paths=master_paths,
+            cache_dir=str(cache_dir) if cache_dir else None,
+            max_workers=min(jobs, len(input_files)),
+            on_progress=on_progress,
+            metrics=metrics
+        )
+
+    results = []
+    for idx, (path, is_streaming) in enumerate(zip(input_files, streaming), start=1):
+        try:
+            result = convert_file(
+                str(path),
+                path.name,
+                "streamed",
+                output_type,
+                output_dir,
+                dept_normalizer=dept_normalizer,
+                partner_resolver=partner_resolver,
+                streaming=is_streaming,
+                metrics=metrics
+            )
+        except Exception as e:
+            result = e
+
+        results.append(result)
+        if on_result:
+            on_result(idx, len(input_files), str(path), result)
+
+    return results
+
+
+def load_masters(master_paths: tuple, cache_dir=None, metrics=None):
+    """部門・取引先マスタを読み込む
+
+    Args:
+        master_paths: tuple - (dept_mapping_path, partner_list_path, freee_csv_path)
+        cache_dir: str - MasterCache の保存先（省略時はスナップショットを使わない）
+        metrics: RunMetrics - 計測結果の記録先（省略可）
+
+    Returns:
+        tuple: (DeptNormalizer, PartnerResolver)
+    """
+    from contextlib import nullcontext
+
+    from processor.dept_normalizer import DeptNormalizer
+    from processor.partner_resolver import PartnerResolver
+    from processor.master_cache import MasterCache
+    from processor.fuzzy_cache import FuzzyMatchCache
+
+    dept_mapping_path, partner_list_path, freee_csv_path = master_paths
+    master_cache = MasterCache(cache_dir) if cache_dir else None
+    fuzzy_cache = FuzzyMatchCache.in_dir(cache_dir) if cache_dir else None
+
+    with metrics.stage('masters') if metrics else nullcontext():
+        dept_normalizer = DeptNormalizer(str(dept_mapping_path), master_cache=master_cache)
+        partner_resolver = PartnerResolver(
+            str(partner_list_path), str(freee_csv_path), master_cache=master_cache, fuzzy_cache=fuzzy_cache
+        )
+
+    return dept_normalizer, partner_resolver
+
+
+def main(argv=None) -> int:
+    """コマンドラインから一括変換する
+
+    Returns:
+        int - 終了コード（0: 正常, 1: 失敗したファイルあり, 2: 入力・マスタのエラー）
+    """
+    parser = argparse.ArgumentParser(description="STREAMED CSV → freee用Excel の一括変換")
+    parser.add_argument("inputs", nargs="+", help="STREAMED CSV・ディレクトリ・globパターン（例: \"data/*.csv\"）")
+    parser.add_argument("--freee-csv", required=True, help="freee取引先CSV")
+    parser.add_argument("--dept-mapping", default=str(PROJECT_ROOT / "config" / "dept_mapping.xlsx"),
+                        help="部署マッピングExcel（省略時は config/dept_mapping.xlsx）")
+    parser.add_argument("--partner-list", default=str(PROJECT_ROOT / "config" / "partner_list.xlsx"),
+                        help="取引先一覧Excel（省略時は config/partner_list.xlsx）")
+    parser.add_argument("--output-dir", default=".", help="出力先ディレクトリ")
+    parser.add_argument("--output-type", choices=["freee", "test"], default="freee", help="出力形式")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="並列数（2以上で複数ファイルを別プロセスで処理。0 でCPU数）")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR),
+                        help="マスタのスナップショットの保存先（空文字で使用しない）")
+    parser.add_argument("--metrics", metavar="JSON_PATH", help="段階ごとの計測結果（JSON）の出力先")
+    parser.add_argument("--trace-memory", action="store_true", help="段階ごとのメモリ使用量も計測する（遅くなる）")
+    parser.add_argument("--profile", metavar="PROF_PATH",
+                        help="cProfile + tracemalloc の詳細プロファイルを保存する（並列処理は無効になる）")
+    parser.add_argument("--quiet", action="store_true", help="ファイルごとの結果を表示しない")
+    args = parser.parse_args(argv)
+
+    input_files = find_input_files(args.inputs)
+    if not input_files:
+        print("入力ファイルが見つかりません", file=sys.stderr)
+        return 2
+
+    master_paths = (args.dept_mapping, args.partner_list, args.freee_csv)
+    for master_path in master_paths:
+        if not Path(master_path).is_file():
+            print(f"マスタファイルが見つかりません: {master_path}", file=sys.stderr)
+            return 2
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if args.profile:
+        # cProfile は別プロセスを計測できないため順番に処理する
+        jobs = 1
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # ここから重いモジュールを読み込む
+    from run_metrics import RunMetrics
+
+    metrics = RunMetrics(trace_memory=args.trace_memory)
+    profiler = None
+    if args.profile:
+        from run_profiler import RunProfiler
+        profiler = RunProfiler()
+
+    def on_result(completed, total, name, result):
+        if args.quiet:
+            return
+        if isinstance(result, Exception):
+            print(f"[{completed}/{total}] NG {name}: {str(result)}", flush=True)
+        elif result is not None:
+            print(f"[{completed}/{total}] OK {name} → {result[0]}", flush=True)
+        else:
+            print(f"[{completed}/{total}] 完了 {name}", flush=True)
+
+    start = time.perf_counter()
+    metrics.start()
+    if profiler:
+        profiler.start()
+
+    try:
+        results = convert_batch(
+            input_files,
+            args.output_type,
+            str(output_dir),
+            master_paths,
+            cache_dir=args.cache_dir or None,
+            jobs=jobs,
+            metrics=metrics,
+            on_result=on_result
+        )
+    except Exception as e:
+        print(f"変換処理エラー: {str(e)}", file=sys.stderr)
+        return 2
+    finally:
+        if profiler:
+            profiler.stop()
+        metrics.finish()
+
+    # 結果の集計（行単位のエラーは標準エラー出力へ）
+    failed = 0
+    row_errors = 0
+    for path, result in zip(input_files, results):
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"{path.name}: {str(result)}", file=sys.stderr)
+            continue
+
+        _output_path, errors = result
+        row_errors += len(errors)
+        for error in errors:
+            print(f"{path.name}: {error}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(input_files) - failed}/{len(input_files)}ファイルを変換しました"
+          f"（失敗 {failed}件、行エラー {row_errors}件、{elapsed:.1f}秒）")
+
+    if args.metrics:
+        Path(args.metrics).write_text(metrics.to_json(), encoding='utf-8')
+        print(f"計測結果を保存しました: {args.metrics}")
+
+    if profiler:
+        profiler.save(args.profile)
+        print(f"プロファイルを保存しました: {args.profile}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+benchmark/generators.py - ベンチマーク用の合成データ（STREAMED CSV・マスタファイル）を生成する
+"""
+
+import random
+from pathlib import Path
+
+import pandas as pd
+
+from processor.config import DEPT_CODES
+
+
+# 行数のプリセット
+SIZES = {
+    '1k': 1_000,
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+# 取引先名の部品
+KANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン"
+CORE_WORDS = [
+    '山田', '田中', '中村', '東京', '大阪', '関西', '日本', '丸の内', '北浜', '泉佐野',
+    '難波', '堺', '三国', '岸和田', '梅田', '心斎橋', '淀屋橋', '住之江', '天王寺', '桜川',
+]
+BUSINESS_WORDS = [
+    '商事', '物産', '電機', '運輸', '食品', '建設', 'サービス', 'システム', '不動産', '印刷',
+    'リネン', 'クリーニング', '設備', '酒販', '青果', '水産', '警備', '広告', '観光', '交通',
+]
+LEGAL_FORMS = ['株式会社', '有限会社', '合同会社']
+
+# 部門名の表記ゆれ（正式名称 → 表記ゆれ）
+DEPT_VARIANTS = {
+    '本部': ['本社', 'ホンブ', '本部 '],
+    '泉佐野センターホテル': ['泉佐野', '泉佐野センター', '泉佐野ｾﾝﾀｰﾎﾃﾙ', '泉佐野 センターホテル'],
+    'リコホテル三国': ['三国', 'リコ三国', 'ﾘｺﾎﾃﾙ三国', 'リコホテル 三国'],
+    'OKINIホテル(本館)': ['OKINI本館', 'ＯＫＩＮＩホテル（本館）', 'OKINIホテル（本館）', 'オキニ本館'],
+    'OKINI別館': ['OKINI 別館', 'ＯＫＩＮＩ別館', 'オキニ別館'],
+}
+
+# STREAMED CSVの勘定科目・税区分・摘要
+ACCOUNTS = ['旅費交通費', '消耗品費', '通信費', '水道光熱費', '修繕費', '支払手数料', '会議費', '広告宣伝費']
+TAX_CLASSES = ['課税仕入10%', '課税仕入8%（軽）', '対象外', '非課税仕入']
+DESCRIPTIONS = ['交通費', '備品購入', '電話代', '電気代', '修理代', '振込手数料', '打合せ', 'チラシ印刷']
+
+# 形式エラーにする値
+BAD_DATES = ['2025/13/01', '2025/02/30', '20251301', 'abc', '']
+BAD_AMOUNTS = ['', 'x1000', '1,000円', '-']
+
+
+def make_partner_names(count: int, seed: int = 0) -> list[str]:
+    """重複しない取引先名を生成する
+
+    Args:
+        count: int - 取引先数
+        seed: int - 乱数シード
+
+    Returns:
+        list[str] - 取引先名リスト
+    """
+    rng = random.Random(seed)
+    names = []
+    seen = set()
+
+    while len(names) < count:
+        name = rng.choice(CORE_WORDS) + rng.choice(BUSINESS_WORDS)
+
+        # 数が多い場合はカナを付けて重複を避ける
+        if len(seen) >= len(CORE_WORDS) * len(BUSINESS_WORDS) // 2 or rng.random() < 0.5:
+            name += ''.join(rng.choice(KANA) for _ in range(rng.randint(1, 4)))
+
+        form = rng.random()
+        if form < 0.4:
+            name = rng.choice(LEGAL_FORMS) + name
+        elif form < 0.7:
+            name = name + rng.choice(LEGAL_FORMS)
+
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+
+    return names
+
+
+def partner_variant(name: str, rng: random.Random) -> str:
+    """取引先名の表記ゆれを作る
+
+    Args:
+        name: str - 元の取引先名
+        rng: random.Random - 乱数生成器
+
+    Returns:
+        str - 表記ゆれのある取引先名
+    """
+    kind = rng.randrange(5)
+
+    if kind == 0:
+        # 法人格の略記
+        for form, short in (('株式会社', '(株)'), ('有限会社', '(有)'), ('合同会社', '(同)')):
+            if form in name:
+                return name.replace(form, short)
+        return '(株)' + name
+    if kind == 1:
+        # 法人格の前後にスペース
+        for form in LEGAL_FORMS:
+            if name.startswith(form):
+                return form + rng.choice([' ', '　']) + name[len(form):]
+            if name.endswith(form):
+                return name[:-len(form)] + rng.choice([' ', '　']) + form
+        return name + ' '
+    if kind == 2 and len(name) > 3:
+        # 1文字欠落
+        idx = rng.randrange(len(name))
+        return name[:idx] + name[idx + 1:]
+    if kind == 3:
+        # 1文字置換
+        idx = rng.randrange(len(name))
+        return name[:idx] + rng.choice(KANA) + name[idx + 1:]
+
+    # 末尾に支店名
+    return name + rng.choice(['本店', '大阪支店', '関西営業所'])
+
+
+def generate_freee_partner_csv(output_path, partner_names: list[str], encoding: str = 'cp932') -> str:
+    """freee取引先CSVを生成する（A列: 取引先名, Q列: ステータス）
+
+    Args:
+        output_path: str - 出力先
+        partner_names: list[str] - 取引先名リスト
+        encoding: str - 文字コード
+
+    Returns:
+        str - 出力ファイルパス
+    """
+    row_count = len(partner_names)
+    columns = {'取引先名': partner_names}
+    for col_idx in range(1, 20):
+        columns[f'項目{col_idx}'] = [''] * row_count
+
+    # Q列（0から16=Q）: 17件に1件は「使用しない」
+    columns['項目16'] = ['使用しない' if idx % 17 == 0 else '使用' for idx in range(row_count)]
+
+    pd.DataFrame(columns).to_csv(output_path, index=False, encoding=encoding)
+
+    return str(output_path)
+
+
+def generate_partner_list_xlsx(output_path, partner_names: list[str], count: int = 200, seed: int = 0) -> str:
+    """partner_list.xlsx を生成する（A: 元の名称, B: 正式名称）
+
+    Args:
+        output_path: str - 出力先
+        partner_names: list[str] - 取引先名リスト（先頭 count 件を使用）
+        count: int - 登録件数
+        seed: int - 乱数シード
+
+    Returns:
+        str - 出力ファイルパス
+    """
+    rng = random.Random(seed)
+    formals = partner_names[:count]
+    originals = [partner_variant(name, rng) for name in formals]
+
+    pd.DataFrame({'元の名称': originals, '正式名称': formals}).to_excel(output_path, index=False)
+
+    return str(output_path)
+
+
+def generate_dept_mapping_xlsx(output_path) -> str:
+    """dept_mapping.xlsx を生成する（A: 元の名称, B: 正式名称）
+
+    Args:
+        output_path: str - 出力先
+
+    Returns:
+        str - 出力ファイルパス
+    """
+    originals = []
+    formals = []
+    for formal in DEPT_CODES:
+        for original in [formal] + DEPT_VARIANTS.get(formal, []):
+            originals.append(original)
+            formals.append(formal)
+
+    pd.DataFrame({'元の名称': originals, '正式名称': formals}).to_excel(output_path, index=False)
+
+    return str(output_path)
+
+
+def generate_streamed_csv(output_path, row_count: int, partner_names: list[str], seed: int = 0,
+                          error_rate: float = 0.02, encoding: str = 'cp932') -> str:
+    """STREAMED形式のCSVを生成する
+
+    取引先は freee取引先と完全一致・表記ゆれ・未登録・空欄を混ぜ、
+    部門は表記ゆれ・空欄・未登録を混ぜる。
+    error_rate の割合で日付・金額を形式エラーにする。
+
+    Args:
+        output_path: str - 出力先
+        row_count: int - 行数
+        partner_names: list[str] - freee取引先名リスト
+        seed: int - 乱数シード
+        error_rate: float - 日付・金額を形式エラーにする割合
+        encoding: str - 文字コード
+
+    Returns:
+        str - 出力ファイルパス
+    """
+    rng = random.Random(seed)
+
+    # 取引先名の候補（表記ゆれ・未登録は事前に作って使い回す）
+    variants = [partner_variant(name, rng) for name in partner_names[:max(1, len(partner_names) // 4)]]
+    unknown = [name + '（新規）' for name in make_partner_names(max(1, len(partner_names) // 20), seed + 1)]
+
+    def partner():
+        r = rng.random()
+        if r < 0.55:
+            return rng.choice(partner_names)
+        if r < 0.80:
+            return rng.choice(variants)
+        if r < 0.90:
+            return rng.choice(unknown)
+        return ''
+
+    dept_choices = [dept for formal in DEPT_CODES for dept in [formal] + DEPT_VARIANTS.get(formal, [])]
+
+    # ファイル全体で1部門（空欄も混ぜる）
+    file_dept = rng.choice(dept_choices)
+
+    def dept():
+        r = rng.random()
+        if r < 0.80:
+            return file_dept
+        if r < 0.80 + error_rate:
+            return '未登録部門'
+        return ''
+
+    def date():
+        if rng.random() < error_rate:
+            return rng.choice(BAD_DATES)
+        month = rng.randint(1, 12)
+        day = rng.randint(1, 28)
+        if rng.random() < 0.5:
+            return f"2025/{month}/{day}"
+        return f"2025{month:02d}{day:02d}"
+
+    def amount():
+        if rng.random() < error_rate:
+            return rng.choice(BAD_AMOUNTS)
+        return str(rng.randrange(100, 500000, 10))
+
+    rows = []
+    for idx in range(row_count):
+        borrow_amount = amount()
+        rows.append({
+            '日付': date(),
+            '伝票番号': str(idx % 1000),
+            '借方勘定科目': rng.choice(ACCOUNTS),
+            '借方補助科目': partner(),
+            '借方部門': dept(),
+            '借方金額': borrow_amount,
+            '借方税区分': rng.choice(TAX_CLASSES),
+            '貸方勘定科目': '現金',
+            '貸方補助科目': partner(),
+            '貸方部門': dept(),
+            '貸方金額': borrow_amount,
+            '貸方税区分': '',
+            '摘要': rng.choice(DESCRIPTIONS),
+        })
+
+    pd.DataFrame(rows).to_csv(output_path, index=False, encoding=encoding)
+
+    return str(output_path)
+
+
+def generate_dataset(output_dir, streamed_rows: int, freee_partners: int = 3000, seed: int = 0) -> dict:
+    """ベンチマーク用のデータ一式を生成する（同じ条件のファイルがあれば再利用）
+
+    Args:
+        output_dir: str - 出力先ディレクトリ
+        streamed_rows: int - STREAMED CSVの行数
+        freee_partners: int - freee取引先CSVの行数
+        seed: int - 乱数シード
+
+    Returns:
+        dict - {'streamed_csv', 'freee_csv', 'partner_list', 'dept_mapping'} → ファイルパス
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = {
+        'streamed_csv': output_dir / f"streamed_{streamed_rows}_p{freee_partners}_s{seed}.csv",
+        'freee_csv': output_dir / f"freee_partners_{freee_partners}_s{seed}.csv",
+        'partner_list': output_dir / f"partner_list_{freee_partners}_s{seed}.xlsx",
+        'dept_mapping': output_dir / "dept_mapping.xlsx",
+    }
+
+    if all(path.exists() for path in paths.values()):
+        return {key: str(path) for key, path in paths.items()}
+
+    partner_names = make_partner_names(freee_partners, seed)
+
+    generate_freee_partner_csv(paths['freee_csv'], partner_names)
+    generate_partner_list_xlsx(paths['partner_list'], partner_names, seed=seed)
+    generate_dept_mapping_xlsx(paths['dept_mapping'])
+    generate_streamed_csv(paths['streamed_csv'], streamed_rows, partner_names, seed=seed)
+
+    return {key: str(path) for key, path in paths.items()}
@@ -0,0 +1,425 @@
+"""
+benchmark/load_test.py - Streamlitアプリを複数セッション同時に動かし、応答時間・メモリ増加・セッション間の干渉を調べる
+
+ブラウザ・ネットワークは使わず、Streamlit の AppTest でセッションを再現する。
+各セッションは合成データ（STREAMED CSV・freee取引先CSV・設定ファイル）をアップロードし、
+STREAMED → freee で実行する。
+
+使い方:
+    python -m benchmark.load_test --sessions 8
+    python -m benchmark.load_test --sessions 16 --rows 10k --files 3 --output load.json
+"""
+
+import argparse
+import gc
+import hashlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import streamlit as st
+from openpyxl import load_workbook
+from streamlit.testing.v1 import AppTest
+
+from benchmark.generators import SIZES, generate_dataset, generate_streamed_csv, make_partner_names
+
+
+# 結果ファイルの形式バージョン
+RESULT_VERSION = 1
+
+# 既定の保存先
+APP_PATH = Path(__file__).parent.parent / "streamlit_app.py"
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "streamlit_converter" / "load_test_data"
+
+# アップロードするファイルを各セッションに渡す session_state のキー
+UPLOADS_STATE_KEY = "_load_test_uploads"
+
+# ダウンロードボタンの内容を記録する session_state のキー
+DOWNLOADS_STATE_KEY = "_load_test_downloads"
+
+# 実行ボタンのラベル（freee用で実行）
+EXECUTE_BUTTON_LABEL = "🚀 freee用で実行"
+
+# 同時実行中に常駐メモリ（RSS）を調べる間隔（秒）
+RSS_SAMPLE_INTERVAL = 0.05
+
+_real_file_uploader = st.file_uploader
+_real_download_button = st.download_button
+
+
+class FakeUploadedFile:
+    """st.file_uploader が返す UploadedFile の代わり（name / size / getvalue() のみ）"""
+
+    def __init__(self, path):
+        path = Path(path)
+        self.name = path.name
+        self._data = path.read_bytes()
+        self.size = len(self._data)
+
+    def getvalue(self) -> bytes:
+        return self._data
+
+
+def _fake_file_uploader(label, type=None, accept_multiple_files=False, key=None, **kwargs):
+    """AppTest はファイルのアップロードを操作できないため、session_state に用意したファイルを返す
+
+    - 複数ファイル: STREAMED CSV
+    - key が dept_mapping / partner_list: 設定ファイル
+    - それ以外: freee取引先CSV
+    """
+    uploads = st.session_state.get(UPLOADS_STATE_KEY)
+    if uploads is None:
+        return _real_file_uploader(label, type=type, accept_multiple_files=accept_multiple_files, key=key, **kwargs)
+
+    if accept_multiple_files:
+        return uploads['streamed']
+    if key in ('dept_mapping', 'partner_list'):
+        return uploads.get(key)
+    return uploads['freee']
+
+
+def _recording_download_button(label, data, file_name=None, *args, **kwargs):
+    """ダウンロードボタンのラベル・ファイル名・内容をセッションごとに記録してから表示する
+
+    AppTest では出力ファイルの内容を取り出せないため、結果の比較用に記録する
+    （関数を渡す遅延生成の内容は、比較する時点で呼び出す）。
+    """
+    downloads = st.session_state.get(DOWNLOADS_STATE_KEY)
+    if downloads is not None:
+        downloads.append((label, file_name, data))
+    return _real_download_button(label, data, file_name, *args, **kwargs)
+
+
+def prepare_uploads(data_dir, session_count: int, rows: int, files: int, freee_partners: int) -> list[dict]:
+    """セッションごとのアップロードファイルを用意する
+
+    セッション間の取り違えを検出できるよう、セッションごとに乱数シードを変えた別のデータにする。
+
+    Args:
+        data_dir: str - 生成データの保存先
+        session_count: int - セッション数
+        rows: int - STREAMED CSV 1ファイルあたりの行数
+        files: int - 1セッションあたりの STREAMED CSV の数
+        freee_partners: int - freee取引先CSVの行数
+
+    Returns:
+        list[dict] - セッションごとの {'streamed', 'freee', 'dept_mapping', 'partner_list'}
+    """
+    data_dir = Path(data_dir)
+    uploads = []
+
+    for seed in range(session_count):
+        dataset = generate_dataset(data_dir, rows, freee_partners, seed)
+
+        streamed_paths = [dataset['streamed_csv']]
+        partner_names = None
+        for file_idx in range(1, files):
+            path = data_dir / f"streamed_{rows}_p{freee_partners}_s{seed}_{file_idx}.csv"
+            if not path.exists():
+                if partner_names is None:
+                    partner_names = make_partner_names(freee_partners, seed)
+                generate_streamed_csv(path, rows, partner_names, seed=seed * 1000 + file_idx)
+            streamed_paths.append(path)
+
+        uploads.append({
+            'streamed': [FakeUploadedFile(path) for path in streamed_paths],
+            'freee': FakeUploadedFile(dataset['freee_csv']),
+            'dept_mapping': FakeUploadedFile(dataset['dept_mapping']),
+            'partner_list': FakeUploadedFile(dataset['partner_list']),
+        })
+
+    return uploads
+
+
+def run_session(uploads: dict, timeout: float, barrier=None) -> dict:
+    """1セッション分の操作（形式の選択 → 実行）を行う
+
+    Args:
+        uploads: dict - prepare_uploads() が返す1セッション分のファイル
+        timeout: float - 1回の実行のタイムアウト（秒）
+        barrier: threading.Barrier - 実行ボタンを同時に押すための待ち合わせ（任意）
+
+    Returns:
+        dict - {'seconds', 'fingerprint', 'session_id', 'exceptions'}
+    """
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    at.session_state[UPLOADS_STATE_KEY] = uploads
+    at.run()
+
+    _find(at.radio, "📥 インプット形式").set_value("streamed")
+    _find(at.radio, "📤 アウトプット形式").set_value("freee")
+    at.run()
+
+    button = _find(at.button, EXECUTE_BUTTON_LABEL)
+    at.session_state[DOWNLOADS_STATE_KEY] = []
+    if barrier is not None:
+        barrier.wait()
+
+    start = time.perf_counter()
+    button.click().run()
+    seconds = time.perf_counter() - start
+
+    workspace = at.session_state["workspace"] if "workspace" in at.session_state else None
+
+    return {
+        'seconds': seconds,
+        'fingerprint': _fingerprint(at, at.session_state[DOWNLOADS_STATE_KEY]),
+        'session_id': workspace.session_id if workspace else None,
+        'exceptions': [str(exception.value) for exception in at.exception],
+    }
+
+
+def run_load_test(uploads: list[dict], timeout: float = 600) -> dict:
+    """全セッションを1つずつ実行した結果を基準として、全セッションを同時に実行する
+
+    同時実行時の結果（画面の件数・出力ファイル名・エラー一覧、ダウンロードボタン、出力ファイルの内容）が
+    1つずつ実行した場合と異なるセッションを、セッション間の干渉として報告する。
+    常駐メモリ（RSS）は同時実行中に RSS_SAMPLE_INTERVAL 秒ごとに調べ、その最大値をピークとする。
+
+    Args:
+        uploads: list[dict] - セッションごとのファイル
+        timeout: float - 1回の実行のタイムアウト（秒）
+
+    Returns:
+        dict - {'latency', 'rss', 'interference', 'sessions'}
+    """
+    with mock.patch.object(st, 'file_uploader', _fake_file_uploader), \
+            mock.patch.object(st, 'download_button', _recording_download_button):
+        # 1つずつ実行（基準）。マスタの読み込みもここで済ませておく
+        solo = [run_session(session_uploads, timeout) for session_uploads in uploads]
+
+        gc.collect()
+        rss_before = current_rss_bytes()
+
+        # 同時に実行
+        barrier = threading.Barrier(len(uploads))
+        with RssSampler() as rss_sampler, ThreadPoolExecutor(max_workers=len(uploads)) as executor:
+            futures = [
+                executor.submit(run_session, session_uploads, timeout, barrier)
+                for session_uploads in uploads
+            ]
+            concurrent = [future.result() for future in futures]
+
+        gc.collect()
+        rss_after = current_rss_bytes()
+
+    interference = []
+    for idx, (expected, actual) in enumerate(zip(solo, concurrent)):
+        if actual['exceptions']:
+            interference.append(f"セッション{idx}: 例外 {actual['exceptions']}")
+        if actual['fingerprint'] != expected['fingerprint']:
+            interference.append(f"セッション{idx}: 1つずつ実行した場合と結果が異なります")
+
+    session_ids = [result['session_id'] for result in concurrent]
+    if len(set(session_ids)) != len(session_ids):
+        interference.append(f"作業ディレクトリが重複しています: {session_ids}")
+
+    latencies = [result['seconds'] for result in concurrent]
+
+    return {
+        'latency': {
+            'solo_p50': percentile([result['seconds'] for result in solo], 50),
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99),
+            'max': max(latencies),
+        },
+        'rss': {
+            'before_bytes': rss_before,
+            'concurrent_peak_bytes': rss_sampler.peak_bytes,
+            'after_bytes': rss_after,
+            'growth_bytes': rss_after - rss_before,
+            'max_rss_bytes': max_rss_bytes(),
+        },
+        'interference': interference,
+        'sessions': [
+            {'seconds': round(result['seconds'], 6), 'session_id': result['session_id']}
+            for result in concurrent
+        ],
+    }
+
+
+class RssSampler:
+    """別スレッドで常駐メモリ（RSS）を一定間隔で調べ、最大値を記録する（with の間だけ）"""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak_bytes = current_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """パーセンタイル（最近傍順位法）"""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return round(ordered[int(rank) - 1], 6)
+
+
+def current_rss_bytes() -> int:
+    """現在のプロセスの常駐メモリ（RSS）。/proc がない環境ではピーク値を返す"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return max_rss_bytes()
+
+
+def max_rss_bytes() -> int:
+    """プロセス開始からのピーク常駐メモリ（Linux は KB、macOS はバイト単位で返る）"""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def main(argv=None) -> int:
+    """負荷テストを実行する
+
+    Returns:
+        int - 終了コード（0: 正常, 1: セッション間の干渉・例外あり）
+    """
+    parser = argparse.ArgumentParser(description="Streamlitアプリの同時セッション負荷テスト")
+    parser.add_argument("--sessions", type=int, default=4, help="同時に実行するセッション数")
+    parser.add_argument("--rows", choices=SIZES.keys(), default="1k", help="STREAMED CSV 1ファイルあたりの行数")
+    parser.add_argument("--files", type=int, default=2, help="1セッションあたりの STREAMED CSV の数")
+    parser.add_argument("--freee-size", choices=SIZES.keys(), default="1k", help="freee取引先CSVの行数")
+    parser.add_argument("--timeout", type=float, default=600, help="1回の実行のタイムアウト（秒）")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="生成データの保存先")
+    parser.add_argument("--output", help="結果JSONの出力先（省略時は標準出力のみ）")
+    args = parser.parse_args(argv)
+
+    params = {
+        'sessions': args.sessions,
+        'streamed_rows': SIZES[args.rows],
+        'files': args.files,
+        'freee_partners': SIZES[args.freee_size],
+    }
+
+    print(f"データ生成中... ({args.sessions}セッション × STREAMED {params['streamed_rows']}行 × {args.files}ファイル)")
+    uploads = prepare_uploads(args.data_dir, args.sessions, params['streamed_rows'], args.files,
+                              params['freee_partners'])
+
+    print("実行中...")
+    report = run_load_test(uploads, args.timeout)
+
+    latency = report['latency']
+    rss = report['rss']
+    print(f"  応答時間（1セッションのみ）p50 {latency['solo_p50']:.2f}秒")
+    print(f"  応答時間（同時{args.sessions}セッション）p50 {latency['p50']:.2f}秒 / "
+          f"p90 {latency['p90']:.2f}秒 / p99 {latency['p99']:.2f}秒 / 最大 {latency['max']:.2f}秒")
+    print(f"  RSS: 開始時 {rss['before_bytes'] / 1024 / 1024:.1f}MB → 終了時 {rss['after_bytes'] / 1024 / 1024:.1f}MB"
+          f"（増加 {rss['growth_bytes'] / 1024 / 1024:+.1f}MB、同時実行中のピーク {rss['concurrent_peak_bytes'] / 1024 / 1024:.1f}MB、"
+          f"プロセス開始からの最大 {rss['max_rss_bytes'] / 1024 / 1024:.1f}MB）")
+
+    if args.output:
+        result = {
+            'version': RESULT_VERSION,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'machine': platform.machine(),
+            },
+            'params': params,
+            **report,
+        }
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"結果を保存しました: {args.output}")
+
+    if report['interference']:
+        print("セッション間の干渉が見つかりました:")
+        for message in report['interference']:
+            print(f"  {message}")
+        return 1
+
+    print("セッション間の干渉: なし")
+    return 0
+
+
+def _find(elements, label: str):
+    """ラベルでウィジェットを探す"""
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"ウィジェットが見つかりません: {label}")
+
+
+def _fingerprint(at: AppTest, downloads: list) -> tuple:
+    """処理結果のうち、実行ごとに変わらない部分
+
+    画面の件数・出力ファイル名・エラー一覧と、ダウンロードボタンごとのラベル・ファイル名・内容のハッシュ
+    （出力ファイル・ZIPのみ）。
+
+    Args:
+        at: AppTest - 実行後のセッション
+        downloads: list[tuple] - _recording_download_button が記録した (ラベル, ファイル名, 内容)
+    """
+    download_digests = []
+    for label, file_name, data in downloads:
+        digest = _content_digest(file_name, data() if callable(data) else data)
+        # 内容を比較しないもの（計測レポートなど）はファイル名にも日時が入るため、ラベルだけ比較する
+        download_digests.append((label, file_name, digest) if digest is not None else (label,))
+
+    return (
+        tuple(element.value for element in at.success),
+        tuple(element.value for element in at.warning),
+        tuple(element.value for element in at.text),
+        tuple(download_digests),
+    )
+
+
+def _content_digest(file_name: str, data):
+    """出力ファイルの内容のハッシュ
+
+    xlsx は作成日時などが実行ごとに変わるため、全シートのセルの値から求める。
+    ZIPは格納したファイルごとのハッシュから求める。
+    それ以外（計測レポートなど、実行ごとに内容が変わるもの）は None。
+    """
+    if hasattr(data, 'getvalue'):
+        data = data.getvalue()
+    suffix = Path(file_name or '').suffix.lower()
+
+    digest = hashlib.sha256()
+    if suffix == '.xlsx':
+        workbook = load_workbook(io.BytesIO(data), read_only=True)
+        for worksheet in workbook.worksheets:
+            digest.update(worksheet.title.encode())
+            for row in worksheet.iter_rows(values_only=True):
+                digest.update(repr(row).encode())
+        workbook.close()
+    elif suffix == '.zip':
+        with zipfile.ZipFile(io.BytesIO(data)) as zip_file:
+            for name in zip_file.namelist():
+                digest.update(f"{name}:{_content_digest(name, zip_file.read(name))}".encode())
+    else:
+        return None
+    return digest.hexdigest()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
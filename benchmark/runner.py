@@ -0,0 +1,289 @@
+"""
+benchmark/runner.py - 各処理段階（Reader / Processor / Exporter）と全体の処理時間を計測する
+
+使い方:
+    python -m benchmark.runner --size 10k
+    python -m benchmark.runner --size 10k --update-baseline
+    python -m benchmark.runner --size 100k --freee-size 10k --tolerance 0.3
+    python -m benchmark.runner --size 10k --profile result.prof --no-compare
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmark.generators import SIZES, generate_dataset
+from reader.rico_streamed_csvreader import RicoStreamedCSVReader
+from processor.dept_normalizer import DeptNormalizer
+from processor.partner_resolver import PartnerResolver
+from processor.voucher_formatter import VoucherFormatter
+from exporter.freee_exporter import FreeeExcelExporter
+from pipeline import convert_file
+from run_profiler import RunProfiler
+
+
+# 結果ファイルの形式バージョン
+RESULT_VERSION = 1
+
+# 既定の保存先
+BENCHMARK_DIR = Path(__file__).parent
+DEFAULT_BASELINE_PATH = BENCHMARK_DIR / "baseline.json"
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "streamlit_converter" / "benchmark_data"
+
+# 計測する段階（表示順）
+STAGES = [
+    'reader',
+    'dept_normalizer.load',
+    'dept_normalizer.normalize',
+    'partner_resolver.load',
+    'partner_resolver.resolve',
+    'voucher_formatter',
+    'freee_exporter',
+    'end_to_end',
+]
+
+
+def run_benchmark(dataset: dict, repeat: int = 3) -> dict:
+    """各段階の処理時間を計測する
+
+    段階ごとに repeat 回計測し、最小値を結果とする。
+    PartnerResolver は解決結果をインスタンス内に保持するため、毎回作り直す。
+
+    Args:
+        dataset: dict - generate_dataset() が返すファイルパス
+        repeat: int - 計測回数
+
+    Returns:
+        dict - 段階名 → {'seconds', 'runs', 'rows', 'rows_per_second'}
+    """
+    runs = {stage: [] for stage in STAGES}
+    row_count = 0
+
+    output_dir = Path(tempfile.mkdtemp(prefix="benchmark_output_"))
+    try:
+        for _ in range(repeat):
+            # 段階ごとの計測
+            (data_list, _errors), seconds = _timed(
+                lambda: RicoStreamedCSVReader(dataset['streamed_csv']).read_and_validate()
+            )
+            runs['reader'].append(seconds)
+            row_count = len(data_list)
+
+            dept_normalizer, seconds = _timed(lambda: DeptNormalizer(dataset['dept_mapping']))
+            runs['dept_normalizer.load'].append(seconds)
+
+            data_list, seconds = _timed(lambda: dept_normalizer.normalize(data_list))
+            runs['dept_normalizer.normalize'].append(seconds)
+
+            partner_resolver, seconds = _timed(
+                lambda: PartnerResolver(dataset['partner_list'], dataset['freee_csv'])
+            )
+            runs['partner_resolver.load'].append(seconds)
+
+            data_list, seconds = _timed(lambda: partner_resolver.resolve(data_list))
+            runs['partner_resolver.resolve'].append(seconds)
+
+            data_list, seconds = _timed(lambda: VoucherFormatter("STREAMED").format(data_list))
+            runs['voucher_formatter'].append(seconds)
+
+            _, seconds = _timed(
+                lambda: FreeeExcelExporter(output_dir=str(output_dir)).export(data_list, "benchmark.csv")
+            )
+            runs['freee_exporter'].append(seconds)
+
+            # 全体（マスタの読み込みを含む）
+            _, seconds = _timed(lambda: _convert_end_to_end(dataset, str(output_dir)))
+            runs['end_to_end'].append(seconds)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    stages = {}
+    for stage in STAGES:
+        best = min(runs[stage])
+        stages[stage] = {
+            'seconds': round(best, 6),
+            'runs': [round(seconds, 6) for seconds in runs[stage]],
+            'rows': row_count,
+            'rows_per_second': round(row_count / best, 1) if best > 0 else None,
+        }
+
+    return stages
+
+
+def compare_with_baseline(result: dict, baseline: dict, tolerance: float, min_delta: float = 0.05) -> list[str]:
+    """ベースラインと比較し、許容範囲を超えて遅くなった段階を返す
+
+    Args:
+        result: dict - 今回の結果
+        baseline: dict - ベースラインの結果
+        tolerance: float - 許容する増加率（0.2 = 20%）
+        min_delta: float - 許容する増加時間（秒）。短い段階の誤差を無視するため
+
+    Returns:
+        list[str] - 劣化した段階のメッセージ
+    """
+    regressions = []
+
+    for stage, current in result['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base:
+            continue
+
+        limit = base['seconds'] * (1 + tolerance)
+        if current['seconds'] > limit and current['seconds'] - base['seconds'] > min_delta:
+            regressions.append(
+                f"{stage}: {current['seconds']:.3f}秒（ベースライン {base['seconds']:.3f}秒、"
+                f"許容 {limit:.3f}秒）"
+            )
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    """ベンチマークを実行する
+
+    Returns:
+        int - 終了コード（0: 正常, 1: 劣化あり, 2: ベースラインがない・ベースラインと条件が異なる）
+    """
+    parser = argparse.ArgumentParser(description="STREAMED → freee 変換のベンチマーク")
+    parser.add_argument("--size", choices=SIZES.keys(), default="10k", help="STREAMED CSVの行数")
+    parser.add_argument("--freee-size", choices=SIZES.keys(), default="1k", help="freee取引先CSVの行数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数（最小値を採用）")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="生成データの保存先")
+    parser.add_argument("--output", help="結果JSONの出力先（省略時は標準出力のみ）")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE_PATH), help="比較するベースラインJSON")
+    parser.add_argument("--update-baseline", action="store_true", help="結果をベースラインとして保存する")
+    parser.add_argument("--no-compare", action="store_true", help="ベースラインと比較せず計測だけ行う")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="許容する増加率（0.2 = 20%%）")
+    parser.add_argument("--profile", metavar="PROF_PATH",
+                        help="計測後に全体の処理を1回 cProfile + tracemalloc で実行し、.prof ファイルを保存する")
+    args = parser.parse_args(argv)
+
+    params = {
+        'size': args.size,
+        'streamed_rows': SIZES[args.size],
+        'freee_size': args.freee_size,
+        'freee_partners': SIZES[args.freee_size],
+        'seed': args.seed,
+        'repeat': args.repeat,
+    }
+
+    print(f"データ生成中... (STREAMED {params['streamed_rows']}行, freee取引先 {params['freee_partners']}件)")
+    dataset = generate_dataset(args.data_dir, params['streamed_rows'], params['freee_partners'], args.seed)
+
+    print(f"計測中... ({args.repeat}回)")
+    result = {
+        'version': RESULT_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+        },
+        'params': params,
+        'stages': run_benchmark(dataset, args.repeat),
+    }
+
+    for stage, values in result['stages'].items():
+        print(f"  {stage:<28} {values['seconds']:>10.3f}秒  {values['rows_per_second'] or 0:>12,.0f}行/秒")
+
+    if args.output:
+        _write_json(args.output, result)
+        print(f"結果を保存しました: {args.output}")
+
+    # 詳細プロファイル（処理が遅くなるため計測とは別に1回だけ実行）
+    if args.profile:
+        _profile_end_to_end(dataset, args.profile)
+
+    if args.update_baseline:
+        _write_json(args.baseline, result)
+        print(f"ベースラインを更新しました: {args.baseline}")
+        return 0
+
+    if args.no_compare:
+        return 0
+
+    # ベースラインがない場合に比較を省略すると劣化を見逃すため、失敗として扱う
+    baseline_path = Path(args.baseline)
+    if not baseline_path.exists():
+        print(f"ベースラインがないため比較できません: {baseline_path}（--update-baseline で作成するか、"
+              f"--no-compare で計測だけ行ってください）", file=sys.stderr)
+        return 2
+
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+
+    # 条件（行数など）が異なる結果とは比較しない
+    if _comparable_params(baseline.get('params', {})) != _comparable_params(params):
+        print(f"ベースラインと条件が異なるため比較できません: {baseline.get('params')}")
+        return 2
+
+    regressions = compare_with_baseline(result, baseline, args.tolerance)
+    if regressions:
+        print("処理時間が劣化しました:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+
+    print(f"ベースラインとの比較: 劣化なし（許容 +{args.tolerance:.0%}）")
+    return 0
+
+
+def _timed(func):
+    """関数を実行し、結果と処理時間（秒）を返す"""
+    start = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - start
+
+
+def _convert_end_to_end(dataset: dict, output_dir: str):
+    """マスタの読み込みからExcel出力までを1回実行する"""
+    dept_normalizer = DeptNormalizer(dataset['dept_mapping'])
+    partner_resolver = PartnerResolver(dataset['partner_list'], dataset['freee_csv'])
+
+    return convert_file(
+        dataset['streamed_csv'],
+        "benchmark.csv",
+        "streamed",
+        "freee",
+        output_dir,
+        dept_normalizer=dept_normalizer,
+        partner_resolver=partner_resolver
+    )
+
+
+def _profile_end_to_end(dataset: dict, profile_path: str):
+    """全体の処理を1回プロファイルし、.prof ファイルの保存と上位関数の表示を行う"""
+    output_dir = Path(tempfile.mkdtemp(prefix="benchmark_output_"))
+    try:
+        profiler = RunProfiler()
+        with profiler:
+            _convert_end_to_end(dataset, str(output_dir))
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    profiler.save(profile_path)
+    print(profiler.summary_text())
+    print(f"プロファイルを保存しました: {profile_path}")
+
+
+def _comparable_params(params: dict) -> tuple:
+    """ベースラインと比較できる条件かを判定するためのキー"""
+    return params.get('streamed_rows'), params.get('freee_partners'), params.get('seed')
+
+
+def _write_json(path, data: dict):
+    """JSONファイルに書き込む"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,15 +2,115 @@
 exporter/freee_exporter.py - freee用Excel出力クラス
 """
 
+import io
+import math
+from contextlib import contextmanager
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill
+from functools import lru_cache
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from pandas.io.formats.excel import ExcelFormatter
+from processor.journal_entry import JournalEntry
+
+
+# ヘッダー行の書式（pandas.to_excel のヘッダーと同じ）
+# pandas 2 までは太字・細い罫線・中央揃え、pandas 3 からは書式なしで出力される
+if hasattr(ExcelFormatter, 'header_style'):
+    HEADER_STYLE = {
+        'font': Font(bold=True),
+        'border': Border(left=Side(style='thin'), right=Side(style='thin'),
+                         top=Side(style='thin'), bottom=Side(style='thin')),
+        'alignment': Alignment(horizontal='center', vertical='top'),
+    }
+else:
+    HEADER_STYLE = {}
+
+
+@lru_cache(maxsize=65536)
+def display_width(text: str) -> int:
+    """文字列の表示幅を計算する（日本語などの非ASCII文字は2文字分としてカウント）
+    
+    同じ文字列（取引先名・勘定科目など）は何度も出現するため結果をキャッシュする
+    
+    Args:
+        text: str
+    
+    Returns:
+        int - 表示幅
+    """
+    if text.isascii():
+        return len(text)
+    return sum(2 if ord(c) > 127 else 1 for c in text)
+
+
+class ColumnWidthProfile:
+    """列ごとのデータ有無と最大表示幅を集計するクラス
+    
+    出力行を作成しながら chunk 単位・列単位で更新し、最後に列幅を求める
+    """
+    
+    def __init__(self, columns):
+        """
+        Args:
+            columns: list - 列名リスト
+        """
+        self.columns = columns
+        self.has_data = [False] * len(columns)
+        self.max_widths = [len(str(column)) for column in columns]  # ヘッダーの長さ
+    
+    def update(self, rows: list[dict]):
+        """出力行の値で集計を更新する
+        
+        Args:
+            rows: list[dict] - 出力行 {列名: 値}
+        """
+        for col_idx, column in enumerate(self.columns):
+            values = [row[column] for row in rows]
+            
+            # データの有無（空欄・None・'nan' 以外があるか）
+            if not self.has_data[col_idx]:
+                self.has_data[col_idx] = any(value not in ['', None, 'nan'] for value in set(values))
+            
+            # 同じ文字列は1回だけ幅を計算
+            for text in set(map(str, values)):
+                if text and text != 'nan':
+                    width = display_width(text)
+                    if width > self.max_widths[col_idx]:
+                        self.max_widths[col_idx] = width
+    
+    def widths(self) -> list[int]:
+        """列幅を返す
+        
+        Returns:
+            list[int] - データがない列は8、ある列は最大表示幅+2（上限50）
+        """
+        return [
+            min(max_width + 2, 50) if has_data else 8
+            for has_data, max_width in zip(self.has_data, self.max_widths)
+        ]
+
+
+class ExcelBuffer(io.BytesIO):
+    """メモリ上に出力したExcelファイル（name に出力ファイル名を持つ）"""
+    
+    def __init__(self, name):
+        """
+        Args:
+            name: str - 出力ファイル名
+        """
+        super().__init__()
+        self.name = name
 
 
 class BaseExporter:
-    """Excel出力の基底クラス"""
+    """Excel出力の基底クラス
+    
+    サブクラスは _write(data_list, output) で output（ファイルパスまたはバッファ）に書き込む
+    """
     
     def __init__(self, output_dir=None):
         if output_dir is None:
@@ -18,8 +118,54 @@ class BaseExporter:
         else:
             self.output_dir = Path(output_dir)
     
-    def _generate_filename(self, original_filename, suffix=""):
-        """出力ファイル名を生成する（重複時は連番を付与）"""
+    def export(self, data_list: list[dict], original_filename: str) -> str:
+        """Excelファイルに出力する
+        
+        Args:
+            data_list: list[dict] - 検証済みデータリスト
+            original_filename: str - 元のファイル名
+        
+        Returns:
+            str: 出力ファイルパス
+        """
+        output_path = self.output_dir / self._generate_filename(original_filename)
+        with self._removing_on_error(output_path):
+            self._write(data_list, output_path)
+        return str(output_path)
+    
+    def export_to_buffer(self, data_list: list[dict], original_filename: str) -> ExcelBuffer:
+        """ディスクに書き込まず、メモリ上にExcelファイルを出力する
+        
+        Args:
+            data_list: list[dict] - 検証済みデータリスト
+            original_filename: str - 元のファイル名
+        
+        Returns:
+            ExcelBuffer: 出力内容（先頭に位置を戻したもの、name は出力ファイル名）
+        """
+        buffer = ExcelBuffer(self._generate_filename(original_filename, check_exists=False))
+        self._write(data_list, buffer)
+        buffer.seek(0)
+        return buffer
+    
+    def _write(self, data_list, output):
+        """Excelを書き込む（サブクラスで実装）
+        
+        Args:
+            data_list: list[dict] - 検証済みデータリスト
+            output: Path | BytesIO - 出力先
+        """
+        raise NotImplementedError
+    
+    def _generate_filename(self, original_filename, suffix="", check_exists=True):
+        """出力ファイル名を生成する（重複時は連番を付与）
+        
+        check_exists=True の場合は、出力ディレクトリに空のファイルを排他的に作成して名前を確保する
+        （並列処理で同じ名前の入力を同時に出力しても、互いに上書きしない）。
+        
+        Args:
+            check_exists: bool - 出力ディレクトリの同名ファイルを確認するか（メモリ上に出力する場合は False）
+        """
         # 元のファイル名から拡張子を除去
         base_name = Path(original_filename).stem
         
@@ -32,9 +178,9 @@ class BaseExporter:
         else:
             filename = f"{base_name}_{today}.xlsx"
         
-        # 重複チェックと連番付与
+        # 重複チェックと連番付与（ファイルの作成で確認するため、他のプロセスと同じ名前にならない）
         counter = 1
-        while (self.output_dir / filename).exists():
+        while check_exists and not self._reserve(self.output_dir / filename):
             if suffix:
                 filename = f"{base_name}_{today}{suffix}_{counter:02d}.xlsx"
             else:
@@ -42,25 +188,38 @@ class BaseExporter:
             counter += 1
         
         return filename
+    
+    @staticmethod
+    def _reserve(path) -> bool:
+        """空のファイルを排他的に作成して出力先を確保する（すでにあれば False）"""
+        try:
+            with open(path, 'x'):
+                pass
+        except FileExistsError:
+            return False
+        return True
+    
+    @staticmethod
+    @contextmanager
+    def _removing_on_error(output_path):
+        """書き込みに失敗した場合、確保した出力ファイルを削除する"""
+        try:
+            yield
+        except BaseException:
+            Path(output_path).unlink(missing_ok=True)
+            raise
 
 
 class TestExcelExporter(BaseExporter):
     """テスト用Excel出力クラス"""
     
-    def export(self, data_list: list[dict], original_filename: str) -> str:
-        """テスト用のExcelファイルに出力する
+    def _write(self, data_list: list[dict], output):
+        """テスト用のExcelを書き込む
         
         Args:
             data_list: list[dict] - 検証済みデータリスト
-            original_filename: str - 元のファイル名
-        
-        Returns:
-            str: 出力ファイルパス
+            output: Path | BytesIO - 出力先
         """
-        # ファイル名を生成
-        output_filename = self._generate_filename(original_filename)
-        output_path = self.output_dir / output_filename
-        
         # 出力用データを作成
         output_data = []
         error_rows = []
@@ -78,28 +237,23 @@ class TestExcelExporter(BaseExporter):
             if errors:
                 error_rows.append(idx + 2)  # +2 はヘッダー行を考慮
         
-        # DataFrameに変換してExcel出力
+        # DataFrameに変換してExcel出力（エラー行の色付けも保存前に行い、書き込みは1回）
         df = pd.DataFrame(output_data)
-        df.to_excel(output_path, index=False, sheet_name='test_data', engine='openpyxl')
-        
-        # エラー行を赤色にする
-        if error_rows:
-            self._highlight_error_rows(output_path, 'test_data', error_rows, len(df.columns))
-        
-        return str(output_path)
+        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name='test_data')
+            
+            # エラー行を赤色にする
+            if error_rows:
+                self._highlight_error_rows(writer.sheets['test_data'], error_rows, len(df.columns))
     
-    def _highlight_error_rows(self, file_path, sheet_name, error_rows, num_columns):
+    def _highlight_error_rows(self, ws, error_rows, num_columns):
         """エラー行を赤色でハイライト
         
         Args:
-            file_path: str - Excelファイルパス
-            sheet_name: str - シート名
+            ws: Worksheet - 対象シート
             error_rows: list[int] - エラー行番号のリスト
             num_columns: int - 列数
         """
-        wb = load_workbook(file_path)
-        ws = wb[sheet_name]
-        
         # 薄い赤（ピンク）の塗りつぶし
         pink_fill = PatternFill(start_color='FFCCCC', end_color='FFCCCC', fill_type='solid')
         
@@ -107,8 +261,6 @@ class TestExcelExporter(BaseExporter):
             for col_num in range(1, num_columns + 1):
                 cell = ws.cell(row=row_num, column=col_num)
                 cell.fill = pink_fill
-        
-        wb.save(file_path)
 
 
 class FreeeExcelExporter(BaseExporter):
@@ -125,184 +277,221 @@ class FreeeExcelExporter(BaseExporter):
         '貸方金額', '貸方税区分', '貸方税額', '摘要'
     ]
     
-    def export(self, data_list: list[dict], original_filename: str) -> str:
-        """freee用のExcelファイルに出力する
+    def _write(self, data_list: list[dict], output):
+        """freee用のExcelを書き込む
         
         Args:
             data_list: list[dict] - 検証済みデータリスト
+            output: Path | BytesIO - 出力先
+        """
+        # 値・エラー行の塗りつぶし・取引先セルの色付け・列幅を1回の書き込みで出力
+        # （列幅は全行から決定）
+        self._write_stream([data_list], output, width_sample_rows=len(data_list))
+    
+    def export_stream(self, chunks, original_filename: str, width_sample_rows=10000) -> str:
+        """データを chunk ごとに受け取り、freee用のExcelファイルに逐次出力する
+        
+        openpyxlの書き込み専用モードで1行ずつ書き出すため、全行をメモリに保持しない。
+        書き込み専用モードでは列幅を先に確定する必要があるため、
+        列幅は先頭の width_sample_rows 行から決定する。
+        
+        Args:
+            chunks: Iterable[list[dict]] - 検証済みデータリストの chunk
             original_filename: str - 元のファイル名
+            width_sample_rows: int - 列幅の決定に使う先頭の行数
         
         Returns:
             str: 出力ファイルパス
         """
-        # ファイル名を生成
-        output_filename = self._generate_filename(original_filename)
-        output_path = self.output_dir / output_filename
-        
-        # freee用のデータに変換
-        freee_data = []
-        error_rows = []
-        color_info = []  # 色付け情報 {'row': 行番号, 'col': 列名, 'color': 色}
-        
-        for idx, data in enumerate(data_list):
-            row = {}
-            
-            # freee用の全列について処理
-            for col in self.FREEE_COLUMNS:
-                if col in data:
-                    row[col] = data[col]
-                elif col == '日付':
-                    row[col] = data.get('日付', '')
-                elif col == '借方金額' or col == '貸方金額':
-                    row[col] = data.get('金額', '')
-                else:
-                    row[col] = ''
-            
-            # 候補列を追加
-            row['候補'] = data.get('候補', '')
-            
-            # 借方取引先の色付け情報
-            borrow_match = data.get('借方取引先_match_type', 'none')
-            if borrow_match == 'partner_list' or borrow_match == 'freee_exact':
-                color_info.append({'row': idx + 2, 'col': '借方取引先', 'color': 'green'})
-            elif borrow_match == 'fuzzy':
-                color_info.append({'row': idx + 2, 'col': '借方取引先', 'color': 'red'})
-            
-            # 貸方取引先の色付け情報
-            lend_match = data.get('貸方取引先_match_type', 'none')
-            if lend_match == 'partner_list' or lend_match == 'freee_exact':
-                color_info.append({'row': idx + 2, 'col': '貸方取引先', 'color': 'green'})
-            elif lend_match == 'fuzzy':
-                color_info.append({'row': idx + 2, 'col': '貸方取引先', 'color': 'red'})
-            
-            # エラーがある場合
-            errors = data.get('_errors', [])
-            if errors:
-                error_rows.append(idx + 2)  # +2 はヘッダー行を考慮
-                # エラーメッセージを結合
-                if isinstance(errors, list):
-                    row['エラー内容'] = '\n'.join(errors)
-                else:
-                    row['エラー内容'] = str(errors)
-            else:
-                row['エラー内容'] = ''
-            
-            freee_data.append(row)
-        
-        # 出力列: freee列 + 候補 + エラー内容
-        output_columns = self.FREEE_COLUMNS + ['候補', 'エラー内容']
-        
-        # DataFrameに変換してExcel出力
-        df = pd.DataFrame(freee_data, columns=output_columns)
-        df.to_excel(output_path, index=False, sheet_name='freee_data', engine='openpyxl')
-        
-        # エラー行を赤色にする
-        if error_rows:
-            self._highlight_error_rows(output_path, 'freee_data', error_rows, len(output_columns))
-        
-        # 取引先セルを色付け
-        if color_info:
-            self._color_partner_cells(output_path, 'freee_data', color_info, output_columns)
-        
-        # 列幅を自動調整
-        self._adjust_column_widths(output_path, 'freee_data', df)
-        
+        output_path = self.output_dir / self._generate_filename(original_filename)
+        with self._removing_on_error(output_path):
+            self._write_stream(chunks, output_path, width_sample_rows)
         return str(output_path)
     
-    def _highlight_error_rows(self, file_path, sheet_name, error_rows, num_columns):
-        """エラー行を赤色でハイライト
+    def export_stream_to_buffer(self, chunks, original_filename: str, width_sample_rows=10000) -> ExcelBuffer:
+        """export_stream() と同じ処理で、ディスクに書き込まずメモリ上に出力する
         
         Args:
-            file_path: str - Excelファイルパス
-            sheet_name: str - シート名
-            error_rows: list[int] - エラー行番号のリスト
-            num_columns: int - 列数
-        """
-        wb = load_workbook(file_path)
-        ws = wb[sheet_name]
-        
-        # 薄い赤（ピンク）の塗りつぶし
-        pink_fill = PatternFill(start_color='FFCCCC', end_color='FFCCCC', fill_type='solid')
-        
-        for row_num in error_rows:
-            for col_num in range(1, num_columns + 1):
-                cell = ws.cell(row=row_num, column=col_num)
-                cell.fill = pink_fill
+            chunks: Iterable[list[dict]] - 検証済みデータリストの chunk
+            original_filename: str - 元のファイル名
+            width_sample_rows: int - 列幅の決定に使う先頭の行数
         
-        wb.save(file_path)
+        Returns:
+            ExcelBuffer: 出力内容（先頭に位置を戻したもの、name は出力ファイル名）
+        """
+        buffer = ExcelBuffer(self._generate_filename(original_filename, check_exists=False))
+        self._write_stream(chunks, buffer, width_sample_rows)
+        buffer.seek(0)
+        return buffer
     
-    def _color_partner_cells(self, file_path, sheet_name, color_info, columns):
-        """取引先セルを色付け
+    def _write_stream(self, chunks, output, width_sample_rows):
+        """chunk ごとに出力行を作成し、書き込み専用モードで output に保存する
         
         Args:
-            file_path: str - Excelファイルパス
-            sheet_name: str - シート名
-            color_info: list[dict] - 色付け情報
-            columns: list - 列名リスト
+            chunks: Iterable[list[dict]] - 検証済みデータリストの chunk
+            output: Path | BytesIO - 出力先
+            width_sample_rows: int - 列幅の決定に使う先頭の行数
         """
-        wb = load_workbook(file_path)
-        ws = wb[sheet_name]
+        # 出力列: freee列 + 候補 + エラー内容
+        output_columns = self.FREEE_COLUMNS + ['候補', 'エラー内容']
+        col_mapping = {col: idx for idx, col in enumerate(output_columns)}
         
         # 緑色の塗りつぶし
         green_fill = PatternFill(start_color='CCFFCC', end_color='CCFFCC', fill_type='solid')
         # 薄い赤（ピンク）の塗りつぶし
         pink_fill = PatternFill(start_color='FFCCCC', end_color='FFCCCC', fill_type='solid')
-        
-        # 列名から列番号へのマッピング
-        col_mapping = {col: idx + 1 for idx, col in enumerate(columns)}
-        
-        for info in color_info:
-            row_num = info['row']
-            col_name = info['col']
-            color = info['color']
-            
-            if col_name in col_mapping:
-                col_num = col_mapping[col_name]
-                cell = ws.cell(row=row_num, column=col_num)
+        # 黄色の塗りつぶし（表記ゆれを吸収して一致）
+        yellow_fill = PatternFill(start_color='FFF2CC', end_color='FFF2CC', fill_type='solid')
+        color_fills = {'green': green_fill, 'yellow': yellow_fill, 'red': pink_fill}
+        
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('freee_data')
+        
+        # 列幅を決めるまでの行を保持するバッファ
+        pending_rows = []
+        pending_count = 0
+        width_profile = ColumnWidthProfile(output_columns)
+        header_written = False
+        
+        def write_rows(rows):
+            for row, partner_colors in rows:
+                has_error = bool(row['エラー内容'])
+                cells = []
+                for col in output_columns:
+                    cell = WriteOnlyCell(ws, value=self._cell_value(row[col]))
+                    if has_error:
+                        cell.fill = pink_fill
+                    cells.append(cell)
                 
-                if color == 'green':
-                    cell.fill = green_fill
-                elif color == 'red':
-                    cell.fill = pink_fill
+                # 取引先セルを色付け（エラー行の塗りつぶしより優先）
+                for col, color in partner_colors.items():
+                    cells[col_mapping[col]].fill = color_fills[color]
+                
+                ws.append(cells)
         
-        wb.save(file_path)
+        for chunk in chunks:
+            rows = [self._build_row(data) for data in chunk]
+            
+            if header_written:
+                write_rows(rows)
+                continue
+            
+            # 列幅の集計（列単位）
+            width_profile.update([row for row, _ in rows])
+            pending_rows.append(rows)
+            pending_count += len(rows)
+            
+            if pending_count >= width_sample_rows:
+                self._write_header(ws, output_columns, width_profile.widths())
+                header_written = True
+                for pending in pending_rows:
+                    write_rows(pending)
+                pending_rows = []
+        
+        if not header_written:
+            self._write_header(ws, output_columns, width_profile.widths())
+            for pending in pending_rows:
+                write_rows(pending)
+        
+        wb.save(output)
     
-    def _adjust_column_widths(self, file_path, sheet_name, df):
-        """列幅を自動調整する
+    def _build_row(self, data: dict) -> tuple[dict, dict]:
+        """データ行をfreee用の出力行に変換する
         
         Args:
-            file_path: str - Excelファイルパス
-            sheet_name: str - シート名
-            df: DataFrame - データフレーム
-        """
-        wb = load_workbook(file_path)
-        ws = wb[sheet_name]
+            data: dict | JournalEntry - データ行
         
-        for col_idx, column in enumerate(df.columns, start=1):
-            column_letter = ws.cell(row=1, column=col_idx).column_letter
-            
-            # 列のデータをチェック（ヘッダー以外）
-            has_data = any(
-                df.iloc[row_idx, col_idx - 1] not in ['', None, 'nan']
-                for row_idx in range(len(df))
-            )
-            
-            if not has_data:
-                # データがない列は幅を小さく
-                ws.column_dimensions[column_letter].width = 8
+        Returns:
+            tuple: (出力行 {列名: 値}, 取引先の色付け情報 {列名: 'green' / 'yellow' / 'red'})
+        """
+        # 列ごとの参照が多いため、JournalEntry は先に dict に変換する
+        if isinstance(data, JournalEntry):
+            data = data.to_dict()
+        
+        row = {}
+        
+        # freee用の全列について処理
+        for col in self.FREEE_COLUMNS:
+            if col in data:
+                row[col] = data[col]
+            elif col == '日付':
+                row[col] = data.get('日付', '')
+            elif col == '借方金額' or col == '貸方金額':
+                row[col] = data.get('金額', '')
             else:
-                # データがある列は自動調整
-                max_length = len(str(column))  # ヘッダーの長さ
-                
-                for row_idx in range(len(df)):
-                    cell_value = str(df.iloc[row_idx, col_idx - 1])
-                    if cell_value and cell_value != 'nan':
-                        # 日本語文字は2文字分としてカウント
-                        length = sum(2 if ord(c) > 127 else 1 for c in cell_value)
-                        max_length = max(max_length, length)
-                
-                # 最大幅を50に制限
-                ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
+                row[col] = ''
+        
+        # 候補列を追加
+        row['候補'] = data.get('候補', '')
+        
+        partner_colors = {}
+        
+        # 借方取引先の色付け情報
+        borrow_match = data.get('借方取引先_match_type', 'none')
+        if borrow_match == 'partner_list' or borrow_match == 'freee_exact':
+            partner_colors['借方取引先'] = 'green'
+        elif borrow_match == 'normalized':
+            partner_colors['借方取引先'] = 'yellow'
+        elif borrow_match == 'fuzzy':
+            partner_colors['借方取引先'] = 'red'
+        
+        # 貸方取引先の色付け情報
+        lend_match = data.get('貸方取引先_match_type', 'none')
+        if lend_match == 'partner_list' or lend_match == 'freee_exact':
+            partner_colors['貸方取引先'] = 'green'
+        elif lend_match == 'normalized':
+            partner_colors['貸方取引先'] = 'yellow'
+        elif lend_match == 'fuzzy':
+            partner_colors['貸方取引先'] = 'red'
+        
+        # エラーがある場合
+        errors = data.get('_errors', [])
+        if errors:
+            # エラーメッセージを結合
+            if isinstance(errors, list):
+                row['エラー内容'] = '\n'.join(errors)
+            else:
+                row['エラー内容'] = str(errors)
+        else:
+            row['エラー内容'] = ''
+        
+        return row, partner_colors
+    
+    def _cell_value(self, value):
+        """セルに書き込む値に変換する（pandas.to_excel と同じ扱い）
         
-        wb.save(file_path)
-        
\ No newline at end of file
+        Args:
+            value: 出力行の値
+        
+        Returns:
+            空文字・NaNは空セル（None）、無限大は文字列
+        """
+        if isinstance(value, float):
+            if math.isnan(value):
+                return None
+            if math.isinf(value):
+                return 'inf' if value > 0 else '-inf'
+        elif value == '':
+            return None
+        return value
+    
+    def _write_header(self, ws, columns, widths):
+        """書き込み専用シートに列幅とヘッダー行を書き込む
+        
+        Args:
+            ws: WriteOnlyWorksheet - 出力先シート
+            columns: list - 列名リスト
+            widths: list[int] - 列幅
+        """
+        for col_idx, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
+        
+        # pandas.to_excel で出力していた時と同じヘッダーの書式
+        header_cells = []
+        for column in columns:
+            cell = WriteOnlyCell(ws, value=column)
+            for name, style in HEADER_STYLE.items():
+                setattr(cell, name, style)
+            header_cells.append(cell)
+        
+        ws.append(header_cells)
@@ -0,0 +1,123 @@
+"""
+exporter/output_bundle.py - 出力ファイルを1つのZIPにまとめる（一括ダウンロード用）
+"""
+
+import zipfile
+from pathlib import Path
+
+
+# すでに圧縮されている形式（xlsx は中身がZIP）。auto では無圧縮で格納する
+COMPRESSED_SUFFIXES = {'.xlsx', '.xlsm', '.zip', '.gz', '.png', '.jpg', '.jpeg', '.pdf'}
+
+
+class OutputBundle:
+    """出力ファイルを1つずつZIPファイルに追加するクラス
+
+    ZIPはメモリ上ではなく path に書き込み、ファイルを出力するたびに add() で追加する
+    （全ファイルの出力が終わってからまとめて作り直さない）。
+    追加した後はZIPが出力ファイルの唯一の保存先になる（呼び出し側はメモリ上の出力を保持せず、
+    ダウンロード時に read() / read_all() で読み出す）。
+
+    圧縮方式（compression）:
+    - 'auto': xlsx など圧縮済みの形式は無圧縮（ZIP_STORED）、それ以外は ZIP_DEFLATED
+    - 'store': すべて無圧縮
+    - 'deflate': すべて ZIP_DEFLATED
+    """
+
+    COMPRESSIONS = ('auto', 'store', 'deflate')
+
+    def __init__(self, path, compression='auto'):
+        """
+        Args:
+            path: str | Path - ZIPファイルの出力先
+            compression: str - 'auto' / 'store' / 'deflate'
+        """
+        if compression not in self.COMPRESSIONS:
+            raise ValueError(f"圧縮方式が不正です: {compression}")
+
+        self.path = Path(path)
+        self.compression = compression
+        self.names = []  # 追加したファイル名（ZIP内の名前、追加順）
+        self._used_names = set()
+        self._zip = zipfile.ZipFile(self.path, 'w')
+
+    def add(self, name: str, data) -> str:
+        """ファイルを追加する
+
+        Args:
+            name: str - ZIP内のファイル名（同じ名前がすでにあれば連番を付ける）
+            data: str | Path | bytes | BytesIO（ExcelBuffer など） - 追加する内容（ファイルパスはそのファイル）
+
+        Returns:
+            str - ZIP内のファイル名
+        """
+        arcname = unique_name(name, self._used_names)
+        compress_type = self._compress_type(arcname)
+
+        if isinstance(data, (str, Path)):
+            self._zip.write(data, arcname, compress_type=compress_type)
+        elif hasattr(data, 'getbuffer'):
+            # メモリ上の出力はコピーせずに書き込む
+            self._zip.writestr(arcname, data.getbuffer(), compress_type=compress_type)
+        else:
+            self._zip.writestr(arcname, data, compress_type=compress_type)
+
+        self.names.append(arcname)
+        return arcname
+
+    def close(self):
+        """ZIPファイルを閉じる（中央ディレクトリを書き込む）"""
+        self._zip.close()
+
+    def read(self, name: str) -> bytes:
+        """ZIP内のファイルを1つ読み出す（個別ダウンロード用）
+
+        Args:
+            name: str - add() が返したZIP内のファイル名
+
+        Returns:
+            bytes
+        """
+        self.close()
+        with zipfile.ZipFile(self.path) as zip_file:
+            return zip_file.read(name)
+
+    def read_all(self) -> bytes:
+        """書き込み済みのZIPファイル全体を読み出す（一括ダウンロード用）
+
+        st.download_button は内容を bytes に変換してメモリ上に保持するため、
+        ファイルオブジェクトを渡しても全体を読み込む。そのためクリック時にZIP全体を1回だけ読み出す。
+
+        Returns:
+            bytes
+        """
+        self.close()
+        return self.path.read_bytes()
+
+    def _compress_type(self, name: str) -> int:
+        """ファイル名から圧縮方式を決める"""
+        if self.compression == 'store':
+            return zipfile.ZIP_STORED
+        if self.compression == 'auto' and Path(name).suffix.lower() in COMPRESSED_SUFFIXES:
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+    def __len__(self):
+        return len(self.names)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def unique_name(name: str, used_names: set) -> str:
+    """同じ名前がすでに使われていれば連番を付けた名前を返す（ZIP内のファイル名用）"""
+    unique = name
+    counter = 1
+    while unique in used_names:
+        unique = f"{Path(name).stem}_{counter:02d}{Path(name).suffix}"
+        counter += 1
+    used_names.add(unique)
+    return unique
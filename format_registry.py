@@ -0,0 +1,111 @@
+"""
+format_registry.py - 入力形式・出力形式と Reader / Exporter クラスの対応表
+
+クラスは "モジュール名:クラス名" の文字列で登録し、その形式を初めて使う時点で import する。
+（起動時や Streamlit の再実行ごとに、使わない Reader / Exporter や pandas・openpyxl を読み込まない）
+
+形式を追加する場合は INPUT_FORMATS / OUTPUT_FORMATS に登録するか、
+register_input_format() / register_output_format() を呼ぶ。
+"""
+
+import importlib
+import threading
+
+
+# 入力形式 → 表示名・Reader（read_and_validate() を持つクラス）
+INPUT_FORMATS = {
+    "test": {
+        "label": "テスト用Excel (B2:日付, C3:金額)",
+        "reader": "reader.test_reader01:TestExcelReader",
+    },
+    "freee": {
+        "label": "freee形式Excel (freee項目名からデータ照合)",
+        "reader": "reader.freee_reader:FreeeExcelReader",
+    },
+    "streamed": {
+        "label": "リコホテルズ_STREAMED_csv",
+        "reader": "reader.rico_streamed_csvreader:RicoStreamedCSVReader",
+    },
+}
+
+# 出力形式 → 表示名・Exporter（export() を持つクラス）
+OUTPUT_FORMATS = {
+    "test": {
+        "label": "テスト用Excel",
+        "exporter": "exporter.freee_exporter:TestExcelExporter",
+    },
+    "freee": {
+        "label": "freee用Excel",
+        "exporter": "exporter.freee_exporter:FreeeExcelExporter",
+    },
+}
+
+# 読み込み済みのクラス（"モジュール名:クラス名" → クラス）
+_loaded_classes = {}
+_load_lock = threading.Lock()
+
+
+def register_input_format(input_type: str, label: str, reader: str):
+    """入力形式を登録する
+
+    Args:
+        input_type: str - 入力形式のキー
+        label: str - 画面に表示する名前
+        reader: str - Reader クラス（"モジュール名:クラス名"）
+    """
+    INPUT_FORMATS[input_type] = {"label": label, "reader": reader}
+
+
+def register_output_format(output_type: str, label: str, exporter: str):
+    """出力形式を登録する
+
+    Args:
+        output_type: str - 出力形式のキー
+        label: str - 画面に表示する名前
+        exporter: str - Exporter クラス（"モジュール名:クラス名"）
+    """
+    OUTPUT_FORMATS[output_type] = {"label": label, "exporter": exporter}
+
+
+def get_reader_class(input_type: str):
+    """入力形式の Reader クラスを取得する（初回のみ import）
+
+    Args:
+        input_type: str - 入力形式（"test", "freee", "streamed"）
+
+    Returns:
+        type - Reader クラス
+    """
+    if input_type not in INPUT_FORMATS:
+        raise ValueError(f"不正なインプット形式: {input_type}")
+
+    return _load_class(INPUT_FORMATS[input_type]["reader"])
+
+
+def get_exporter_class(output_type: str):
+    """出力形式の Exporter クラスを取得する（初回のみ import）
+
+    Args:
+        output_type: str - 出力形式（"test", "freee"）
+
+    Returns:
+        type - Exporter クラス
+    """
+    if output_type not in OUTPUT_FORMATS:
+        raise ValueError(f"不正なアウトプット形式: {output_type}")
+
+    return _load_class(OUTPUT_FORMATS[output_type]["exporter"])
+
+
+def _load_class(import_path: str):
+    """"モジュール名:クラス名" からクラスを取得する"""
+    cls = _loaded_classes.get(import_path)
+    if cls is not None:
+        return cls
+
+    with _load_lock:
+        if import_path not in _loaded_classes:
+            module_name, class_name = import_path.split(":")
+            _loaded_classes[import_path] = getattr(importlib.import_module(module_name), class_name)
+
+    return _loaded_classes[import_path]
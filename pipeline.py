@@ -0,0 +1,301 @@
+"""
+pipeline.py - STREAMED CSV → freee用Excel の変換処理
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+
+from format_registry import get_reader_class, get_exporter_class
+from run_metrics import RunMetrics
+
+
+# ストリーミング処理で1回に読み込む行数
+DEFAULT_CHUNKSIZE = 10000
+
+# このサイズ以上のSTREAMED CSVはストリーミング処理する（全行をメモリに載せない）
+STREAMING_THRESHOLD_BYTES = 20 * 1024 * 1024
+
+# ワーカープロセス内で共有するマスタ（プロセスごとに1回だけ読み込む）
+_worker_masters = {}
+
+
+def convert_file(file_path, original_filename, input_type, output_type, output_dir,
+                 dept_normalizer=None, partner_resolver=None, streaming=False, metrics=None,
+                 to_buffer=False):
+    """1ファイルを読み込み・変換・出力する
+
+    Args:
+        file_path: str | bytes - 入力ファイルのパス、またはメモリ上のファイル内容
+        original_filename: str - 元のファイル名（出力ファイル名に使用）
+        input_type: str - 入力形式（"test", "freee", "streamed"）
+        output_type: str - 出力形式（"test", "freee"）
+        output_dir: str - 出力ディレクトリ
+        dept_normalizer: DeptNormalizer - STREAMEDの場合に使用
+        partner_resolver: PartnerResolver - STREAMEDの場合に使用
+        streaming: bool - STREAMED → freee をchunk単位で処理するか
+        metrics: RunMetrics - 段階ごとの計測結果の記録先（省略可）
+        to_buffer: bool - ディスクに書き込まず、メモリ上に出力するか
+
+    Returns:
+        tuple: (output_path, errors)
+            - output_path: str - 出力ファイルパス（to_buffer=True の場合は ExcelBuffer）
+            - errors: list[str] - 読み込み時のエラーメッセージ
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+
+    # 大きなSTREAMED CSVはchunk単位で読み込み〜出力まで流す
+    if streaming and input_type == "streamed" and output_type == "freee":
+        return convert_streamed_streaming(
+            file_path,
+            original_filename,
+            dept_normalizer,
+            partner_resolver,
+            get_exporter_class("freee")(output_dir=output_dir),
+            metrics=metrics,
+            to_buffer=to_buffer
+        )
+
+    with metrics.stage('reader', original_filename) as record:
+        # Reader選択（使う形式のモジュールだけを読み込む）
+        reader = get_reader_class(input_type)(file_path)
+
+        # データ読み込み
+        data_list, errors = reader.read_and_validate()
+        record['rows'] += len(data_list)
+
+    # STREAMED処理
+    if input_type == "streamed":
+        from processor.voucher_formatter import VoucherFormatter
+
+        data_list = _process_streamed(
+            data_list, original_filename, dept_normalizer, partner_resolver,
+            VoucherFormatter("STREAMED"), metrics
+        )
+
+    # Exporter選択
+    exporter = get_exporter_class(output_type)(output_dir=output_dir)
+
+    # Excel出力
+    with metrics.stage('exporter', original_filename) as record:
+        if to_buffer:
+            output_path = exporter.export_to_buffer(data_list, original_filename)
+        else:
+            output_path = exporter.export(data_list, original_filename)
+        record['rows'] += len(data_list)
+
+    return output_path, errors
+
+
+def _process_streamed(data_list, original_filename, dept_normalizer, partner_resolver,
+                      voucher_formatter, metrics, default_dept=None):
+    """STREAMEDのデータに部門正規化・取引先解決・伝票番号整形を行う（段階ごとに計測）
+
+    Returns:
+        list[JournalEntry] - 処理済みデータリスト
+    """
+    with metrics.stage('dept_normalizer', original_filename) as record:
+        data_list = dept_normalizer.normalize(data_list, default_dept)
+        record['rows'] += len(data_list)
+
+    resolver_stats = {}
+    with metrics.stage('partner_resolver', original_filename) as record:
+        data_list = partner_resolver.resolve(data_list, resolver_stats)
+        record['rows'] += len(data_list)
+    metrics.add_counters('partner_resolver', original_filename, resolver_stats)
+
+    with metrics.stage('voucher_formatter', original_filename) as record:
+        data_list = voucher_formatter.format(data_list)
+        record['rows'] += len(data_list)
+
+    return data_list
+
+
+def convert_files_parallel(jobs, input_type, output_type, output_dir, master_paths=None,
+                           cache_dir=None, max_workers=None, on_progress=None, metrics=None,
+                           to_buffer=False):
+    """複数ファイルをプロセスプールで並列に変換する
+
+    各ワーカーは起動時にマスタをコンパイル済みスナップショット（MasterCache）から
+    1回だけ読み込み、以降のファイルで読み取り専用として共有する。
+    結果は完了順ではなく jobs と同じ順序で返す。
+
+    Args:
+        jobs: list[tuple] - (入力ファイルのパスまたは内容の bytes, 元のファイル名, streaming) のリスト
+        input_type: str - 入力形式
+        output_type: str - 出力形式
+        output_dir: str - 出力ディレクトリ
+        master_paths: tuple - STREAMEDの場合 (dept_mapping_path, partner_list_path, freee_csv_path)
+        cache_dir: str - MasterCache の保存先
+        max_workers: int - ワーカー数（省略時はCPU数）
+        on_progress: Callable[[int, int, str], None] - 1ファイル完了ごとに
+            (完了数, 全体数, 元のファイル名) で呼ばれる
+        metrics: RunMetrics - 計測結果の記録先（各ワーカーで計測した結果を取り込む。省略可）
+        to_buffer: bool - ディスクに書き込まず、出力内容（ExcelBuffer）をワーカーから受け取るか
+
+    Returns:
+        list - jobs と同じ順序の (output_path, errors) または発生した Exception
+    """
+    results = [None] * len(jobs)
+
+    # Streamlitなどのスレッドを持つ親プロセスから安全に起動するため spawn を使う
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=_init_worker,
+                             initargs=(master_paths, cache_dir)) as executor:
+        futures = {
+            executor.submit(_convert_in_worker, file_path, original_filename,
+                            input_type, output_type, output_dir, streaming,
+                            metrics.trace_memory if metrics else None, to_buffer): idx
+            for idx, (file_path, original_filename, streaming) in enumerate(jobs)
+        }
+
+        for completed, future in enumerate(as_completed(futures), start=1):
+            idx = futures[future]
+            try:
+                output_path, errors, stage_records = future.result()
+                results[idx] = (output_path, errors)
+                if metrics and stage_records:
+                    metrics.merge(stage_records)
+            except Exception as e:
+                results[idx] = e
+
+            if on_progress:
+                on_progress(completed, len(jobs), jobs[idx][1])
+
+    return results
+
+
+def _init_worker(master_paths, cache_dir):
+    """ワーカープロセスの初期化（STREAMED用マスタを読み込む）
+
+    読み込みに失敗した場合は例外を保持し、各ファイルのエラーとして返す
+    """
+    _worker_masters.clear()
+    if not master_paths:
+        return
+
+    try:
+        from processor.dept_normalizer import DeptNormalizer
+        from processor.partner_resolver import PartnerResolver
+        from processor.master_cache import MasterCache
+        from processor.fuzzy_cache import FuzzyMatchCache
+
+        master_cache = MasterCache(cache_dir) if cache_dir else None
+        fuzzy_cache = FuzzyMatchCache.in_dir(cache_dir) if cache_dir else None
+        dept_mapping_path, partner_list_path, freee_csv_path = master_paths
+        _worker_masters['dept_normalizer'] = DeptNormalizer(
+            str(dept_mapping_path), master_cache=master_cache
+        )
+        _worker_masters['partner_resolver'] = PartnerResolver(
+            str(partner_list_path), str(freee_csv_path), master_cache=master_cache,
+            fuzzy_cache=fuzzy_cache
+        )
+    except Exception as e:
+        _worker_masters['error'] = e
+
+
+def _convert_in_worker(file_path, original_filename, input_type, output_type, output_dir, streaming,
+                       trace_memory=None, to_buffer=False):
+    """ワーカープロセスで1ファイルを変換する
+
+    Args:
+        trace_memory: bool | None - 計測する場合はメモリ計測の有無、計測しない場合は None
+
+    Returns:
+        tuple: (output_path, errors, 段階ごとの計測結果 or None)
+    """
+    if 'error' in _worker_masters:
+        raise _worker_masters['error']
+
+    metrics = RunMetrics(trace_memory=bool(trace_memory))
+    metrics.start()
+    try:
+        output_path, errors = convert_file(
+            file_path,
+            original_filename,
+            input_type,
+            output_type,
+            output_dir,
+            dept_normalizer=_worker_masters.get('dept_normalizer'),
+            partner_resolver=_worker_masters.get('partner_resolver'),
+            streaming=streaming,
+            metrics=metrics,
+            to_buffer=to_buffer
+        )
+    finally:
+        metrics.finish()
+
+    return output_path, errors, metrics.stage_records() if trace_memory is not None else None
+
+
+def convert_streamed_streaming(file_path, original_filename, dept_normalizer, partner_resolver,
+                               exporter, chunksize=DEFAULT_CHUNKSIZE, metrics=None, to_buffer=False):
+    """STREAMED CSVを chunk 単位で読み込み・変換・出力する
+
+    Reader → DeptNormalizer → PartnerResolver → VoucherFormatter → Exporter を
+    ジェネレータでつなぐため、メモリ使用量はファイルの行数ではなく chunksize で決まる。
+
+    Args:
+        file_path: str | bytes - STREAMED CSVのパス、またはメモリ上のファイル内容
+        original_filename: str - 元のファイル名（出力ファイル名に使用）
+        dept_normalizer: DeptNormalizer
+        partner_resolver: PartnerResolver
+        exporter: FreeeExcelExporter - export_stream() を持つExporter
+        chunksize: int - 1回に処理する行数
+        metrics: RunMetrics - 段階ごとの計測結果の記録先（省略可）
+        to_buffer: bool - ディスクに書き込まず、メモリ上に出力するか
+
+    Returns:
+        tuple: (output_path, errors)
+            - output_path: str - 出力ファイルパス（to_buffer=True の場合は ExcelBuffer）
+            - errors: list[str] - 読み込み時のエラーメッセージ
+    """
+    if metrics is None:
+        metrics = RunMetrics()
+
+    from processor.voucher_formatter import VoucherFormatter
+
+    reader = get_reader_class("streamed")(file_path)
+
+    # デフォルト部門は部門列だけを先頭から読み、最初に見つかった時点で判定する
+    with metrics.stage('reader', original_filename):
+        with closing(reader.iter_dept_values(chunksize)) as dept_rows:
+            default_dept = dept_normalizer.find_default_dept(dept_rows)
+
+    voucher_formatter = VoucherFormatter("STREAMED")
+    row_count = 0
+
+    def read_chunks():
+        # chunk を1つ読み込むごとに Reader の段階として計測する
+        nonlocal row_count
+        chunk_iter = reader.iter_chunks(chunksize)
+        while True:
+            with metrics.stage('reader', original_filename) as record:
+                chunk = next(chunk_iter, None)
+                if chunk is not None:
+                    record['rows'] += len(chunk)
+                    row_count += len(chunk)
+            if chunk is None:
+                return
+            yield chunk
+
+    chunks = (
+        _process_streamed(
+            chunk, original_filename, dept_normalizer, partner_resolver,
+            voucher_formatter, metrics, default_dept
+        )
+        for chunk in read_chunks()
+    )
+
+    # Exporter の処理時間には、chunk の読み込み・変換の時間を含めない
+    with metrics.stage('exporter', original_filename) as record:
+        if to_buffer:
+            output_path = exporter.export_stream_to_buffer(chunks, original_filename)
+        else:
+            output_path = exporter.export_stream(chunks, original_filename)
+        record['rows'] += row_count
+
+    return output_path, reader.errors
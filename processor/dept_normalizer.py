@@ -5,17 +5,20 @@ processor/dept_normalizer.py - 部門名を正規化するクラス
 import pandas as pd
 from pathlib import Path
 from processor.config import DEPT_CODES
+from processor.journal_entry import JournalEntry, as_entries
 
 
 class DeptNormalizer:
     """部門名を正規化するクラス"""
     
-    def __init__(self, dept_mapping_path):
+    def __init__(self, dept_mapping_path, master_cache=None):
         """
         Args:
             dept_mapping_path: str - dept_mapping.xlsx のパス
+            master_cache: MasterCache - コンパイル済みマスタのキャッシュ（省略時は毎回読み込む）
         """
         self.dept_mapping_path = Path(dept_mapping_path)
+        self.master_cache = master_cache
         self.dept_map = {}
         self._load_dept_mapping()
     
@@ -26,67 +29,101 @@ class DeptNormalizer:
         A: 元の名称, B: 正式名称
         """
         try:
-            df = pd.read_excel(self.dept_mapping_path, header=0)
-            
-            # 列名を取得（最初の2列を使用）
-            col1, col2 = df.columns[0], df.columns[1]
+            if self.master_cache:
+                compiled = self.master_cache.load('dept_mapping', self.dept_mapping_path, self._compile_dept_mapping)
+            else:
+                compiled = self._compile_dept_mapping(self.dept_mapping_path)
             
-            # マッピング辞書を作成
-            for _, row in df.iterrows():
-                original = str(row[col1]).strip()
-                formal = str(row[col2]).strip()
-                self.dept_map[original] = formal
+            self.dept_map = compiled['dept_map']
         
         except Exception as e:
             raise Exception(f"部門マッピングファイル読み込みエラー: {str(e)}")
     
-    def normalize(self, data_list: list[dict]) -> list[dict]:
+    @staticmethod
+    def _compile_dept_mapping(dept_mapping_path) -> dict:
+        """dept_mapping.xlsx からマッピング辞書を作成する
+        
+        Returns:
+            dict - {'dept_map': {元の名称: 正式名称}}
+        """
+        df = pd.read_excel(dept_mapping_path, header=0)
+        
+        # 最初の2列を列単位で文字列化
+        originals = [str(value).strip() for value in df.iloc[:, 0].tolist()]
+        formals = [str(value).strip() for value in df.iloc[:, 1].tolist()]
+        
+        return {'dept_map': dict(zip(originals, formals))}
+    
+    def normalize(self, data_list: list[dict], default_dept: str = None) -> list[JournalEntry]:
         """部門名を正規化する
         
         Args:
-            data_list: list[dict] - 検証済みデータリスト
+            data_list: list[dict | JournalEntry] - 検証済みデータリスト（dict の行は JournalEntry に変換）
+            default_dept: str - 空欄に使うデフォルト部門
+                （省略時は data_list から判定。chunk 単位で処理する場合は
+                 find_default_dept で事前に求めた値を渡す）
         
         Returns:
-            list[dict] - 部門名正規化済みデータリスト
+            list[JournalEntry] - 部門名正規化済みデータリスト
         """
+        data_list = as_entries(data_list)
+        
         # ファイル全体を1部門と仮定して、最初に見つかった部門を取得
-        default_dept = self._find_first_dept(data_list)
+        if default_dept is None:
+            default_dept = self._find_first_dept(data_list)
+        
+        dept_map = self.dept_map
         
         # 各行を処理
         for data in data_list:
             # 借方部門の正規化
-            borrow_dept = data.get('借方部門', '').strip()
+            borrow_dept = getattr(data, '借方部門', '').strip()
             if not borrow_dept:
                 # 空欄の場合はデフォルト部門を使用
-                data['借方部門'] = default_dept
+                data.借方部門 = default_dept
+            elif borrow_dept in dept_map:
+                data.借方部門 = dept_map[borrow_dept]
             else:
-                normalized_borrow = self.dept_map.get(borrow_dept, f"未登録_{borrow_dept}")
-                data['借方部門'] = normalized_borrow
+                data.借方部門 = f"未登録_{borrow_dept}"
                 
                 # マッピング内に存在しない場合はエラーフラグ
-                if borrow_dept not in self.dept_map:
-                    self._add_error(data, f"借方部門が未登録: {borrow_dept}")
+                self._add_error(data, f"借方部門が未登録: {borrow_dept}")
             
             # 貸方部門の正規化
-            lend_dept = data.get('貸方部門', '').strip()
+            lend_dept = getattr(data, '貸方部門', '').strip()
             if not lend_dept:
                 # 空欄の場合はデフォルト部門を使用
-                data['貸方部門'] = default_dept
+                data.貸方部門 = default_dept
+            elif lend_dept in dept_map:
+                data.貸方部門 = dept_map[lend_dept]
             else:
-                normalized_lend = self.dept_map.get(lend_dept, f"未登録_{lend_dept}")
-                data['貸方部門'] = normalized_lend
+                data.貸方部門 = f"未登録_{lend_dept}"
                 
                 # マッピング内に存在しない場合はエラーフラグ
-                if lend_dept not in self.dept_map:
-                    self._add_error(data, f"貸方部門が未登録: {lend_dept}")
+                self._add_error(data, f"貸方部門が未登録: {lend_dept}")
         
         return data_list
     
-    def _find_first_dept(self, data_list: list[dict]) -> str:
+    def find_default_dept(self, dept_rows) -> str:
+        """ファイル全体のデフォルト部門を判定する
+        
+        最初に部門が見つかった時点で読み込みを止めるため、
+        RicoStreamedCSVReader.iter_dept_values() のような遅延イテレータを渡せば
+        全行を読み込まずに判定できる
+        
+        Args:
+            dept_rows: Iterable[dict] - '借方部門'・'貸方部門' を持つ行
+        
+        Returns:
+            str - デフォルト部門（見つからない場合は"本部"）
+        """
+        return self._find_first_dept(dept_rows)
+    
+    def _find_first_dept(self, data_list) -> str:
         """最初に見つかった部門を取得（空欄でない）
         
         Args:
-            data_list: list[dict]
+            data_list: Iterable[dict]
         
         Returns:
             str - デフォルト部門（見つからない場合は"本部"）
@@ -103,18 +140,18 @@ class DeptNormalizer:
         # デフォルトは「本部」
         return "本部"
     
-    def _add_error(self, data: dict, error_msg: str):
+    def _add_error(self, data: JournalEntry, error_msg: str):
         """エラーメッセージを_errorsに追記
         
         Args:
-            data: dict - データ行
+            data: JournalEntry - データ行
             error_msg: str - エラーメッセージ
         """
-        if '_errors' not in data:
-            data['_errors'] = []
+        errors = getattr(data, '_errors', [])
         
-        if isinstance(data['_errors'], str):
+        if isinstance(errors, str):
             # 文字列の場合はリストに変換
-            data['_errors'] = [data['_errors']] if data['_errors'] else []
+            errors = [errors] if errors else []
         
-        data['_errors'].append(error_msg)
\ No newline at end of file
+        errors.append(error_msg)
+        data._errors = errors
\ No newline at end of file
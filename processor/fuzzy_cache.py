@@ -0,0 +1,150 @@
+"""
+processor/fuzzy_cache.py - 類似度マッチングの結果を実行をまたいで保持するキャッシュ（SQLite）
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# 保持する結果の既定の最大件数
+DEFAULT_MAX_ENTRIES = 100_000
+
+# 1回のSQLで扱う取引先名の数（SQLiteのパラメータ数の上限より小さくする）
+_BATCH_SIZE = 500
+
+
+class FuzzyMatchCache:
+    """類似度マッチングの結果（最高スコアの候補名とスコア）をSQLiteファイルに保存するクラス
+
+    - キーは (freee取引先マスタのバージョン, 取引先名)。freee取引先CSVの内容が変わるとバージョンが変わり、
+      古い結果は使われなくなる（使われない結果は最終使用日時が更新されないため、先に削除される）
+    - 候補が見つからなかった結果（候補名 ''）も保存する
+    - 件数が max_entries を超えたら、最も長く使われていないものから削除する（LRU）
+
+    操作ごとに接続を開くため、複数のセッション・ワーカープロセスから同時に使える。
+    SQLiteの操作に失敗した場合はキャッシュなしとして扱い、変換処理は継続する。
+    """
+
+    # キャッシュファイル名（マスタのスナップショットと同じディレクトリに作成する）
+    FILE_NAME = "fuzzy_matches.sqlite3"
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            path: str | Path - SQLiteファイルのパス
+            max_entries: int - 保持する結果の最大件数
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+    @classmethod
+    def in_dir(cls, cache_dir, **kwargs) -> "FuzzyMatchCache":
+        """ディレクトリ内の既定のファイル名でキャッシュを作成する
+
+        Args:
+            cache_dir: str | Path - 保存先ディレクトリ（MasterCache と同じ場所など）
+
+        Returns:
+            FuzzyMatchCache
+        """
+        return cls(Path(cache_dir) / cls.FILE_NAME, **kwargs)
+
+    def get_many(self, master_version: str, names: list[str]) -> dict[str, tuple[str, float]]:
+        """保存済みの結果を取得する（見つかった結果は最終使用日時を更新）
+
+        Args:
+            master_version: str - freee取引先マスタのバージョン
+            names: list[str] - 取引先名
+
+        Returns:
+            dict[str, tuple[str, float | None]] - 取引先名 → (候補名, スコア)。候補なしは ('', None)
+        """
+        results = {}
+        try:
+            with self._connect() as conn:
+                for start in range(0, len(names), _BATCH_SIZE):
+                    batch = names[start:start + _BATCH_SIZE]
+                    placeholders = ','.join('?' * len(batch))
+                    rows = conn.execute(
+                        f"SELECT name, candidate, score FROM fuzzy_matches "
+                        f"WHERE master_version = ? AND name IN ({placeholders})",
+                        [master_version, *batch]
+                    ).fetchall()
+                    for name, candidate, score in rows:
+                        results[name] = (candidate, score)
+
+                    if rows:
+                        hit_names = [row[0] for row in rows]
+                        conn.execute(
+                            f"UPDATE fuzzy_matches SET last_used = ? "
+                            f"WHERE master_version = ? AND name IN ({','.join('?' * len(hit_names))})",
+                            [time.time(), master_version, *hit_names]
+                        )
+        except sqlite3.Error:
+            return {}
+
+        return results
+
+    def put_many(self, master_version: str, results: dict[str, tuple[str, float]]):
+        """結果を保存する（上限を超えたら最も長く使われていないものから削除）
+
+        Args:
+            master_version: str - freee取引先マスタのバージョン
+            results: dict[str, tuple[str, float | None]] - 取引先名 → (候補名, スコア)
+        """
+        if not results:
+            return
+
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO fuzzy_matches (master_version, name, candidate, score, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(master_version, name, candidate, score, now) for name, (candidate, score) in results.items()]
+                )
+
+                count = conn.execute("SELECT COUNT(*) FROM fuzzy_matches").fetchone()[0]
+                if count > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM fuzzy_matches WHERE rowid IN "
+                        "(SELECT rowid FROM fuzzy_matches ORDER BY last_used LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+        except sqlite3.Error:
+            # 保存に失敗しても処理は継続（次回もう一度計算する）
+            pass
+
+    def clear(self):
+        """保存済みの結果をすべて削除する"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM fuzzy_matches")
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM fuzzy_matches").fetchone()[0]
+
+    @contextmanager
+    def _connect(self):
+        """接続を開く（テーブルがなければ作成）
+
+        with ブロックの終了時にコミット（例外時はロールバック）し、接続を閉じる。
+
+        Yields:
+            sqlite3.Connection
+        """
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS fuzzy_matches ("
+                    "master_version TEXT NOT NULL, name TEXT NOT NULL, candidate TEXT NOT NULL, score REAL, "
+                    "last_used REAL NOT NULL, PRIMARY KEY (master_version, name))"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS fuzzy_matches_last_used ON fuzzy_matches (last_used)")
+                yield conn
+        finally:
+            conn.close()
@@ -0,0 +1,154 @@
+"""
+processor/fuzzy_engine.py - 複数の取引先名の類似度マッチングを疎行列の積でまとめて行う
+"""
+
+from collections import Counter
+from difflib import SequenceMatcher
+
+import numpy as np
+from scipy import sparse
+
+
+# 1回の行列積で使うメモリの目安（バイト）
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024
+
+# （照会名 × freee取引先）1セルあたりのメモリ（バイト）
+# 行列積の結果（疎行列: int32 の値 + int32 の列番号）と、その密行列（int32）の合計。
+# 上限値は照会名ごとに1行ずつ計算するため、ブロック全体の float64 配列は作らない
+BYTES_PER_CELL = 4 + 4 + 4
+
+# 1回の行列積で計算する最大セル数（既定で約560万セル）
+DEFAULT_BLOCK_CELLS = DEFAULT_BLOCK_BYTES // BYTES_PER_CELL
+
+
+class BatchFuzzyMatcher:
+    """freee取引先名と照会名を文字の疎ベクトルで表し、共通文字数を行列積でまとめて求めるクラス
+
+    文字 c が n 回出現する名前を、特徴量 (c, 1) 〜 (c, n) がそれぞれ 1 のベクトルで表す。
+    2つのベクトルの内積は文字ごとの出現回数の最小値の合計（共通文字数）になるため、
+    照会名の行列 × freee取引先の行列の転置 で、全組み合わせの共通文字数が1回の積で求まる。
+
+    SequenceMatcher の ratio は 2 * 共通文字数 / (len1 + len2) 以下のため、この上限値が閾値に届く組だけを
+    上限値の大きい順に SequenceMatcher で採点する。採点済みの最高スコアが次の上限値を上回った時点で打ち切る
+    （1件ずつ全件走査した場合と同じ結果になる）。同じスコアの候補は order の小さい方を選ぶ。
+    """
+
+    def __init__(self, names: list[str], block_cells=DEFAULT_BLOCK_CELLS, order=None):
+        """
+        Args:
+            names: list[str] - freee取引先名リスト
+            block_cells: int - 1回の行列積で計算する最大セル数（照会名はこの大きさごとに分けて計算する）
+            order: Sequence[int] - 同じスコアの候補の優先順（freee取引先CSV上の順位。省略時は names の順）
+        """
+        self.names = names
+        self._order = list(order) if order is not None else list(range(len(names)))
+        self.block_cells = block_cells
+        self._features = {}  # (文字, 出現回数) → 列番号
+        self._matrix = self._vectorize(names, grow=True).T.tocsr()  # 特徴量 × freee取引先
+        self._lengths = np.array([len(name) for name in names], dtype=np.float64)
+
+    def best_matches(self, queries: list[str], threshold=0.6, top_k=None, stats: dict = None) -> dict:
+        """照会名ごとに最も類似度の高いfreee取引先を返す
+
+        Args:
+            queries: list[str] - 照会名
+            threshold: float - スコア閾値（0-1）
+            top_k: int - 照会名ごとに採点する最大件数（上限値の大きい順。None は打ち切り条件まで）
+            stats: dict - 集計値の加算先（省略可）
+                - fuzzy_searches: 類似度マッチングを行った照会名の数
+                - fuzzy_comparisons: SequenceMatcher で採点した組の数
+
+        Returns:
+            dict[str, dict | None] - 照会名 → {'name': 候補名, 'score': スコア}（閾値未満は None）
+        """
+        results = {}
+        comparisons = 0
+
+        if not self.names or threshold <= 0:
+            # 閾値が0以下の場合は全件が候補になるため、行列積での絞り込みは行わない
+            for query in queries:
+                scored = [
+                    (SequenceMatcher(None, query, name).ratio(), -self._order[idx], idx)
+                    for idx, name in enumerate(self.names)
+                ]
+                comparisons += len(scored)
+                best = max(scored, default=None)
+                results[query] = (
+                    {'name': self.names[best[2]], 'score': best[0]}
+                    if best and best[0] >= threshold else None
+                )
+        else:
+            block_rows = max(1, self.block_cells // len(self.names))
+            for start in range(0, len(queries), block_rows):
+                block = queries[start:start + block_rows]
+                for query, (match, count) in zip(block, self._match_block(block, threshold, top_k)):
+                    results[query] = match
+                    comparisons += count
+
+        if stats is not None:
+            stats['fuzzy_searches'] = stats.get('fuzzy_searches', 0) + len(queries)
+            stats['fuzzy_comparisons'] = stats.get('fuzzy_comparisons', 0) + comparisons
+
+        return results
+
+    def _match_block(self, queries: list[str], threshold: float, top_k):
+        """照会名のまとまりを1回の行列積で絞り込み、採点する
+
+        Yields:
+            tuple: ({'name', 'score'} | None, 採点した組の数)
+        """
+        common = (self._vectorize(queries, grow=False) @ self._matrix).toarray()
+
+        for query, common_row in zip(queries, common):
+            # 上限値は1行ずつ計算する（ブロック全体の float64 の一時配列を作らない）
+            row = 2.0 * common_row / (len(query) + self._lengths)
+            shortlist = np.flatnonzero(row >= threshold)
+            # 上限値の大きい順（同じ値は番号順。同点の候補は打ち切らずに採点するため並びは結果に影響しない）
+            shortlist = shortlist[np.argsort(-row[shortlist], kind='stable')]
+            if top_k is not None:
+                shortlist = shortlist[:top_k]
+
+            best_score = -1.0
+            best_idx = None
+            count = 0
+            for idx in shortlist.tolist():
+                # 残りの上限値が最高スコアに届かなければ打ち切る（同点は優先順の小さい方を選ぶため続ける）
+                if row[idx] < best_score:
+                    break
+                score = SequenceMatcher(None, query, self.names[idx]).ratio()
+                count += 1
+                if score > best_score or (score == best_score and self._order[idx] < self._order[best_idx]):
+                    best_score = score
+                    best_idx = idx
+
+            if best_idx is not None and best_score >= threshold:
+                yield {'name': self.names[best_idx], 'score': best_score}, count
+            else:
+                yield None, count
+
+    def _vectorize(self, names: list[str], grow: bool):
+        """名前リストを (名前 × 特徴量) の疎行列にする
+
+        Args:
+            names: list[str]
+            grow: bool - 未知の特徴量を追加するか（照会名では追加せず無視する）
+
+        Returns:
+            csr_matrix
+        """
+        rows = []
+        cols = []
+        for row, name in enumerate(names):
+            for char, count in Counter(name).items():
+                for occurrence in range(1, count + 1):
+                    feature = (char, occurrence)
+                    col = self._features.get(feature)
+                    if col is None:
+                        if not grow:
+                            continue
+                        col = self._features[feature] = len(self._features)
+                    rows.append(row)
+                    cols.append(col)
+
+        data = np.ones(len(rows), dtype=np.int32)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(names), len(self._features)))
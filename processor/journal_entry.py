@@ -0,0 +1,174 @@
+"""
+processor/journal_entry.py - 仕訳1行分のデータを保持するクラス
+"""
+
+from collections.abc import MutableMapping
+from operator import attrgetter
+
+
+class JournalEntry(MutableMapping):
+    """仕訳1行分のデータ（Reader → Processor → Exporter で受け渡す行データ）
+
+    よく使う列は __slots__ の属性（entry.借方部門 など、キー名 = 属性名）として保持し、
+    行ごとに辞書を持たないため1行あたりのメモリが小さい。
+    それ以外の列（CSVの追加列など）は必要な場合だけ _extra の辞書に保持する。
+
+    dict と同じ操作（data['日付']、data.get()、'候補' in data、data.items() など）もできるため、
+    list[dict] を前提にしたコードはそのまま使える。
+    未設定の属性は「キーがない」状態として扱う。
+    """
+
+    # 属性として保持する列（キー名 = 属性名）
+    FIELDS = (
+        '日付', '伝票番号',
+        '借方勘定科目', '借方取引先', '借方部門', '借方金額', '借方税区分',
+        '貸方勘定科目', '貸方取引先', '貸方部門', '貸方金額', '貸方税区分',
+        '摘要', '金額', '_errors', '候補',
+        '借方取引先_match_type', '貸方取引先_match_type',
+    )
+
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, data=None):
+        """
+        Args:
+            data: Mapping - 初期値（省略時は空）
+        """
+        self._extra = None
+        if data:
+            for key, value in data.items():
+                self[key] = value
+
+    @classmethod
+    def from_columns(cls, table: dict) -> list:
+        """列ごとの値のリストから行データのリストを作成する
+
+        Args:
+            table: dict - {列名: 値のリスト}（全列同じ長さ）
+
+        Returns:
+            list[JournalEntry]
+        """
+        columns = list(table.keys())
+        extra_columns = [col for col in columns if col not in _FIELD_SET]
+
+        # 属性への書き込みは slot のディスクリプタを直接使う
+        setters = [_SLOT_SETTERS[col] for col in columns if col in _FIELD_SET]
+        field_values = [table[col] for col in columns if col in _FIELD_SET]
+
+        entries = [cls.__new__(cls) for _ in range(len(next(iter(table.values()), [])))]
+        for setter, values in zip(setters, field_values):
+            for entry, value in zip(entries, values):
+                setter(entry, value)
+
+        if extra_columns:
+            for entry, values in zip(entries, zip(*(table[col] for col in extra_columns))):
+                entry._extra = dict(zip(extra_columns, values))
+        else:
+            for entry in entries:
+                entry._extra = None
+
+        return entries
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        else:
+            if self._extra is None:
+                raise KeyError(key)
+            del self._extra[key]
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for key in self.FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"JournalEntry({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self._extra = None
+        for key, value in state.items():
+            self[key] = value
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def copy(self):
+        """浅いコピーを返す（dict.copy() と同じ）"""
+        return JournalEntry(self)
+
+    def to_dict(self) -> dict:
+        """dict に変換する
+
+        Returns:
+            dict - {列名: 値}
+        """
+        try:
+            # 全属性が設定済み（通常の処理後の行）なら1回でまとめて取得
+            data = dict(zip(self.FIELDS, _get_all_fields(self)))
+        except AttributeError:
+            data = {key: getattr(self, key) for key in self.FIELDS if hasattr(self, key)}
+
+        if self._extra:
+            data.update(self._extra)
+
+        return data
+
+
+_FIELD_SET = frozenset(JournalEntry.FIELDS)
+_get_all_fields = attrgetter(*JournalEntry.FIELDS)
+_SLOT_SETTERS = {field: getattr(JournalEntry, field).__set__ for field in JournalEntry.FIELDS}
+
+
+def as_entries(data_list) -> list:
+    """データリストを JournalEntry のリストにそろえる（dict の行は変換する）
+
+    Args:
+        data_list: list[dict | JournalEntry]
+
+    Returns:
+        list[JournalEntry] - すでに JournalEntry の場合は同じリストを返す
+    """
+    if all(type(data) is JournalEntry for data in data_list):
+        return data_list
+
+    return [data if type(data) is JournalEntry else JournalEntry(data) for data in data_list]
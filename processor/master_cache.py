@@ -0,0 +1,148 @@
+"""
+processor/master_cache.py - マスタファイルのコンパイル済みスナップショットを管理するクラス
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+
+# スナップショットの既定の保存先
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "streamlit_converter" / "master_cache"
+
+
+def file_hash(file_path) -> str:
+    """ファイル内容のハッシュ値（SHA-256）を計算する
+
+    Args:
+        file_path: str | Path - 対象ファイルのパス
+
+    Returns:
+        str - 16進数のハッシュ値
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MasterCache:
+    """マスタファイル（dept_mapping.xlsx / partner_list.xlsx / freee取引先CSV）の
+    コンパイル済みデータをディスクに保存・読み込みするクラス
+
+    キーは「種類 + 元ファイルの内容ハッシュ」のため、元ファイルが変わると自動的に作り直される。
+    2回目以降は pd.read_excel / pd.read_csv を行わず、pickle から辞書・リスト・インデックスを復元する。
+    updater を指定した場合は、同じ種類で最後に使ったスナップショットを差分で更新して作り直す。
+    """
+
+    # スナップショットの形式バージョン（コンパイル結果の構造を変えたら上げる）
+    FORMAT_VERSION = 5
+
+    def __init__(self, cache_dir=None):
+        """
+        Args:
+            cache_dir: str | Path - スナップショットの保存先（省略時は一時ディレクトリ配下）
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def load(self, kind: str, source_path, compiler, updater=None) -> dict:
+        """コンパイル済みデータを取得する（なければコンパイルして保存）
+
+        Args:
+            kind: str - マスタの種類（'dept_mapping', 'partner_list', 'freee_csv' など）
+            source_path: str | Path - 元ファイルのパス
+            compiler: Callable[[str], dict] - 元ファイルからデータを作成する関数
+            updater: Callable[[dict, str], dict] - 前回のコンパイル済みデータと元ファイルから
+                データを作成する関数（任意。前回のデータがない・更新に失敗した場合は compiler を使う）
+
+        Returns:
+            dict - コンパイル済みデータ
+        """
+        snapshot_path = self.snapshot_path(kind, source_path)
+
+        if snapshot_path.exists():
+            try:
+                compiled = self._read(snapshot_path)
+                # 最終使用日時を更新（古いスナップショットから削除できるように）
+                os.utime(snapshot_path)
+                return compiled
+            except Exception:
+                # 壊れたスナップショットは作り直す
+                pass
+
+        compiled = None
+        if updater:
+            previous = self._latest(kind)
+            if previous is not None:
+                try:
+                    compiled = updater(previous, source_path)
+                except Exception:
+                    compiled = None
+
+        if compiled is None:
+            compiled = compiler(source_path)
+        self._save(snapshot_path, compiled)
+        return compiled
+
+    def snapshot_path(self, kind: str, source_path) -> Path:
+        """スナップショットの保存パスを返す
+
+        Args:
+            kind: str - マスタの種類
+            source_path: str | Path - 元ファイルのパス
+
+        Returns:
+            Path - スナップショットファイルのパス
+        """
+        return self.cache_dir / f"{kind}_v{self.FORMAT_VERSION}_{file_hash(source_path)}.pkl"
+
+    def _latest(self, kind: str):
+        """同じ種類・形式バージョンで最後に使われたスナップショットを読み込む
+
+        Args:
+            kind: str - マスタの種類
+
+        Returns:
+            dict | None - コンパイル済みデータ（なければ None）
+        """
+        candidates = []
+        for path in self.cache_dir.glob(f"{kind}_v{self.FORMAT_VERSION}_*.pkl"):
+            try:
+                candidates.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                # 別のセッションが削除した
+                continue
+
+        for _mtime, path in sorted(candidates, reverse=True):
+            try:
+                return self._read(path)
+            except Exception:
+                continue
+        return None
+
+    @staticmethod
+    def _read(snapshot_path: Path) -> dict:
+        """スナップショットを読み込む"""
+        with open(snapshot_path, "rb") as f:
+            return pickle.load(f)
+
+    def _save(self, snapshot_path: Path, compiled: dict):
+        """スナップショットを書き込む（一時ファイル経由で置き換え）
+
+        Args:
+            snapshot_path: Path - 保存先
+            compiled: dict - コンパイル済みデータ
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, snapshot_path)
+        except Exception:
+            # 保存に失敗しても処理は継続（次回もう一度コンパイルする）
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,162 @@
+"""
+processor/master_registry.py - プロセス全体で共有するマスタのレジストリ
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+
+from processor.dept_normalizer import DeptNormalizer
+from processor.partner_resolver import PartnerResolver
+from processor.master_cache import file_hash
+
+
+class MasterRegistry:
+    """DeptNormalizer / PartnerResolver のインスタンスをセッション間で共有するクラス
+
+    - 元ファイルの内容ハッシュをキーにインスタンスを保持し、同じ内容なら同じインスタンスを返す
+    - ファイルの更新日時・サイズが変わらない限りハッシュも再計算しない
+    - 内容が変わったファイルは新しいキーとして読み込み直す
+    - アップロードされたマスタなどの組み合わせは最大 max_entries 件まで保持し、
+      最も長く使われていないもの（古い内容のマスタを含む）から破棄する（LRU）
+    - 読み込み（ハッシュの計算・インスタンスの作成）はレジストリ全体のロックの外で行う。
+      同じキーを同時に要求したセッションは最初の読み込みの完了を待ち、別のキーは待たずに読み込める
+
+    返却するインスタンスは複数セッションで共有されるため、呼び出し側でマスタ
+    （dept_map / partner_map / freee_partners など）を書き換えないこと。
+    """
+
+    def __init__(self, master_cache=None, max_entries=16, fuzzy_cache=None):
+        """
+        Args:
+            master_cache: MasterCache - コンパイル済みマスタのキャッシュ（任意）
+            max_entries: int - 保持するインスタンスの最大数
+            fuzzy_cache: FuzzyMatchCache - 類似度マッチング結果の永続キャッシュ（任意）
+        """
+        self.master_cache = master_cache
+        self.fuzzy_cache = fuzzy_cache
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (種類, ハッシュ...) → インスタンス
+        self._file_hashes = OrderedDict()  # パス → ((更新日時, サイズ), ハッシュ)
+        self._loading = {}  # 読み込み中のキー → Future（同じキーの読み込みを1回にまとめる）
+        self._lock = threading.Lock()
+
+    def get_dept_normalizer(self, dept_mapping_path) -> DeptNormalizer:
+        """共有の DeptNormalizer を取得する
+
+        Args:
+            dept_mapping_path: str - dept_mapping.xlsx のパス
+
+        Returns:
+            DeptNormalizer
+        """
+        return self._get(
+            'dept_mapping',
+            [dept_mapping_path],
+            lambda: DeptNormalizer(str(dept_mapping_path), master_cache=self.master_cache)
+        )
+
+    def get_partner_resolver(self, partner_list_path, freee_csv_path) -> PartnerResolver:
+        """共有の PartnerResolver を取得する
+
+        Args:
+            partner_list_path: str - partner_list.xlsx のパス
+            freee_csv_path: str - freee取引先CSVのパス
+
+        Returns:
+            PartnerResolver
+        """
+        return self._get(
+            'partner_resolver',
+            [partner_list_path, freee_csv_path],
+            lambda: PartnerResolver(
+                str(partner_list_path), str(freee_csv_path), master_cache=self.master_cache,
+                fuzzy_cache=self.fuzzy_cache
+            )
+        )
+
+    def clear(self):
+        """保持しているインスタンスをすべて破棄する"""
+        with self._lock:
+            self._entries.clear()
+            self._file_hashes.clear()
+
+    def _get(self, kind: str, source_paths: list, factory):
+        """インスタンスを取得する（なければ作成して登録）
+
+        Args:
+            kind: str - マスタの種類
+            source_paths: list - 元ファイルのパス
+            factory: Callable[[], object] - インスタンスを作成する関数
+
+        Returns:
+            object - 共有インスタンス
+        """
+        key = (kind,) + tuple(self._file_hash(path) for path in source_paths)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            future = self._loading.get(key)
+            loading = future is None
+            if loading:
+                future = self._loading[key] = Future()
+
+        # 他のセッションが同じキーを読み込み中なら、その結果を待つ
+        if not loading:
+            return future.result()
+
+        try:
+            instance = factory()
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._loading[key]
+            self._entries[key] = instance
+
+            # 上限を超えたら最も長く使われていないものから破棄
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        future.set_result(instance)
+        return instance
+
+    def _file_hash(self, file_path) -> str:
+        """ファイルの内容ハッシュを取得する（更新日時・サイズが同じなら再計算しない）
+
+        Args:
+            file_path: str | Path - 対象ファイルのパス
+
+        Returns:
+            str - 内容ハッシュ
+        """
+        path = str(Path(file_path).resolve())
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._file_hashes.get(path)
+            if cached and cached[0] == signature:
+                self._file_hashes.move_to_end(path)
+                return cached[1]
+
+        # 大きなファイルのハッシュ計算中も他のセッションを止めないよう、ロックの外で計算する
+        digest = file_hash(path)
+
+        with self._lock:
+            self._file_hashes[path] = (signature, digest)
+            self._file_hashes.move_to_end(path)
+
+            # セッションごとの作業ディレクトリのパスが増え続けないよう、古いものから破棄
+            while len(self._file_hashes) > self.max_entries * 4:
+                self._file_hashes.popitem(last=False)
+
+        return digest
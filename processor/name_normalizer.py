@@ -0,0 +1,101 @@
+"""
+processor/name_normalizer.py - 取引先名の表記ゆれを吸収した照合キーを作成する
+"""
+
+import re
+import unicodedata
+
+
+# ひらがな → カタカナ（ぁ〜ゖ、ゝゞ）
+_KANA_TABLE = {code: code + 0x60 for code in range(0x3041, 0x3097)}
+_KANA_TABLE.update({0x309D: 0x30FD, 0x309E: 0x30FE})
+
+# 照合時に無視する文字（NFKC後の空白・中黒）
+_IGNORED_CHARS = {ord(char): None for char in ' \t\r\n\u00a0\u3000・'}
+
+# NFKC後に適用する変換表
+_FOLD_TABLE = str.maketrans({**_KANA_TABLE, **_IGNORED_CHARS})
+
+# 法人格（NFKC後の表記。㈱・（株）は (株) になる）
+LEGAL_FORMS = [
+    '株式会社', '有限会社', '合同会社', '合資会社', '合名会社',
+    '一般社団法人', '一般財団法人', '公益社団法人', '公益財団法人',
+    '医療法人社団', '医療法人財団', '医療法人', '社会福祉法人', '特定非営利活動法人',
+    '(株)', '(有)', '(同)', '(資)', '(名)', '(社)', '(財)', '(医)', '(福)',
+]
+
+_LEGAL_FORM_PATTERN = '|'.join(re.escape(form) for form in sorted(LEGAL_FORMS, key=len, reverse=True))
+_LEADING_LEGAL_FORMS = re.compile(f'^(?:{_LEGAL_FORM_PATTERN})+')
+_TRAILING_LEGAL_FORMS = re.compile(f'(?:{_LEGAL_FORM_PATTERN})+$')
+
+
+def normalize_partner_name(name: str) -> str:
+    """取引先名の照合キーを作成する
+
+    1. NFKC正規化（全角英数・半角カナ・㈱ などをそろえる）
+    2. ひらがなをカタカナに、英字を小文字にそろえる
+    3. 空白・中黒を除去
+    4. 先頭・末尾の法人格（株式会社・(株) など）を除去（除去すると空になる場合は残す）
+
+    Args:
+        name: str - 取引先名
+
+    Returns:
+        str - 照合キー
+    """
+    key = unicodedata.normalize('NFKC', name).translate(_FOLD_TABLE).lower()
+    stripped = _TRAILING_LEGAL_FORMS.sub('', _LEADING_LEGAL_FORMS.sub('', key))
+    return stripped or key
+
+
+def build_normalized_index(names_to_values, conflicts: dict = None) -> dict:
+    """照合キー → 値 の索引を作成する
+
+    異なる値が同じ照合キーになる場合（「株式会社ABC」と「ABC有限会社」など）は
+    どちらとも決められないため None を登録する。
+
+    Args:
+        names_to_values: Iterable[tuple[str, str]] - (名称, 一致した場合の値)
+        conflicts: dict - 指定すると、None を登録した照合キー → 値の集合 を記録する
+            （update_normalized_index で値を削除した際に、残った値を復元するため）
+
+    Returns:
+        dict[str, str | None]
+    """
+    index = {}
+    update_normalized_index(index, conflicts if conflicts is not None else {}, added=names_to_values)
+    return index
+
+
+def update_normalized_index(index: dict, conflicts: dict, added=(), removed=()):
+    """照合キーの索引に値を追加・削除する（build_normalized_index で作成した索引を差分で更新する）
+
+    値ごとに名称が1つの索引（freee取引先名 → freee取引先名 など）を前提とする。
+
+    Args:
+        index: dict[str, str | None] - 更新する索引
+        conflicts: dict[str, set] - 同じ照合キーになる値の集合（build_normalized_index で記録したもの）
+        added: Iterable[tuple[str, str]] - 追加する (名称, 値)
+        removed: Iterable[tuple[str, str]] - 削除する (名称, 値)
+    """
+    for name, value in removed:
+        key = normalize_partner_name(name)
+        if key in conflicts:
+            values = conflicts[key]
+            values.discard(value)
+            if len(values) == 1:
+                # 残りが1つになれば一致先として使える
+                index[key] = next(iter(values))
+                del conflicts[key]
+        elif index.get(key) == value:
+            del index[key]
+
+    for name, value in added:
+        key = normalize_partner_name(name)
+        if key in conflicts:
+            conflicts[key].add(value)
+        elif key in index and index[key] != value:
+            conflicts[key] = {index[key], value}
+            index[key] = None
+        else:
+            index[key] = value
@@ -2,9 +2,17 @@
 processor/partner_resolver.py - 取引先名を正規化・解決するクラス
 """
 
+import hashlib
+import importlib.util
+import threading
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from collections import Counter, OrderedDict
 from difflib import SequenceMatcher
+from processor.journal_entry import JournalEntry, as_entries
+from processor.name_normalizer import normalize_partner_name, build_normalized_index, update_normalized_index
+from reader.encoding_detector import read_csv
 
 
 class PartnerResolver:
@@ -13,18 +21,52 @@ class PartnerResolver:
     優先順位:
     1. partner_list.xlsx（固定リスト・最優先）
     2. freee取引先CSV（ユーザー提供）
-    3. 類似度マッチング（複数候補提示）
+    3. 表記ゆれ（全角半角・ひらがなカタカナ・空白・法人格）を無視した照合キーでの一致
+    4. 類似度マッチング（複数候補提示）
     """
     
-    def __init__(self, partner_list_path, freee_csv_path):
+    # 類似度マッチングのスコア閾値
+    FUZZY_THRESHOLD = 0.6
+    
+    # 類似度マッチングが必要な名称がこの数以上なら BatchFuzzyMatcher でまとめて照合する
+    BATCH_FUZZY_MIN_NAMES = 200
+    
+    # 解決済みキャッシュに保持する取引先名の最大数（インスタンスは MasterRegistry で全セッションに共有される）
+    RESOLUTION_CACHE_MAX_ENTRIES = 50_000
+    
+    # freee取引先CSVの差分更新を行う変更件数の上限（取引先数に対する割合。超える場合は作り直す）
+    INCREMENTAL_MAX_CHANGE_RATIO = 0.5
+    
+    def __init__(self, partner_list_path, freee_csv_path, master_cache=None,
+                 batch_fuzzy_min_names=BATCH_FUZZY_MIN_NAMES, fuzzy_cache=None,
+                 resolution_cache_max_entries=RESOLUTION_CACHE_MAX_ENTRIES):
         """
         Args:
             partner_list_path: str - partner_list.xlsx のパス
             freee_csv_path: str - freee取引先CSV（UTF-8/CP932/Shift-JIS）のパス
+            master_cache: MasterCache - コンパイル済みマスタのキャッシュ（省略時は毎回読み込む）
+            batch_fuzzy_min_names: int - まとめて照合する最小件数（None はまとめて照合しない。
+                scipy がインストールされていない場合も1件ずつ照合する）
+            fuzzy_cache: FuzzyMatchCache - 類似度マッチング結果の永続キャッシュ（省略時は毎回照合する）
+            resolution_cache_max_entries: int - 解決済みキャッシュに保持する取引先名の最大数
+                （超えたら最も長く使われていないものから破棄する）
         """
+        self.master_cache = master_cache
+        self.batch_fuzzy_min_names = batch_fuzzy_min_names
+        self.fuzzy_cache = fuzzy_cache
         self.partner_map = {}        # 固定リスト（最優先）
         self.freee_partners = []     # freee取引先リスト
         self.freee_partner_map = {}  # freee取引先マップ
+        self.normalized_partner_map = {}  # 照合キー → 固定リストの正式名称
+        self.normalized_freee_map = {}    # 照合キー → freee取引先名
+        self.freee_version = ''           # freee取引先リストの内容ハッシュ（永続キャッシュのキー）
+        self._char_index = {}        # 文字 → (取引先番号, 出現回数) の転置インデックス
+        self._partner_lengths = np.zeros(0, dtype=np.int32)  # freee取引先名の文字数
+        self._partner_order = np.zeros(0, dtype=np.int32)    # freee取引先のCSV上の順位（同点時の優先順）
+        self.resolution_cache_max_entries = resolution_cache_max_entries
+        self._resolution_cache = OrderedDict()  # 取引先名 → (match_type, 候補) の解決済みキャッシュ（LRU）
+        self._resolution_lock = threading.Lock()
+        self._batch_matcher = None   # BatchFuzzyMatcher（初めてまとめて照合する時点で作成）
         
         self._load_partner_list(partner_list_path)
         self._load_freee_csv(freee_csv_path)
@@ -36,125 +78,459 @@ class PartnerResolver:
         A: 元の名称, B: 正式名称
         """
         try:
-            df = pd.read_excel(partner_list_path, header=0)
-            
-            # 列名を取得
-            col1, col2 = df.columns[0], df.columns[1]
+            if self.master_cache:
+                compiled = self.master_cache.load('partner_list', partner_list_path, self._compile_partner_list)
+            else:
+                compiled = self._compile_partner_list(partner_list_path)
             
-            # マッピング辞書を作成
-            for _, row in df.iterrows():
-                original = str(row[col1]).strip()
-                formal = str(row[col2]).strip()
-                self.partner_map[original] = formal
+            self.partner_map = compiled['partner_map']
+            self.normalized_partner_map = compiled['normalized_partner_map']
         
         except Exception as e:
             raise Exception(f"取引先リストファイル読み込みエラー: {str(e)}")
     
+    @staticmethod
+    def _compile_partner_list(partner_list_path) -> dict:
+        """partner_list.xlsx からマッピング辞書を作成する
+        
+        Returns:
+            dict - {'partner_map': {元の名称: 正式名称}, 'normalized_partner_map': {照合キー: 正式名称}}
+        """
+        df = pd.read_excel(partner_list_path, header=0)
+        
+        # 最初の2列を列単位で文字列化
+        originals = [str(value).strip() for value in df.iloc[:, 0].tolist()]
+        formals = [str(value).strip() for value in df.iloc[:, 1].tolist()]
+        
+        partner_map = dict(zip(originals, formals))
+        
+        return {
+            'partner_map': partner_map,
+            'normalized_partner_map': build_normalized_index(partner_map.items()),
+        }
+    
     def _load_freee_csv(self, freee_csv_path):
         """freee取引先CSVを読み込む
         
         freee_csv_path:
         A列: 取引先名, Q列: ステータス
         ステータスが「使用しない」のものは除外
+        
+        master_cache があれば、前回のfreee取引先CSVのコンパイル結果との差分だけを反映する
         """
         try:
-            # UTF-8でCSVを読み込み（エンコーディング自動判定）
-            try:
-                df = pd.read_csv(freee_csv_path, encoding='utf-8', header=0)
-            except UnicodeDecodeError:
-                # UTF-8で失敗した場合はCP932を試行
-                try:
-                    df = pd.read_csv(freee_csv_path, encoding='cp932', header=0)
-                except UnicodeDecodeError:
-                    # それでも失敗したらShift-JISを試行
-                    df = pd.read_csv(freee_csv_path, encoding='shift_jis', header=0)
-            
-            # A列とQ列を取得
-            partner_col = df.columns[0]  # A列
-            status_col = df.columns[16] if len(df.columns) > 16 else None  # Q列（0から16=Q）
+            if self.master_cache:
+                compiled = self.master_cache.load(
+                    'freee_csv', freee_csv_path, self._compile_freee_csv, updater=self._update_freee_csv
+                )
+            else:
+                compiled = self._compile_freee_csv(freee_csv_path)
             
-            # データを処理
-            for _, row in df.iterrows():
-                partner_name = str(row[partner_col]).strip()
-                status = str(row[status_col]).strip() if status_col and status_col in df.columns else "使用"
-                
-                # ステータスが「使用しない」でないものを追加
-                if status != "使用しない":
-                    self.freee_partners.append(partner_name)
-                    self.freee_partner_map[partner_name] = partner_name
+            self.freee_partners = compiled['freee_partners']
+            self.freee_partner_map = compiled['freee_partner_map']
+            self.normalized_freee_map = compiled['normalized_freee_map']
+            self.freee_version = compiled['freee_version']
+            self._char_index = compiled['char_index']
+            self._partner_lengths = compiled['partner_lengths']
+            self._partner_order = compiled['partner_order']
         
         except Exception as e:
             raise Exception(f"freee取引先CSV読み込みエラー: {str(e)}")
     
-    def resolve(self, data_list: list[dict]) -> list[dict]:
+    @classmethod
+    def _compile_freee_csv(cls, freee_csv_path) -> dict:
+        """freee取引先CSVから取引先リスト・マップ・類似度マッチング用インデックスを作成する
+        
+        Returns:
+            dict - _compile_freee_statuses を参照
+        """
+        return cls._compile_freee_statuses(cls._read_freee_statuses(freee_csv_path))
+    
+    @staticmethod
+    def _read_freee_statuses(freee_csv_path) -> dict:
+        """freee取引先CSVから取引先名ごとのステータス（Q列）を読み込む
+        
+        同じ取引先名が複数行ある場合は、「使用しない」以外の行のステータスを優先する
+        
+        Returns:
+            dict[str, str] - 取引先名 → ステータス（CSVでの出現順）
+        """
+        # 文字コードを先頭部分で判定し、1回だけ読み込む
+        df = read_csv(freee_csv_path, header=0)
+        
+        # A列とQ列を列単位で文字列化
+        partner_names = [str(value).strip() for value in df.iloc[:, 0].tolist()]
+        if len(df.columns) > 16:  # Q列（0から16=Q）
+            statuses = [str(value).strip() for value in df.iloc[:, 16].tolist()]
+        else:
+            statuses = ["使用"] * len(partner_names)
+        
+        freee_statuses = {}
+        for partner_name, status in zip(partner_names, statuses):
+            if freee_statuses.get(partner_name, "使用しない") == "使用しない":
+                freee_statuses[partner_name] = status
+        
+        return freee_statuses
+    
+    @classmethod
+    def _compile_freee_statuses(cls, freee_statuses: dict) -> dict:
+        """取引先名ごとのステータスから取引先リスト・マップ・類似度マッチング用インデックスを作成する
+        
+        Args:
+            freee_statuses: dict[str, str] - 取引先名 → ステータス
+        
+        Returns:
+            dict - freee_partners, freee_partner_map, normalized_freee_map, normalized_freee_conflicts,
+                freee_version, char_index, partner_lengths, partner_order
+        """
+        # ステータスが「使用しない」でないものを追加
+        freee_partners = [
+            partner_name for partner_name, status in freee_statuses.items()
+            if status != "使用しない"
+        ]
+        
+        # 類似度マッチング用のインデックスを構築
+        char_index, partner_lengths = cls._build_char_index(freee_partners)
+        partner_order = np.arange(len(freee_partners), dtype=np.int32)
+        
+        normalized_freee_conflicts = {}
+        normalized_freee_map = build_normalized_index(
+            ((partner_name, partner_name) for partner_name in freee_partners),
+            conflicts=normalized_freee_conflicts
+        )
+        
+        return {
+            'freee_partners': freee_partners,
+            'freee_partner_map': {partner_name: partner_name for partner_name in freee_partners},
+            'normalized_freee_map': normalized_freee_map,
+            'normalized_freee_conflicts': normalized_freee_conflicts,
+            'freee_version': _freee_version(freee_partners, partner_order),
+            'char_index': char_index,
+            'partner_lengths': partner_lengths,
+            'partner_order': partner_order,
+        }
+    
+    @classmethod
+    def _update_freee_csv(cls, previous: dict, freee_csv_path) -> dict:
+        """前回のコンパイル結果に、freee取引先CSVとの差分だけを反映する
+        
+        取引先名とステータス（Q列）で前回のCSVと比較し、追加された取引先・削除された取引先・
+        「使用しない」に変わった取引先だけを、リスト・マップ・照合キー・類似度インデックスに反映する。
+        変更が多い場合（INCREMENTAL_MAX_CHANGE_RATIO を超える場合）は作り直す。
+        
+        削除した取引先の位置にはリスト末尾の取引先を移すため、取引先リストの順序は
+        CSVの順序と異なる場合がある。CSV上の順位は partner_order に持ち、同じスコアの候補の優先順と
+        freee_version はこの順位で決めるため、照合結果はCSVを最初からコンパイルした場合と同じになる。
+        
+        Args:
+            previous: dict - 前回のコンパイル結果（書き換えて返す）
+            freee_csv_path: str - freee取引先CSVのパス
+        
+        Returns:
+            dict - コンパイル結果（_compile_freee_statuses と同じ構造）
+        """
+        freee_statuses = cls._read_freee_statuses(freee_csv_path)
+        
+        previous_partners = previous['freee_partner_map']
+        current_partners = [
+            partner_name for partner_name, status in freee_statuses.items()
+            if status != "使用しない"
+        ]
+        added = [partner_name for partner_name in current_partners if partner_name not in previous_partners]
+        current_set = set(current_partners)
+        removed = [partner_name for partner_name in previous['freee_partners'] if partner_name not in current_set]
+        
+        if len(added) + len(removed) > len(current_partners) * cls.INCREMENTAL_MAX_CHANGE_RATIO:
+            return cls._compile_freee_statuses(freee_statuses)
+        
+        freee_partners = previous['freee_partners']
+        freee_partner_map = previous['freee_partner_map']
+        char_index = previous['char_index']
+        partner_lengths = previous['partner_lengths'].tolist()
+        positions = {partner_name: idx for idx, partner_name in enumerate(freee_partners)}
+        
+        # 1. 削除（リスト末尾の取引先を削除した位置に移し、番号を詰める）
+        for partner_name in removed:
+            idx = positions.pop(partner_name)
+            last_idx = len(freee_partners) - 1
+            cls._remove_postings(char_index, partner_name, idx)
+            
+            if idx != last_idx:
+                last_name = freee_partners[last_idx]
+                for char in set(last_name):
+                    idx_array = char_index[char][0]
+                    idx_array[idx_array == last_idx] = idx
+                freee_partners[idx] = last_name
+                partner_lengths[idx] = partner_lengths[last_idx]
+                positions[last_name] = idx
+            
+            freee_partners.pop()
+            partner_lengths.pop()
+            del freee_partner_map[partner_name]
+        
+        # 2. 追加（リスト末尾に追加し、文字ごとの転置インデックスにまとめて追記）
+        additions = {}
+        for partner_name in added:
+            idx = len(freee_partners)
+            freee_partners.append(partner_name)
+            partner_lengths.append(len(partner_name))
+            freee_partner_map[partner_name] = partner_name
+            for char, count in Counter(partner_name).items():
+                idx_list, count_list = additions.setdefault(char, ([], []))
+                idx_list.append(idx)
+                count_list.append(count)
+        
+        for char, (idx_list, count_list) in additions.items():
+            empty = np.zeros(0, dtype=np.int32)
+            idx_array, count_array = char_index.get(char, (empty, empty))
+            char_index[char] = (
+                np.concatenate([idx_array, np.array(idx_list, dtype=np.int32)]),
+                np.concatenate([count_array, np.array(count_list, dtype=np.int32)]),
+            )
+        
+        # 3. 照合キー
+        update_normalized_index(
+            previous['normalized_freee_map'],
+            previous['normalized_freee_conflicts'],
+            added=((partner_name, partner_name) for partner_name in added),
+            removed=((partner_name, partner_name) for partner_name in removed),
+        )
+        
+        # 4. CSV上の順位（全件の辞書検索のみで、名前の解析やインデックスの作り直しは行わない）
+        csv_positions = {partner_name: position for position, partner_name in enumerate(current_partners)}
+        partner_order = np.array([csv_positions[partner_name] for partner_name in freee_partners], dtype=np.int32)
+        
+        previous['freee_version'] = _freee_version(freee_partners, partner_order)
+        previous['partner_lengths'] = np.array(partner_lengths, dtype=np.int32)
+        previous['partner_order'] = partner_order
+        
+        return previous
+    
+    @staticmethod
+    def _remove_postings(char_index: dict, partner_name: str, idx: int):
+        """転置インデックスから取引先番号 idx を削除する
+        
+        Args:
+            char_index: dict - 文字 → (取引先番号配列, 出現回数配列)
+            partner_name: str - 削除する取引先名
+            idx: int - 削除する取引先番号
+        """
+        for char in set(partner_name):
+            idx_array, count_array = char_index[char]
+            keep = idx_array != idx
+            if keep.any():
+                char_index[char] = (idx_array[keep], count_array[keep])
+            else:
+                del char_index[char]
+    
+    @staticmethod
+    def _build_char_index(freee_partners: list[str]) -> tuple[dict, np.ndarray]:
+        """freee取引先の文字単位（1-gram）の転置インデックスを構築する
+        
+        文字ごとに、その文字を含む取引先番号と出現回数を配列で保持する
+        
+        Args:
+            freee_partners: list[str] - freee取引先リスト
+        
+        Returns:
+            tuple: (文字 → (取引先番号配列, 出現回数配列), 取引先名の文字数配列)
+        """
+        postings = {}
+        for idx, freee_partner in enumerate(freee_partners):
+            for char, count in Counter(freee_partner).items():
+                idx_list, count_list = postings.setdefault(char, ([], []))
+                idx_list.append(idx)
+                count_list.append(count)
+        
+        char_index = {
+            char: (np.array(idx_list, dtype=np.int32), np.array(count_list, dtype=np.int32))
+            for char, (idx_list, count_list) in postings.items()
+        }
+        partner_lengths = np.array(
+            [len(freee_partner) for freee_partner in freee_partners], dtype=np.int32
+        )
+        
+        return char_index, partner_lengths
+    
+    def resolve(self, data_list: list[dict], stats: dict = None) -> list[JournalEntry]:
         """取引先名を解決する
         
+        全行から一意の取引先名を集め、1つの名称につき1回だけ照合してから
+        match_type・候補を各行に書き戻す（解決結果は解決済みキャッシュに残るため、
+        同じインスタンスで処理する後続のファイル・chunk でも照合し直さない）
+        
         Args:
-            data_list: list[dict] - 検証済みデータリスト
+            data_list: list[dict | JournalEntry] - 検証済みデータリスト
+            stats: dict - 集計値の加算先（省略可）
+                - names: 行から参照した取引先名の数（借方・貸方）
+                - unique_names: 一意の取引先名の数
+                - cache_hits / cache_misses: 解決済みキャッシュのヒット・ミス数
+                - normalized_hits: 照合キーで一致した取引先名の数
+                - fuzzy_cache_hits: 類似度マッチングの結果を永続キャッシュから取得した取引先名の数
+                - fuzzy_searches: 類似度マッチングを行った取引先名の数
+                - fuzzy_comparisons: 類似度を計算したfreee取引先の数
         
         Returns:
-            list[dict] - 取引先解決済みデータリスト
+            list[JournalEntry] - 取引先解決済みデータリスト
         """
+        data_list = as_entries(data_list)
+        
+        # 1. 空欄コピー処理（最初に実行）し、一意の取引先名を収集
+        rows = []
+        unique_names = set()
         for data in data_list:
-            # 1. 空欄コピー処理（最初に実行）
-            borrow_partner = data.get('借方取引先', '').strip()
-            lend_partner = data.get('貸方取引先', '').strip()
+            borrow_partner, lend_partner = self._fill_blank_partner(data)
+            rows.append((data, borrow_partner, lend_partner))
+            unique_names.add(borrow_partner)
+            unique_names.add(lend_partner)
+        
+        if stats is not None:
+            stats['names'] = stats.get('names', 0) + len(rows) * 2
+        
+        # 2. 一意の取引先名だけを解決（元の名称は変更しない）
+        resolved = self.resolve_names(unique_names, stats)
+        
+        # 3. 解決結果を各行に書き戻す
+        for data, borrow_partner, lend_partner in rows:
+            borrow_match_type, borrow_candidate = resolved[borrow_partner]
+            lend_match_type, lend_candidate = resolved[lend_partner]
             
-            if not borrow_partner and lend_partner:
-                # 借方が空欄 → 貸方をコピー
-                data['借方取引先'] = lend_partner
-                borrow_partner = lend_partner
-            elif not lend_partner and borrow_partner:
-                # 貸方が空欄 → 借方をコピー
-                data['貸方取引先'] = borrow_partner
-                lend_partner = borrow_partner
+            data.借方取引先_match_type = borrow_match_type  # 色付け用
+            data.貸方取引先_match_type = lend_match_type    # 色付け用
             
             # 候補列を初期化
-            if '候補' not in data:
-                data['候補'] = ''
-            
-            # 2. 借方取引先の解決（元の名称は変更しない）
-            borrow_match_type = 'none'
-            borrow_candidate = ''
-            if borrow_partner:
-                borrow_match_type, borrow_candidate = self._resolve_partner(borrow_partner)
-                data['借方取引先_match_type'] = borrow_match_type  # 色付け用
-            else:
-                data['借方取引先_match_type'] = 'none'
-            
-            # 3. 貸方取引先の解決（元の名称は変更しない）
-            lend_match_type = 'none'
-            lend_candidate = ''
-            if lend_partner:
-                lend_match_type, lend_candidate = self._resolve_partner(lend_partner)
-                data['貸方取引先_match_type'] = lend_match_type  # 色付け用
-            else:
-                data['貸方取引先_match_type'] = 'none'
+            if not hasattr(data, '候補'):
+                data.候補 = ''
             
-            # 4. 候補列は1つだけ（重複排除）
+            # 候補列は1つだけ（重複排除）
             if borrow_candidate and lend_candidate:
                 # 両方に候補がある場合、同じなら1つだけ、異なれば両方
                 if borrow_candidate == lend_candidate:
-                    data['候補'] = borrow_candidate
+                    data.候補 = borrow_candidate
                 else:
-                    data['候補'] = f"{borrow_candidate} / {lend_candidate}"
+                    data.候補 = f"{borrow_candidate} / {lend_candidate}"
             elif borrow_candidate:
-                data['候補'] = borrow_candidate
+                data.候補 = borrow_candidate
             elif lend_candidate:
-                data['候補'] = lend_candidate
+                data.候補 = lend_candidate
         
         return data_list
     
-    def _resolve_partner(self, partner_name: str) -> tuple[str, str]:
-        """取引先名を解決する
+    def resolve_names(self, partner_names, stats: dict = None) -> dict[str, tuple[str, str]]:
+        """取引先名の集合をまとめて解決する
+        
+        解決済みの名称はインスタンス内に保持し、同じ名称を再度照合しない
+        （最大 resolution_cache_max_entries 件。最も長く使われていないものから破棄する）。
+        完全一致・照合キーで解決できなかった名称は、最後にまとめて類似度マッチングする
+        
+        Args:
+            partner_names: Iterable[str] - 取引先名（空文字は 'none' 扱い）
+            stats: dict - 集計値の加算先（resolve を参照）
+        
+        Returns:
+            dict[str, tuple[str, str]] - 取引先名 → (match_type, candidate_name)
+                - match_type: 'partner_list', 'freee_exact', 'normalized', 'fuzzy', 'none'
+                - candidate_name: 候補名（normalized・fuzzyの場合のみ）
+        """
+        if stats is None:
+            stats = {}
+        
+        partner_names = list(partner_names)
+        results = self._cached_resolutions(partner_names)
+        cache_hits = len(results)
+        
+        resolved_now = {}
+        unresolved = []
+        for partner_name in partner_names:
+            if partner_name in results or partner_name in resolved_now:
+                continue
+            if not partner_name:
+                resolved_now[partner_name] = ('none', '')
+                continue
+            resolved = self._resolve_exact(partner_name, stats)
+            if resolved:
+                resolved_now[partner_name] = resolved
+            else:
+                unresolved.append(partner_name)
+        
+        # 類似度マッチング（件数が多ければまとめて行う）
+        if unresolved:
+            unresolved = list(dict.fromkeys(unresolved))
+            resolved_now.update(self._resolve_fuzzy(unresolved, stats))
+        
+        self._store_resolutions(resolved_now)
+        results.update(resolved_now)
+        results = {partner_name: results[partner_name] for partner_name in partner_names}
+        
+        stats['unique_names'] = stats.get('unique_names', 0) + len(results)
+        stats['cache_hits'] = stats.get('cache_hits', 0) + cache_hits
+        stats['cache_misses'] = stats.get('cache_misses', 0) + len(results) - cache_hits
+        
+        return results
+    
+    def _cached_resolutions(self, partner_names: list[str]) -> dict:
+        """解決済みキャッシュから取引先名の解決結果を取得する（見つかったものは最近使ったものとして記録）
+        
+        Args:
+            partner_names: list[str] - 取引先名
+        
+        Returns:
+            dict[str, tuple[str, str]] - キャッシュにあった取引先名 → (match_type, candidate_name)
+        """
+        found = {}
+        with self._resolution_lock:
+            for partner_name in partner_names:
+                resolved = self._resolution_cache.get(partner_name)
+                if resolved is not None:
+                    self._resolution_cache.move_to_end(partner_name)
+                    found[partner_name] = resolved
+        return found
+    
+    def _store_resolutions(self, resolutions: dict):
+        """解決結果を解決済みキャッシュに登録する（上限を超えたら最も長く使われていないものから破棄）
+        
+        Args:
+            resolutions: dict[str, tuple[str, str]] - 取引先名 → (match_type, candidate_name)
+        """
+        with self._resolution_lock:
+            self._resolution_cache.update(resolutions)
+            for partner_name in resolutions:
+                self._resolution_cache.move_to_end(partner_name)
+            while len(self._resolution_cache) > self.resolution_cache_max_entries:
+                self._resolution_cache.popitem(last=False)
+    
+    def _fill_blank_partner(self, data: JournalEntry) -> tuple[str, str]:
+        """借方・貸方の一方が空欄の場合、もう一方の取引先をコピーする
+        
+        Args:
+            data: JournalEntry - データ行
+        
+        Returns:
+            tuple: (借方取引先, 貸方取引先) - 前後の空白を除去した名称
+        """
+        borrow_partner = getattr(data, '借方取引先', '').strip()
+        lend_partner = getattr(data, '貸方取引先', '').strip()
+        
+        if not borrow_partner and lend_partner:
+            # 借方が空欄 → 貸方をコピー
+            data.借方取引先 = lend_partner
+            borrow_partner = lend_partner
+        elif not lend_partner and borrow_partner:
+            # 貸方が空欄 → 借方をコピー
+            data.貸方取引先 = borrow_partner
+            lend_partner = borrow_partner
+        
+        return borrow_partner, lend_partner
+    
+    def _resolve_exact(self, partner_name: str, stats: dict = None):
+        """完全一致・照合キーで取引先名を解決する
         
         Args:
             partner_name: str - 解決対象の取引先名
+            stats: dict - 集計値の加算先（省略可）
         
         Returns:
-            tuple: (match_type, candidate_name)
-                - match_type: 'partner_list', 'freee_exact', 'fuzzy', 'none'
-                - candidate_name: 候補名（fuzzyの場合のみ）
+            tuple | None: (match_type, candidate_name)。一致しなければ None
         """
         # 1. 固定リストで完全一致（半角全角・スペース区別）
         if partner_name in self.partner_map:
@@ -164,44 +540,134 @@ class PartnerResolver:
         if partner_name in self.freee_partner_map:
             return 'freee_exact', ''
         
-        # 3. 類似度マッチング
-        candidates = self._fuzzy_match(partner_name)
+        # 3. 照合キー（全角半角・ひらがなカタカナ・空白・法人格の違いを無視）で一致
+        key = normalize_partner_name(partner_name)
+        matched = self.normalized_partner_map.get(key) or self.normalized_freee_map.get(key)
+        if matched:
+            if stats is not None:
+                stats['normalized_hits'] = stats.get('normalized_hits', 0) + 1
+            return 'normalized', matched
+        
+        return None
+    
+    def _resolve_fuzzy(self, partner_names: list[str], stats: dict = None) -> dict[str, tuple[str, str]]:
+        """類似度マッチングで取引先名を解決する
+        
+        fuzzy_cache があれば、同じfreee取引先リストで照合済みの名称は保存済みの結果を使う。
+        残りが batch_fuzzy_min_names 件以上あれば BatchFuzzyMatcher で全件まとめて照合し、
+        それ以外は1件ずつ照合する（どちらも結果は同じ）
+        
+        Args:
+            partner_names: list[str] - 解決対象の取引先名（重複なし）
+            stats: dict - 集計値の加算先（省略可）
+                - fuzzy_cache_hits: 永続キャッシュから取得した取引先名の数
+        
+        Returns:
+            dict[str, tuple[str, str]] - 取引先名 → ('fuzzy', 最高スコアの候補名) または ('none', '')
+        """
+        # 永続キャッシュ（キーにスコア閾値も含め、閾値が変わった場合も照合し直す）
+        cache_version = f"{self.freee_version}@{self.FUZZY_THRESHOLD}"
+        matches = {}
+        if self.fuzzy_cache is not None:
+            matches = self.fuzzy_cache.get_many(cache_version, partner_names)
+            if stats is not None:
+                stats['fuzzy_cache_hits'] = stats.get('fuzzy_cache_hits', 0) + len(matches)
         
-        if candidates:
-            # 最高スコア候補の名前のみを返す
-            return 'fuzzy', candidates[0]['name']
+        remaining = [partner_name for partner_name in partner_names if partner_name not in matches]
+        computed = {}
+        
+        if (self.batch_fuzzy_min_names is not None
+                and len(remaining) >= self.batch_fuzzy_min_names and _has_scipy()):
+            if self._batch_matcher is None:
+                from processor.fuzzy_engine import BatchFuzzyMatcher
+                self._batch_matcher = BatchFuzzyMatcher(self.freee_partners, order=self._partner_order)
+            
+            for partner_name, match in self._batch_matcher.best_matches(
+                    remaining, threshold=self.FUZZY_THRESHOLD, stats=stats).items():
+                computed[partner_name] = (match['name'], match['score']) if match else ('', None)
         else:
-            return 'none', ''
+            for partner_name in remaining:
+                candidates = self._fuzzy_match(partner_name, threshold=self.FUZZY_THRESHOLD, stats=stats)
+                # 最高スコア候補の名前のみを使う
+                computed[partner_name] = (
+                    (candidates[0]['name'], candidates[0]['score']) if candidates else ('', None)
+                )
+        
+        if self.fuzzy_cache is not None:
+            self.fuzzy_cache.put_many(cache_version, computed)
+        matches.update(computed)
+        
+        return {
+            partner_name: ('fuzzy', candidate) if candidate else ('none', '')
+            for partner_name, (candidate, _score) in matches.items()
+        }
     
-    def _fuzzy_match(self, partner_name: str, threshold=0.6, max_candidates=1) -> list[dict]:
+    def _fuzzy_match(self, partner_name: str, threshold=0.6, max_candidates=1, stats: dict = None) -> list[dict]:
         """類似度マッチングで取引先候補を検索
         
         Args:
             partner_name: str - 検索対象の取引先名
             threshold: float - スコア閾値（0-1）
             max_candidates: int - 最大候補数（デフォルト1）
+            stats: dict - 集計値の加算先（省略可）
         
         Returns:
-            list[dict] - 候補リスト（スコア降順）
+            list[dict] - 候補リスト（スコア降順。同じスコアはfreee取引先CSVの順）
                 [{'name': '...',  'score': 0.95}]
         """
-        candidates = []
+        scored = []
+        shortlist = self._shortlist_candidates(partner_name, threshold)
         
-        # freee取引先すべてとの類似度を計算
-        for freee_partner in self.freee_partners:
+        if stats is not None:
+            stats['fuzzy_searches'] = stats.get('fuzzy_searches', 0) + 1
+            stats['fuzzy_comparisons'] = stats.get('fuzzy_comparisons', 0) + len(shortlist)
+        
+        # インデックスで絞り込んだfreee取引先との類似度を計算
+        for idx in shortlist:
+            freee_partner = self.freee_partners[idx]
             score = self._calculate_similarity(partner_name, freee_partner)
             
             if score >= threshold:
-                candidates.append({
-                    'name': freee_partner,
-                    'score': score
-                })
+                scored.append((score, idx))
         
-        # スコア降順でソート
-        candidates.sort(key=lambda x: x['score'], reverse=True)
+        # スコア降順でソート（同じスコアはCSV上の順位順）
+        scored.sort(key=lambda item: (-item[0], self._partner_order[item[1]]))
         
         # 最大候補数までカット
-        return candidates[:max_candidates]
+        return [
+            {'name': self.freee_partners[idx], 'score': score}
+            for score, idx in scored[:max_candidates]
+        ]
+    
+    def _shortlist_candidates(self, partner_name: str, threshold: float) -> list[int]:
+        """類似度が閾値に届く可能性のあるfreee取引先の番号を返す
+        
+        SequenceMatcherの一致文字数は共通文字数（文字ごとの出現回数の最小値の合計）以下のため、
+        ratio <= 2 * 共通文字数 / (len1 + len2) が成り立つ。
+        この上限値が閾値に届かない取引先は採点しても候補にならないので除外する
+        （全件走査と同じ結果になる）。
+        
+        Args:
+            partner_name: str - 検索対象の取引先名
+            threshold: float - スコア閾値（0-1）
+        
+        Returns:
+            list[int] - freee_partners の番号（昇順）
+        """
+        if threshold <= 0:
+            return list(range(len(self.freee_partners)))
+        
+        # 取引先ごとの共通文字数を集計
+        common = np.zeros(len(self.freee_partners), dtype=np.int32)
+        for char, count in Counter(partner_name).items():
+            posting = self._char_index.get(char)
+            if posting is None:
+                continue
+            idx_array, count_array = posting
+            common[idx_array] += np.minimum(count_array, count)
+        
+        upper_bound = 2.0 * common / (len(partner_name) + self._partner_lengths)
+        return np.flatnonzero(upper_bound >= threshold).tolist()
     
     def _calculate_similarity(self, str1: str, str2: str) -> float:
         """2つの文字列の類似度を計算（0-1）
@@ -213,4 +679,25 @@ class PartnerResolver:
         Returns:
             float - 類似度スコア（0-1）
         """
-        return SequenceMatcher(None, str1, str2).ratio()
\ No newline at end of file
+        return SequenceMatcher(None, str1, str2).ratio()
+
+
+def _freee_version(freee_partners: list[str], partner_order: np.ndarray) -> str:
+    """freee取引先リストの内容ハッシュ（類似度マッチング結果の永続キャッシュのキー）
+    
+    差分更新後のリストの並びではなくCSV上の順位で並べてから計算するため、同じCSVなら
+    更新の履歴によらず同じ値になる（同点時の優先順も順位で決まるため、順位もキーに含める）
+    """
+    ordered = [freee_partners[idx] for idx in np.argsort(partner_order, kind='stable')]
+    return hashlib.sha256('\n'.join(ordered).encode('utf-8')).hexdigest()
+
+
+_scipy_available = None
+
+
+def _has_scipy() -> bool:
+    """scipy がインストールされているか（import はしない）"""
+    global _scipy_available
+    if _scipy_available is None:
+        _scipy_available = importlib.util.find_spec('scipy') is not None
+    return _scipy_available
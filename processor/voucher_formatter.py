@@ -111,6 +111,7 @@ processor/voucher_formatter.py - 伝票番号を整形するクラス
 
 from datetime import datetime
 from processor.config import DEPT_CODES, IMPORT_FORMAT_CODES
+from processor.journal_entry import JournalEntry, as_entries
 
 
 class VoucherFormatter:
@@ -137,33 +138,35 @@ class VoucherFormatter:
         if not self.import_code:
             raise ValueError(f"不正なインポート形式: {import_format}")
     
-    def format(self, data_list: list[dict]) -> list[dict]:
+    def format(self, data_list: list[dict]) -> list[JournalEntry]:
         """伝票番号を整形する
         
         Args:
-            data_list: list[dict] - 検証済みデータリスト
+            data_list: list[dict | JournalEntry] - 検証済みデータリスト
         
         Returns:
-            list[dict] - 伝票番号整形済みデータリスト
+            list[JournalEntry] - 伝票番号整形済みデータリスト
         """
+        data_list = as_entries(data_list)
+        
         for data in data_list:
             try:
                 # 生成用の情報を取得
-                date_str = data.get('日付', '')
-                voucher_num = data.get('伝票番号', '')
-                borrow_dept = data.get('借方部門', '本部')
+                date_str = getattr(data, '日付', '')
+                voucher_num = getattr(data, '伝票番号', '')
+                borrow_dept = getattr(data, '借方部門', '本部')
                 
                 # 伝票番号を生成
                 formatted_voucher = self._generate_voucher(
                     date_str, voucher_num, borrow_dept
                 )
                 
-                data['伝票番号'] = formatted_voucher
+                data.伝票番号 = formatted_voucher
             
             except Exception as e:
                 # エラーが発生した場合
                 self._add_error(data, str(e))
-                data['伝票番号'] = f"ERR_{data.get('伝票番号', 'UNKNOWN')}"
+                data.伝票番号 = f"ERR_{getattr(data, '伝票番号', 'UNKNOWN')}"
         
         return data_list
     
@@ -204,17 +207,17 @@ class VoucherFormatter:
         
         return formatted
     
-    def _add_error(self, data: dict, error_msg: str):
+    def _add_error(self, data: JournalEntry, error_msg: str):
         """エラーメッセージを_errorsに追記
         
         Args:
-            data: dict - データ行
+            data: JournalEntry - データ行
             error_msg: str - エラーメッセージ
         """
-        if '_errors' not in data:
-            data['_errors'] = []
+        errors = getattr(data, '_errors', [])
         
-        if isinstance(data['_errors'], str):
-            data['_errors'] = [data['_errors']] if data['_errors'] else []
+        if isinstance(errors, str):
+            errors = [errors] if errors else []
         
-        data['_errors'].append(f"伝票番号生成エラー: {error_msg}")
\ No newline at end of file
+        errors.append(f"伝票番号生成エラー: {error_msg}")
+        data._errors = errors
\ No newline at end of file
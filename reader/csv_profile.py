@@ -0,0 +1,53 @@
+"""
+reader/csv_profile.py - CSVの読み込み条件（読み込む列・型・パーサー）を定義するクラス
+"""
+
+class CSVParseProfile:
+    """CSV形式ごとの読み込み条件
+
+    - 読み込む列を required_columns + optional_columns に絞る（それ以外の列は解析しない）
+    - 全列を dtype（既定は文字列）で読み込み、pandas の型推論を行わない
+    - パーサーは既定で C パーサー（pandas の pyarrow パーサーは型推論した後に dtype へ変換するため、
+      '007' が '7.0' になるなど文字列のまま読み込めない。chunk単位の読み込みは常に C パーサー）
+    """
+
+    def __init__(self, required_columns, optional_columns=(), dtype=str, engine='c'):
+        """
+        Args:
+            required_columns: list[str] - 必須列
+            optional_columns: list[str] - あれば読み込む列
+            dtype: type - 全列の型
+            engine: str - 'c' / 'python' / 'pyarrow'
+        """
+        self.required_columns = list(required_columns)
+        self.optional_columns = list(optional_columns)
+        self.dtype = dtype
+        self.engine = engine
+        self._keep = set(self.required_columns) | set(self.optional_columns)
+
+    def usecols(self, header_columns) -> list:
+        """ヘッダーの列のうち、読み込む列を返す（ヘッダーの順序のまま）
+
+        Args:
+            header_columns: list[str] - CSVのヘッダー
+
+        Returns:
+            list[str]
+        """
+        return [col for col in header_columns if col in self._keep]
+
+    def read_options(self, header_columns, chunked=False) -> dict:
+        """pd.read_csv に渡す引数を返す
+
+        Args:
+            header_columns: list[str] - CSVのヘッダー
+            chunked: bool - chunksize を指定して読み込むか
+
+        Returns:
+            dict - usecols / dtype / engine
+        """
+        return {
+            'usecols': self.usecols(header_columns),
+            'dtype': self.dtype,
+            'engine': 'c' if chunked else self.engine,
+        }
@@ -0,0 +1,233 @@
+"""
+reader/encoding_detector.py - CSVの文字コードを先頭部分だけで判定する（全CSV読み込みで共有）
+"""
+
+import codecs
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from reader.input_source import iter_blocks, open_source
+
+
+# 判定を試す文字コード（この順に試す）
+CANDIDATE_ENCODINGS = ('utf-8', 'cp932', 'shift_jis')
+
+# BOM → 文字コード（pandas に渡すと BOM は取り除かれる）
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# 判定に使う非ASCII部分の大きさ（バイト）
+DEFAULT_SAMPLE_SIZE = 64 * 1024
+
+
+class EncodingDetector:
+    """CSVの文字コードを判定し、結果をファイルの内容ハッシュごとに保持するクラス
+
+    - BOM があれば BOM で判定する
+    - なければ最初の非ASCII文字を含む sample_size バイトだけを UTF-8 → CP932 → Shift-JIS の順に復号して判定する
+      （ASCIIだけの部分はどの文字コードでも復号できるため判定に使わない）
+    - ファイルパスの判定結果は内容ハッシュをキーに max_entries 件まで保持し、同じ内容のファイルは判定しない
+      （更新日時・サイズが変わらない限りハッシュも再計算しない）
+    - メモリ上の内容（bytes）は保持しない（全体のハッシュ計算は先頭部分での判定より重いため。
+      同じ内容を何度も読み込む呼び出し側で判定結果を保持する）
+    - verify=True の場合はファイル全体を復号して確かめる（チャンク単位の読み込みで、途中の
+      UnicodeDecodeError から読み込み直せない場合に使う）。確かめた結果も保持する
+
+    同じプロセス内の複数セッションから呼ばれるため、操作はロックで保護する。
+    """
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, max_entries=256):
+        """
+        Args:
+            sample_size: int - 判定に使う非ASCII部分の大きさ（バイト）
+            max_entries: int - 保持する判定結果の最大数
+        """
+        self.sample_size = sample_size
+        self.max_entries = max_entries
+        self._encodings = OrderedDict()    # 内容ハッシュ → (文字コード, 全体で確かめたか)
+        self._file_hashes = OrderedDict()  # パス → ((更新日時, サイズ), ハッシュ)
+        self._lock = threading.Lock()
+
+    def detect(self, source, verify=False) -> str:
+        """文字コードを判定する
+
+        Args:
+            source: str | Path | bytes - load_source() の戻り値
+            verify: bool - ファイル全体を復号して確かめるか
+
+        Returns:
+            str - 文字コード名
+        """
+        if isinstance(source, bytes):
+            return self.detect_full(source) if verify else self._sniff(source)
+
+        digest = self._content_hash(source)
+
+        with self._lock:
+            if digest in self._encodings:
+                encoding, verified = self._encodings[digest]
+                if verified or not verify:
+                    self._encodings.move_to_end(digest)
+                    return encoding
+
+        if verify:
+            return self.detect_full(source)
+
+        encoding = self._sniff(source)
+        self._remember(digest, encoding, verified=False)
+        return encoding
+
+    def detect_full(self, source) -> str:
+        """ファイル全体を復号して文字コードを判定し、判定結果を置き換える
+
+        先頭部分での判定が外れた（読み込み中に UnicodeDecodeError になった）場合に使う。
+
+        Args:
+            source: str | Path | bytes - load_source() の戻り値
+
+        Returns:
+            str - 文字コード名
+        """
+        for encoding in CANDIDATE_ENCODINGS:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            try:
+                for block in iter_blocks(source):
+                    decoder.decode(block)
+                decoder.decode(b'', final=True)
+            except UnicodeDecodeError:
+                continue
+
+            if not isinstance(source, bytes):
+                self._remember(self._content_hash(source), encoding, verified=True)
+            return encoding
+
+        raise Exception("文字コードを判定できません（UTF-8/CP932/Shift-JIS）")
+
+    def clear(self):
+        """保持している判定結果をすべて破棄する"""
+        with self._lock:
+            self._encodings.clear()
+            self._file_hashes.clear()
+
+    def _sniff(self, source) -> str:
+        """先頭部分から文字コードを判定する
+
+        先頭ブロックで BOM を確認し、なければ最初の非ASCII文字から sample_size バイトを復号する。
+        （直前までASCIIのため、最初の非ASCIIバイトは必ず複数バイト文字の1バイト目になる）
+
+        Args:
+            source: str | Path | bytes - load_source() の戻り値
+
+        Returns:
+            str - 文字コード名
+        """
+        sample = bytearray()
+
+        for block_idx, block in enumerate(iter_blocks(source, block_size=self.sample_size)):
+            block = bytes(block)
+
+            if block_idx == 0:
+                for bom, encoding in BOMS:
+                    if block.startswith(bom):
+                        return encoding
+
+            if not sample:
+                if block.isascii():
+                    continue
+                block = block[next(idx for idx, byte in enumerate(block) if byte >= 0x80):]
+
+            sample += block
+            if len(sample) >= self.sample_size:
+                break
+
+        # ASCIIのみのファイル
+        if not sample:
+            return CANDIDATE_ENCODINGS[0]
+
+        sample = bytes(sample[:self.sample_size])
+        for encoding in CANDIDATE_ENCODINGS:
+            # 末尾で途切れた複数バイト文字はエラーにしない（final=False）
+            decoder = codecs.getincrementaldecoder(encoding)()
+            try:
+                decoder.decode(sample)
+                return encoding
+            except UnicodeDecodeError:
+                continue
+
+        raise Exception("文字コードを判定できません（UTF-8/CP932/Shift-JIS）")
+
+    def _remember(self, digest: str, encoding: str, verified: bool):
+        """判定結果を保持する（上限を超えたら最も長く使われていないものから破棄）"""
+        with self._lock:
+            self._encodings[digest] = (encoding, verified)
+            self._encodings.move_to_end(digest)
+            while len(self._encodings) > self.max_entries:
+                self._encodings.popitem(last=False)
+
+    def _content_hash(self, source) -> str:
+        """ファイルの内容ハッシュを取得する（更新日時・サイズが同じなら再計算しない）"""
+        path = str(Path(source).resolve())
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._file_hashes.get(path)
+            if cached and cached[0] == signature:
+                self._file_hashes.move_to_end(path)
+                return cached[1]
+
+        digest = hashlib.sha256()
+        for block in iter_blocks(path):
+            digest.update(block)
+        digest = digest.hexdigest()
+
+        with self._lock:
+            self._file_hashes[path] = (signature, digest)
+            self._file_hashes.move_to_end(path)
+            while len(self._file_hashes) > self.max_entries:
+                self._file_hashes.popitem(last=False)
+
+        return digest
+
+
+# プロセス全体で共有する判定器
+_detector = EncodingDetector()
+
+
+def detect_encoding(source, verify=False) -> str:
+    """CSVの文字コードを判定する（同じ内容のファイルは2回目以降判定しない）
+
+    Args:
+        source: str | Path | bytes - load_source() の戻り値
+        verify: bool - ファイル全体を復号して確かめるか（チャンク単位で読み込む場合）
+
+    Returns:
+        str - 文字コード名
+    """
+    return _detector.detect(source, verify=verify)
+
+
+def read_csv(source, **kwargs):
+    """文字コードを判定してCSVを1回だけ読み込む
+
+    先頭部分での判定が外れた場合のみ、ファイル全体で判定し直して読み込み直す。
+
+    Args:
+        source: str | Path | bytes - load_source() の戻り値
+        **kwargs: pd.read_csv に渡す引数（encoding 以外）
+
+    Returns:
+        DataFrame
+    """
+    try:
+        return pd.read_csv(open_source(source), encoding=detect_encoding(source), **kwargs)
+    except UnicodeDecodeError:
+        return pd.read_csv(open_source(source), encoding=_detector.detect_full(source), **kwargs)
@@ -1,5 +1,6 @@
 import pandas as pd
 from datetime import datetime
+from reader.input_source import load_source, open_source
 
 
 class FreeeExcelReader:
@@ -17,7 +18,11 @@ class FreeeExcelReader:
     ]
     
     def __init__(self, file_path):
-        self.file_path = file_path
+        """
+        Args:
+            file_path: str | bytes | BytesIO - ファイルパスまたはメモリ上のファイル内容
+        """
+        self.file_path = load_source(file_path)
         self.data_list = []
         self.errors = []
     
@@ -31,7 +36,7 @@ class FreeeExcelReader:
         """
         try:
             # 1行目をヘッダーとして読み込み
-            df = pd.read_excel(self.file_path, engine='openpyxl', header=0)
+            df = pd.read_excel(open_source(self.file_path), engine='openpyxl', header=0)
             
             # 列名を取得
             columns = df.columns.tolist()
@@ -0,0 +1,64 @@
+"""
+reader/input_source.py - Reader の入力（ファイルパスまたはメモリ上のデータ）を扱う関数
+"""
+
+import io
+import os
+
+
+def load_source(source):
+    """Reader に渡された入力をファイルパスまたは bytes にそろえる
+
+    bytes はそのまま保持するため、何度読み込んでもコピーは作られない
+    （io.BytesIO(bytes) は元の bytes を共有する）。
+
+    Args:
+        source: str | Path | bytes | bytearray | memoryview | BytesIO（UploadedFile など）
+
+    Returns:
+        str | Path | bytes
+    """
+    if isinstance(source, (str, os.PathLike, bytes)):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    if hasattr(source, 'read'):
+        return source.read()
+
+    raise TypeError(f"読み込めない入力です: {type(source).__name__}")
+
+
+def open_source(source):
+    """pandas に渡す入力を返す（メモリ上のデータは毎回先頭から読める新しいストリーム）
+
+    Args:
+        source: str | Path | bytes - load_source() の戻り値
+
+    Returns:
+        str | Path | BytesIO
+    """
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    return source
+
+
+def iter_blocks(source, block_size=1024 * 1024):
+    """入力を block_size バイトずつ返す
+
+    Args:
+        source: str | Path | bytes - load_source() の戻り値
+        block_size: int - 1回に返すバイト数
+
+    Yields:
+        bytes
+    """
+    if isinstance(source, bytes):
+        view = memoryview(source)
+        for start in range(0, len(view), block_size):
+            yield view[start:start + block_size]
+        return
+
+    with open(source, 'rb') as f:
+        yield from iter(lambda: f.read(block_size), b'')
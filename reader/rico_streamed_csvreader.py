@@ -4,6 +4,10 @@ reader/rico_streamed_csvreader.py - リコホテルズSTREAMED形式CSVを読み
 
 import pandas as pd
 from datetime import datetime
+from processor.journal_entry import JournalEntry
+from reader.input_source import load_source, open_source
+from reader.encoding_detector import detect_encoding
+from reader.csv_profile import CSVParseProfile
 
 
 class RicoStreamedCSVReader:
@@ -16,96 +20,247 @@ class RicoStreamedCSVReader:
         '貸方部門', '貸方金額', '貸方税区分', '摘要'
     ]
     
+    # 必須列以外で読み込む列（freee用Excelにそのまま出力される列）
+    OPTIONAL_COLUMNS = [
+        '決算整理仕訳',
+        '借方科目コード', '借方取引先コード', '借方品目', '借方メモタグ',
+        '借方セグメント1', '借方セグメント2', '借方セグメント3', '借方税額',
+        '貸方科目コード', '貸方取引先コード', '貸方品目', '貸方メモタグ',
+        '貸方セグメント1', '貸方セグメント2', '貸方セグメント3', '貸方税額',
+    ]
+    
+    # 読み込み条件（上記の列だけを文字列として読み込み、型推論しない）
+    PARSE_PROFILE = CSVParseProfile(REQUIRED_COLUMNS, OPTIONAL_COLUMNS)
+    
     def __init__(self, file_path):
-        self.file_path = file_path
+        """
+        Args:
+            file_path: str | bytes | BytesIO - ファイルパスまたはメモリ上のファイル内容
+        """
+        self.file_path = load_source(file_path)
         self.data_list = []
         self.errors = []
+        self._encoding = None            # 判定した文字コード（同じ内容を何度も読み込むため保持）
+        self._encoding_verified = False  # ファイル全体で確かめた文字コードか
     
     def read_and_validate(self):
         """STREAMED形式のCSVを読み込み、データを検証する
         
         Returns:
             tuple: (data_list, errors)
-                - data_list: list[dict] - 各行の検証済みデータ
+                - data_list: list[JournalEntry] - 各行の検証済みデータ
                 - errors: list[str] - エラーメッセージのリスト
         """
         try:
-            # UTF-8でCSVを読み込み（エンコーディング自動判定も試行）
-            try:
-                df = pd.read_csv(self.file_path, encoding='utf-8', header=0)
-            except UnicodeDecodeError:
-                # UTF-8で失敗した場合はCP932（Windows Shift-JIS）を試行
-                try:
-                    df = pd.read_csv(self.file_path, encoding='cp932', header=0)
-                except UnicodeDecodeError:
-                    # それでも失敗したらShift-JISを試行
-                    df = pd.read_csv(self.file_path, encoding='shift_jis', header=0)
-            
-            # 列名を取得
-            columns = df.columns.tolist()
+            # 必須列のチェック（ヘッダーのみ読み込み）
+            header_columns = self._read_header()
+            self._check_required_columns(header_columns)
             
-            # 必須列のチェック
-            missing_columns = [col for col in self.REQUIRED_COLUMNS if col not in columns]
-            if missing_columns:
-                raise Exception(f"必須列が見つかりません: {', '.join(missing_columns)}")
+            # 必要な列だけを文字列として1回だけ読み込む（文字コードは先頭部分で判定）
+            df = self._read_csv(header=0, **self.PARSE_PROFILE.read_options(header_columns))
             
-            # 各行を処理
-            for idx, row in df.iterrows():
-                self._process_row(row, idx + 2, columns)  # idx+2 (ヘッダーが1行目なので)
+            # 列単位で検証・変換
+            self.data_list.extend(self._process_columns(df))
             
             return self.data_list, self.errors
         
         except Exception as e:
             raise Exception(f"ファイル読み込みエラー: {str(e)}")
     
-    def _process_row(self, row, row_number, columns):
-        """各行を処理する"""
+    def iter_chunks(self, chunksize=10000):
+        """STREAMED形式のCSVを chunksize 行ずつ読み込み、検証済みデータを順に返す
+        
+        ファイル全体をメモリに載せずに処理するためのストリーミング読み込み。
+        read_and_validate() と同じく、必要な列だけを文字列として読み込む。
+        エラーメッセージは self.errors に蓄積される。
+        
+        Args:
+            chunksize: int - 1回に読み込む行数
+        
+        Yields:
+            list[JournalEntry] - 各行の検証済みデータ（chunk単位）
+        """
         try:
-            # データ辞書を作成
-            data = {}
-            
-            # 全列をループして辞書に格納
-            for col in columns:
-                value = row[col]
-                data[col] = '' if pd.isna(value) else str(value).strip()
-            
-            # 「日付」列の検証（共通キー）
-            date_value = row['日付']
-            validated_date = self._validate_date(date_value, row_number)
-            data['日付'] = validated_date
-            
-            # 「借方金額」と「貸方金額」の検証（共通キー）
-            borrow_amount = row['借方金額']
-            lend_amount = row['貸方金額']
-            validated_borrow = self._validate_amount(borrow_amount, row_number, '借方金額')
-            validated_lend = self._validate_amount(lend_amount, row_number, '貸方金額')
-            data['借方金額'] = validated_borrow
-            data['貸方金額'] = validated_lend
-            
-            # 共通キー「金額」を設定（借方金額を使用）
-            data['金額'] = validated_borrow
+            # チャンク単位では途中の UnicodeDecodeError から読み込み直せないため、全体で確かめた文字コードを使う
+            encoding = self._detect_encoding(verify=True)
             
-            # 補助科目を取引先に変換
-            data['借方取引先'] = data.pop('借方補助科目', '')
-            data['貸方取引先'] = data.pop('貸方補助科目', '')
+            # 必須列のチェック（ヘッダーのみ読み込み）
+            header_columns = self._read_header()
+            self._check_required_columns(header_columns)
             
-            # エラーフラグ用キーを追加
-            data['_errors'] = []
-            data['候補'] = ''  # マッチング結果用
-            
-            self.data_list.append(data)
+            options = self.PARSE_PROFILE.read_options(header_columns, chunked=True)
+            for df in pd.read_csv(open_source(self.file_path), encoding=encoding, header=0,
+                                  chunksize=chunksize, **options):
+                yield self._process_columns(df)
         
         except Exception as e:
-            self.errors.append(f"{row_number}行目: 行の処理エラー ({str(e)})")
+            raise Exception(f"ファイル読み込みエラー: {str(e)}")
+    
+    def iter_dept_values(self, chunksize=10000):
+        """借方部門・貸方部門の2列だけを先頭から順に返す
+        
+        全行を読み込まずにデフォルト部門を判定するために使用する
+        
+        Args:
+            chunksize: int - 1回に読み込む行数
+        
+        Yields:
+            dict - {'借方部門': str, '貸方部門': str}
+        """
+        encoding = self._detect_encoding(verify=True)
+        for df in pd.read_csv(open_source(self.file_path), encoding=encoding, header=0, dtype=str,
+                              usecols=['借方部門', '貸方部門'], chunksize=chunksize):
+            yield from df.fillna('').to_dict('records')
+    
+    def _detect_encoding(self, verify=False) -> str:
+        """文字コードを判定する（BOM・先頭部分で判定し、判定結果はこのインスタンスで再利用）
+        
+        Args:
+            verify: bool - ファイル全体を復号して確かめるか
+        
+        Returns:
+            str - 文字コード名
+        """
+        if self._encoding is None or (verify and not self._encoding_verified):
+            self._encoding = detect_encoding(self.file_path, verify=verify)
+            self._encoding_verified = verify
+        return self._encoding
+    
+    def _read_csv(self, **kwargs):
+        """判定済みの文字コードでCSVを読み込む（判定が外れた場合のみ全体で判定し直して読み込み直す）
+        
+        Args:
+            **kwargs: pd.read_csv に渡す引数（encoding 以外）
+        
+        Returns:
+            DataFrame
+        """
+        try:
+            return pd.read_csv(open_source(self.file_path), encoding=self._detect_encoding(), **kwargs)
+        except UnicodeDecodeError:
+            return pd.read_csv(open_source(self.file_path), encoding=self._detect_encoding(verify=True), **kwargs)
+    
+    def _read_header(self) -> list:
+        """ヘッダー行（列名）だけを読み込む
+        
+        Returns:
+            list[str] - 列名リスト
+        """
+        return self._read_csv(header=0, nrows=0).columns.tolist()
     
-    def _validate_date(self, value, row_number):
-        """日付を検証し、yyyy-mm-dd形式に変換する"""
+    def _check_required_columns(self, columns):
+        """必須列のチェック
+        
+        Args:
+            columns: list - 列名リスト
+        """
+        missing_columns = [col for col in self.REQUIRED_COLUMNS if col not in columns]
+        if missing_columns:
+            raise Exception(f"必須列が見つかりません: {', '.join(missing_columns)}")
+    
+    def _process_columns(self, df) -> list[JournalEntry]:
+        """全行を列単位でまとめて処理する
+        
+        各列の文字列化・日付/金額の検証を列ごとに行い、最後に行ごとの辞書へ変換する
+        （出力は1行ずつ処理した場合と同じ）
+        
+        Args:
+            df: DataFrame - 読み込んだCSV（chunk の場合も行番号はインデックスから求める）
+        
+        Returns:
+            list[JournalEntry] - 各行の検証済みデータ
+        """
+        row_count = len(df)
+        
+        # 全列を文字列化（空欄は''、前後の空白を除去）
+        table = {col: self._column_to_text(df[col]) for col in df.columns}
+        
+        # 「日付」列の検証（共通キー）
+        table['日付'], date_errors = self._validate_column(df['日付'], self._parse_date)
+        
+        # 「借方金額」と「貸方金額」の検証（共通キー）
+        table['借方金額'], borrow_errors = self._validate_column(
+            df['借方金額'], lambda value: self._parse_amount(value, '借方金額')
+        )
+        table['貸方金額'], lend_errors = self._validate_column(
+            df['貸方金額'], lambda value: self._parse_amount(value, '貸方金額')
+        )
+        
+        # 共通キー「金額」を設定（借方金額を使用）
+        table['金額'] = table['借方金額']
+        
+        # 補助科目を取引先に変換
+        table['借方取引先'] = table.pop('借方補助科目')
+        table['貸方取引先'] = table.pop('貸方補助科目')
+        
+        # エラーフラグ用キーを追加
+        table['_errors'] = [[] for _ in range(row_count)]
+        table['候補'] = [''] * row_count  # マッチング結果用
+        
+        # エラーメッセージを行順に収集（行番号はヘッダーが1行目なので+2）
+        for idx, row_errors in zip(df.index, zip(date_errors, borrow_errors, lend_errors)):
+            for error in row_errors:
+                if error:
+                    self.errors.append(f"{idx + 2}行目: {error}")
+        
+        # 列 → 行データに変換
+        return JournalEntry.from_columns(table)
+    
+    def _column_to_text(self, column) -> list:
+        """列の値を文字列化する（空欄は''、前後の空白を除去）
+        
+        Args:
+            column: Series - 対象列
+        
+        Returns:
+            list[str]
+        """
+        if isinstance(column.dtype, pd.StringDtype):
+            # 文字列列は空欄を''に置き換えてから一括で処理
+            return [value.strip() for value in column.fillna('').tolist()]
+        
+        is_blank = column.isna().tolist()
+        return [
+            '' if blank else str(value).strip()
+            for value, blank in zip(column.tolist(), is_blank)
+        ]
+    
+    def _validate_column(self, column, parser) -> tuple[list, list]:
+        """列の値を検証する（同じ値は1回だけ検証）
+        
+        Args:
+            column: Series - 対象列
+            parser: Callable - 値 → (変換後の値, エラー内容 or None)
+        
+        Returns:
+            tuple: (変換後の値のリスト, 行ごとのエラー内容のリスト)
+        """
+        parsed = {}
+        values = []
+        errors = []
+        
+        for value in column.tolist():
+            # 型が違う同値（1 と 1.0 など）は別の値として扱う
+            key = (type(value), value)
+            if key not in parsed:
+                parsed[key] = parser(value)
+            validated, error = parsed[key]
+            values.append(validated)
+            errors.append(error)
+        
+        return values, errors
+    
+    def _parse_date(self, value):
+        """日付を検証し、yyyy-mm-dd形式に変換する
+        
+        Returns:
+            tuple: (変換後の日付 or '形式エラー', エラー内容 or None)
+        """
         if pd.isna(value) or value == '':
-            error_msg = f"{row_number}行目: 日付が空白です"
-            self.errors.append(error_msg)
-            return '形式エラー'
+            return '形式エラー', "日付が空白です"
         
         value_str = str(value).strip()
+        format_error = ('形式エラー', f"日付が形式エラー（値: {value}）")
         
         # 数値の場合（yyyymmdd形式）
         if isinstance(value, (int, float)):
@@ -116,13 +271,11 @@ class RicoStreamedCSVReader:
                     month = date_str[4:6]
                     day = date_str[6:8]
                     datetime(int(year), int(month), int(day))
-                    return f"{year}-{month}-{day}"
+                    return f"{year}-{month}-{day}", None
                 else:
                     raise ValueError("8桁ではありません")
             except:
-                error_msg = f"{row_number}行目: 日付が形式エラー（値: {value}）"
-                self.errors.append(error_msg)
-                return '形式エラー'
+                return format_error
         
         # 文字列の場合
         elif isinstance(value, str):
@@ -133,52 +286,50 @@ class RicoStreamedCSVReader:
                     month = value_str[4:6]
                     day = value_str[6:8]
                     datetime(int(year), int(month), int(day))
-                    return f"{year}-{month}-{day}"
+                    return f"{year}-{month}-{day}", None
                 # yyyy/mm/dd形式
                 elif '/' in value_str:
                     parts = value_str.split('/')
                     if len(parts) == 3:
                         year, month, day = parts
                         datetime(int(year), int(month), int(day))
-                        return f"{year.zfill(4)}-{month.zfill(2)}-{day.zfill(2)}"
+                        return f"{year.zfill(4)}-{month.zfill(2)}-{day.zfill(2)}", None
                     else:
                         raise ValueError("yyyy/mm/dd形式ではありません")
                 else:
                     raise ValueError("対応していない日付形式です")
             except:
-                error_msg = f"{row_number}行目: 日付が形式エラー（値: {value}）"
-                self.errors.append(error_msg)
-                return '形式エラー'
+                return format_error
         
         # datetime型の場合
         elif isinstance(value, datetime):
-            return value.strftime('%Y-%m-%d')
+            return value.strftime('%Y-%m-%d'), None
         
         else:
-            error_msg = f"{row_number}行目: 日付が形式エラー（値: {value}）"
-            self.errors.append(error_msg)
-            return '形式エラー'
+            return format_error
     
-    def _validate_amount(self, value, row_number, field_name):
-        """金額を検証する"""
+    def _parse_amount(self, value, field_name):
+        """金額を検証する
+        
+        Returns:
+            tuple: (金額 or '形式エラー', エラー内容 or None)
+        """
         if pd.isna(value) or value == '':
-            error_msg = f"{row_number}行目: {field_name}が空白です"
-            self.errors.append(error_msg)
-            return '形式エラー'
+            return '形式エラー', f"{field_name}が空白です"
         
         if isinstance(value, (int, float)):
-            return value
+            return value, None
         
         elif isinstance(value, str):
+            # 文字列として読み込むため、整数はintにそろえる（型推論した場合と同じ値）
+            try:
+                return int(value), None
+            except ValueError:
+                pass
             try:
-                return float(value)
+                return float(value), None
             except:
-                error_msg = f"{row_number}行目: {field_name}が形式エラー（値: {value}）"
-                self.errors.append(error_msg)
-                return '形式エラー'
+                return '形式エラー', f"{field_name}が形式エラー（値: {value}）"
         
         else:
-            error_msg = f"{row_number}行目: {field_name}が形式エラー（値: {value}）"
-            self.errors.append(error_msg)
-            return '形式エラー'
-        
\ No newline at end of file
+            return '形式エラー', f"{field_name}が形式エラー（値: {value}）"
@@ -1,12 +1,17 @@
 import pandas as pd
 from datetime import datetime
+from reader.input_source import load_source, open_source
 
 
 class TestExcelReader:
     """テスト用Excelファイルを読み込み、データを検証するクラス"""
     
     def __init__(self, file_path):
-        self.file_path = file_path
+        """
+        Args:
+            file_path: str | bytes | BytesIO - ファイルパスまたはメモリ上のファイル内容
+        """
+        self.file_path = load_source(file_path)
         self.data_list = []
         self.errors = []
     
@@ -19,7 +24,7 @@ class TestExcelReader:
                 - errors: list[str] - エラーメッセージのリスト
         """
         try:
-            excel_file = pd.ExcelFile(self.file_path, engine='openpyxl')
+            excel_file = pd.ExcelFile(open_source(self.file_path), engine='openpyxl')
             
             for sheet_name in excel_file.sheet_names:
                 self._process_sheet(excel_file, sheet_name)
@@ -0,0 +1,262 @@
+"""
+run_metrics.py - 変換処理の段階ごとの処理時間・行数・メモリ使用量を記録する
+"""
+
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# tracemalloc はプロセス全体で1つのため、計測中の数を数えて開始・停止する
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False  # このモジュールで tracemalloc を開始したか
+
+# 他の処理の確保分が混ざらないよう、計測する処理を同時に1つに限るためのロック
+_exclusive_lock = threading.Lock()
+
+
+class RunMetrics:
+    """1回の変換処理（複数ファイル）の計測結果を記録するクラス
+
+    段階（reader / dept_normalizer / partner_resolver / voucher_formatter / exporter など）ごとに
+    処理時間・処理行数・ピークメモリ・カウンタ（取引先キャッシュのヒット数など）をファイル単位で集計する。
+
+    段階は入れ子にでき、親の処理時間には子の処理時間を含めない。
+    （ストリーミング処理では Exporter が chunk を取り出すたびに Reader・Processor が動くが、
+     それぞれの段階に分けて集計できる）
+
+    ピークメモリは trace_memory=True の場合のみ tracemalloc で計測する（処理が数倍遅くなる）。
+    tracemalloc はプロセス全体で共有されるため、ピークメモリは計測中にプロセス内で確保された
+    メモリの合計になる（同時に動く他の処理の分も含む）。共有サーバーでは exclusive_memory_tracing() で
+    計測する処理を1つに限ること。
+    """
+
+    # 計測結果（JSON）の形式バージョン
+    VERSION = 1
+
+    def __init__(self, trace_memory=False):
+        """
+        Args:
+            trace_memory: bool - tracemalloc で段階ごとのピークメモリを計測するか
+        """
+        self.trace_memory = trace_memory
+        self.created_at = datetime.now()
+        self.records = {}   # (ファイル名, 段階) → 記録
+        self._stack = []    # 実行中の段階
+        self._started = None
+        self._finished = None
+        self._tracing = False
+
+    def start(self):
+        """計測を開始する"""
+        self._started = time.perf_counter()
+        if self.trace_memory and not self._tracing:
+            start_memory_tracing()
+            self._tracing = True
+
+    def finish(self):
+        """計測を終了する"""
+        self._finished = time.perf_counter()
+        if self._tracing:
+            stop_memory_tracing()
+            self._tracing = False
+
+    @contextmanager
+    def stage(self, name: str, file_name: str = ''):
+        """段階の処理時間・ピークメモリを計測する
+
+        使い方:
+            with metrics.stage('reader', file_name) as record:
+                data_list, errors = reader.read_and_validate()
+                record['rows'] += len(data_list)
+
+        Args:
+            name: str - 段階名
+            file_name: str - 対象ファイル名（全体の処理は空文字）
+
+        Yields:
+            dict - この段階の記録（rows・counters を呼び出し側で加算できる）
+        """
+        record = self._record(file_name, name)
+        frame = {'child_seconds': 0.0, 'memory_start': 0, 'peak': 0}
+
+        if self._tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # 親の段階のここまでのピークを記録してから、この段階用にリセット
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['memory_start'] = current
+
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+
+            record['seconds'] += elapsed - frame['child_seconds']
+            record['calls'] += 1
+
+            if self._stack:
+                self._stack[-1]['child_seconds'] += elapsed
+
+            if self._tracing:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                record['peak_memory_bytes'] = max(record['peak_memory_bytes'] or 0, peak - frame['memory_start'])
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+
+    def add_counters(self, name: str, file_name: str, counters: dict):
+        """段階のカウンタを加算する
+
+        Args:
+            name: str - 段階名
+            file_name: str - 対象ファイル名
+            counters: dict - {カウンタ名: 値}
+        """
+        record_counters = self._record(file_name, name)['counters']
+        for key, value in counters.items():
+            record_counters[key] = record_counters.get(key, 0) + value
+
+    def merge(self, records: list[dict]):
+        """別プロセスで計測した記録（to_dict()['stages']）を取り込む
+
+        Args:
+            records: list[dict] - 段階ごとの記録
+        """
+        for other in records:
+            record = self._record(other['file'], other['stage'])
+            record['seconds'] += other['seconds']
+            record['calls'] += other['calls']
+            record['rows'] += other['rows']
+            if other.get('peak_memory_bytes') is not None:
+                record['peak_memory_bytes'] = max(record['peak_memory_bytes'] or 0, other['peak_memory_bytes'])
+            for key, value in other.get('counters', {}).items():
+                record['counters'][key] = record['counters'].get(key, 0) + value
+
+    def stage_records(self) -> list[dict]:
+        """段階ごとの記録を返す（処理速度を含む）
+
+        Returns:
+            list[dict] - file, stage, seconds, calls, rows, rows_per_second, peak_memory_bytes, counters
+        """
+        records = []
+        for record in self.records.values():
+            record = dict(record, seconds=round(record['seconds'], 6), counters=dict(record['counters']))
+            record['rows_per_second'] = (
+                round(record['rows'] / record['seconds'], 1)
+                if record['rows'] and record['seconds'] > 0 else None
+            )
+            records.append(record)
+        return records
+
+    def resolver_summary(self) -> dict:
+        """取引先照合のカウンタを全ファイル分集計する
+
+        Returns:
+            dict - カウンタの合計と cache_hit_rate（一意の取引先名のうち解決済みキャッシュにあった割合）
+        """
+        summary = {}
+        for (_file_name, name), record in self.records.items():
+            if name != 'partner_resolver':
+                continue
+            for key, value in record['counters'].items():
+                summary[key] = summary.get(key, 0) + value
+
+        if summary.get('unique_names'):
+            summary['cache_hit_rate'] = round(summary.get('cache_hits', 0) / summary['unique_names'], 4)
+
+        return summary
+
+    def to_dict(self) -> dict:
+        """計測結果（JSONレポート）を返す
+
+        Returns:
+            dict
+        """
+        total_seconds = None
+        if self._started is not None:
+            end = self._finished if self._finished is not None else time.perf_counter()
+            total_seconds = round(end - self._started, 6)
+
+        return {
+            'version': self.VERSION,
+            'created_at': self.created_at.isoformat(timespec='seconds'),
+            'total_seconds': total_seconds,
+            'trace_memory': self.trace_memory,
+            # ピークメモリはプロセス全体の確保量（他の処理の分を含む）
+            'memory_scope': 'process' if self.trace_memory else None,
+            'stages': self.stage_records(),
+            'partner_resolver': self.resolver_summary(),
+        }
+
+    def to_json(self) -> str:
+        """計測結果をJSON文字列で返す"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def _record(self, file_name: str, name: str) -> dict:
+        """記録を取得する（なければ作成）"""
+        key = (file_name, name)
+        if key not in self.records:
+            self.records[key] = {
+                'file': file_name,
+                'stage': name,
+                'seconds': 0.0,
+                'calls': 0,
+                'rows': 0,
+                'peak_memory_bytes': None,
+                'counters': {},
+            }
+        return self.records[key]
+
+
+@contextmanager
+def exclusive_memory_tracing():
+    """tracemalloc を使う処理を、プロセス内で同時に1つだけ実行できるようにする
+
+    使い方:
+        with exclusive_memory_tracing() as acquired:
+            if not acquired:
+                return  # 他の処理が計測中
+            metrics = RunMetrics(trace_memory=True)
+
+    Yields:
+        bool - 計測を始めてよいか（他の処理が計測中・外部で tracemalloc が開始済みなら False）
+    """
+    acquired = _exclusive_lock.acquire(blocking=False)
+    if acquired:
+        with _tracing_lock:
+            if _tracing_users > 0 or tracemalloc.is_tracing():
+                _exclusive_lock.release()
+                acquired = False
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _exclusive_lock.release()
+
+
+def start_memory_tracing():
+    """tracemalloc を開始する（すでに計測中なら利用数だけ増やす）"""
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def stop_memory_tracing():
+    """tracemalloc を停止する（他に計測中のものがある場合や、外部で開始された場合は継続）"""
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
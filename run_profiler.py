@@ -0,0 +1,183 @@
+"""
+run_profiler.py - 変換処理1回分の詳細プロファイル（cProfile + tracemalloc）を取得する
+"""
+
+import cProfile
+import marshal
+import pstats
+import tracemalloc
+from pathlib import Path
+
+from run_metrics import start_memory_tracing, stop_memory_tracing
+
+
+# プロジェクトのルートディレクトリ（表示用にパスを短くする）
+PROJECT_ROOT = Path(__file__).parent
+
+
+class RunProfiler:
+    """cProfile で関数ごとの処理時間を、tracemalloc で行ごとのメモリ確保量を記録するクラス
+
+    使い方:
+        profiler = RunProfiler()
+        with profiler:
+            convert_file(...)
+        profiler.hot_functions()       # 処理時間の上位関数
+        profiler.allocation_sites()    # メモリ確保量の上位行
+        profiler.profile_bytes()       # .prof ファイルの内容（snakeviz などで表示可能）
+
+    cProfile は実行中のスレッドのみを計測するため、並列処理（別プロセス）の中身は含まれない。
+    処理は通常の数倍遅くなるため、問題の調査時のみ使用する。
+    """
+
+    # tracemalloc の結果から除外するファイル
+    IGNORED_FILES = (
+        tracemalloc.__file__,
+        "<frozen importlib._bootstrap>",
+        "<frozen importlib._bootstrap_external>",
+        "<unknown>",
+    )
+
+    def __init__(self, top_n=20):
+        """
+        Args:
+            top_n: int - 集計結果に表示する件数
+        """
+        self.top_n = top_n
+        self.profile = cProfile.Profile()
+        self._snapshot_start = None
+        self._snapshot_end = None
+        self._peak_memory = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def start(self):
+        """プロファイルを開始する"""
+        start_memory_tracing()
+        tracemalloc.reset_peak()
+        self._snapshot_start = tracemalloc.take_snapshot()
+        self.profile.enable()
+
+    def stop(self):
+        """プロファイルを終了する"""
+        self.profile.disable()
+        self._peak_memory = tracemalloc.get_traced_memory()[1]
+        self._snapshot_end = tracemalloc.take_snapshot()
+        stop_memory_tracing()
+
+    @property
+    def peak_memory_bytes(self):
+        """プロファイル中の tracemalloc のピークメモリ（バイト）"""
+        return self._peak_memory
+
+    def hot_functions(self, sort='cumulative', top_n=None) -> list[dict]:
+        """処理時間の上位関数を返す
+
+        Args:
+            sort: str - 'cumulative'（呼び出し先を含む時間）または 'tottime'（関数自身の時間）
+            top_n: int - 件数（省略時は self.top_n）
+
+        Returns:
+            list[dict] - function, calls, tottime, cumtime
+        """
+        stats = pstats.Stats(self.profile)
+        sort_key = {'cumulative': 'cumtime', 'tottime': 'tottime'}[sort]
+
+        rows = []
+        for (filename, lineno, function_name), values in stats.stats.items():
+            _primitive_calls, calls, tottime, cumtime, _callers = values
+            rows.append({
+                'function': f"{_short_path(filename)}:{lineno}({function_name})",
+                'calls': calls,
+                'tottime': round(tottime, 6),
+                'cumtime': round(cumtime, 6),
+            })
+
+        rows.sort(key=lambda row: row[sort_key], reverse=True)
+
+        return rows[:top_n or self.top_n]
+
+    def allocation_sites(self, top_n=None) -> list[dict]:
+        """プロファイル中にメモリを多く確保したまま残した行（開始時との差分）を返す
+
+        Args:
+            top_n: int - 件数（省略時は self.top_n）
+
+        Returns:
+            list[dict] - location, size_diff_bytes, count_diff, size_bytes
+        """
+        filters = [tracemalloc.Filter(False, filename) for filename in self.IGNORED_FILES]
+        start = self._snapshot_start.filter_traces(filters)
+        end = self._snapshot_end.filter_traces(filters)
+
+        rows = []
+        for stat in end.compare_to(start, 'lineno')[:top_n or self.top_n]:
+            frame = stat.traceback[0]
+            rows.append({
+                'location': f"{_short_path(frame.filename)}:{frame.lineno}",
+                'size_diff_bytes': stat.size_diff,
+                'count_diff': stat.count_diff,
+                'size_bytes': stat.size,
+            })
+
+        return rows
+
+    def profile_bytes(self) -> bytes:
+        """.prof ファイルの内容を返す（pstats.Stats / snakeviz で読み込める形式）
+
+        Returns:
+            bytes
+        """
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+    def save(self, output_path) -> str:
+        """.prof ファイルを保存する
+
+        Args:
+            output_path: str - 出力先
+
+        Returns:
+            str - 出力ファイルパス
+        """
+        Path(output_path).write_bytes(self.profile_bytes())
+        return str(output_path)
+
+    def summary_text(self) -> str:
+        """上位関数・上位メモリ確保行をテキストで返す（コマンドライン表示用）
+
+        Returns:
+            str
+        """
+        lines = [f"■ 処理時間の上位関数（累積時間順、上位{self.top_n}件）"]
+        lines.append(f"{'累積(秒)':>10} {'自身(秒)':>10} {'呼出回数':>10}  関数")
+        for row in self.hot_functions():
+            lines.append(f"{row['cumtime']:>10.3f} {row['tottime']:>10.3f} {row['calls']:>10,}  {row['function']}")
+
+        lines.append("")
+        lines.append(f"■ メモリ確保の上位行（開始時との差分、上位{self.top_n}件）")
+        if self._peak_memory is not None:
+            lines.append(f"ピークメモリ: {self._peak_memory / 1024 / 1024:.1f} MB")
+        lines.append(f"{'増加(KB)':>10} {'個数':>10}  場所")
+        for row in self.allocation_sites():
+            lines.append(f"{row['size_diff_bytes'] / 1024:>10.1f} {row['count_diff']:>10,}  {row['location']}")
+
+        return "\n".join(lines)
+
+
+def _short_path(filename: str) -> str:
+    """表示用にファイルパスを短くする（プロジェクト内は相対パス、それ以外は末尾2階層）"""
+    if not filename or filename.startswith('<') or filename == '~':
+        return filename
+
+    path = Path(filename)
+    try:
+        return str(path.resolve().relative_to(PROJECT_ROOT.resolve()))
+    except ValueError:
+        return str(Path(*path.parts[-2:]))
@@ -6,14 +6,19 @@ import streamlit as st
 from pathlib import Path
 import tempfile
 import os
+import uuid
+from datetime import datetime
+from functools import partial
+from contextlib import nullcontext
 
-from reader.test_reader01 import TestExcelReader
-from reader.freee_reader import FreeeExcelReader
-from reader.rico_streamed_csvreader import RicoStreamedCSVReader
-from processor.dept_normalizer import DeptNormalizer
-from processor.partner_resolver import PartnerResolver
-from processor.voucher_formatter import VoucherFormatter
-from exporter.freee_exporter import TestExcelExporter, FreeeExcelExporter
+from processor.master_cache import MasterCache
+from processor.fuzzy_cache import FuzzyMatchCache
+from format_registry import INPUT_FORMATS, OUTPUT_FORMATS
+from pipeline import convert_file, convert_files_parallel, STREAMING_THRESHOLD_BYTES
+from run_metrics import RunMetrics, exclusive_memory_tracing
+from run_profiler import RunProfiler
+from workspace import WorkspaceManager, SessionWorkspace
+from exporter.output_bundle import OutputBundle
 
 
 # プロジェクトのルートディレクトリ
@@ -23,6 +28,64 @@ PROJECT_ROOT = Path(__file__).parent
 TEMP_DIR = Path(tempfile.gettempdir()) / "streamlit_converter"
 TEMP_DIR.mkdir(exist_ok=True)
 
+# マスタのコンパイル済みスナップショットの保存先
+MASTER_CACHE_DIR = TEMP_DIR / "master_cache"
+
+# セッションごとの作業ディレクトリの保存先
+SESSIONS_DIR = TEMP_DIR / "sessions"
+
+# 作業ディレクトリ・スナップショットの合計サイズの上限と、使われていないものを残す時間（環境変数で変更可）
+WORKSPACE_MAX_BYTES = int(os.environ.get("CONVERTER_WORKSPACE_MAX_MB", "500")) * 1024 * 1024
+WORKSPACE_MAX_AGE_SECONDS = float(os.environ.get("CONVERTER_WORKSPACE_MAX_AGE_HOURS", "24")) * 60 * 60
+
+# メモリ計測・詳細プロファイルを画面から選べるようにするか（tracemalloc はプロセス全体で共有され、
+# 計測中は全セッションの処理が遅くなるため、共有サーバーでは既定で無効）
+ALLOW_MEMORY_TRACING = os.environ.get("CONVERTER_ALLOW_MEMORY_TRACING", "0") == "1"
+
+
+@st.cache_resource
+def get_master_registry():
+    """全セッションで共有するマスタのレジストリを取得する
+    
+    マスタのコンパイル済みスナップショットは内容ハッシュで管理し、
+    類似度マッチングの結果も同じディレクトリに保存して実行をまたいで再利用する
+    （STREAMED以外の形式では pandas などのマスタ用モジュールを読み込まないよう、ここで import する）
+    """
+    from processor.master_registry import MasterRegistry
+    
+    return MasterRegistry(
+        master_cache=MasterCache(MASTER_CACHE_DIR),
+        fuzzy_cache=FuzzyMatchCache.in_dir(MASTER_CACHE_DIR)
+    )
+
+
+@st.cache_resource
+def get_workspace_manager():
+    """全セッションで共有する作業ディレクトリの管理クラスを取得する"""
+    return WorkspaceManager(
+        SESSIONS_DIR,
+        max_total_bytes=WORKSPACE_MAX_BYTES,
+        max_age_seconds=WORKSPACE_MAX_AGE_SECONDS,
+        shared_dirs=[MASTER_CACHE_DIR],
+        # 類似度マッチング結果のキャッシュは FuzzyMatchCache 自身が件数を制限する
+        keep_files=[FuzzyMatchCache.FILE_NAME]
+    )
+
+
+def get_session_workspace():
+    """このセッションの作業ディレクトリを取得する
+    
+    他のセッションとファイル名が重ならないよう、セッションごとに別のディレクトリを使う。
+    セッション終了後、Streamlit がセッションの状態を破棄した時点で削除される。
+    
+    Returns:
+        SessionWorkspace
+    """
+    if "workspace" not in st.session_state:
+        st.session_state.workspace = SessionWorkspace(get_workspace_manager(), uuid.uuid4().hex)
+    return st.session_state.workspace
+
+
 # ページ設定
 st.set_page_config(
     page_title="Excel to CSV Converter",
@@ -73,6 +136,9 @@ st.markdown("""
 
 
 def main():
+    # 再実行のたびにセッションを使用中として記録（他のセッションの evict で作業ディレクトリを削除されないように）
+    get_session_workspace().touch()
+    
     # ヘッダー
     st.markdown('<div class="main-header">📊 Excel to CSV Converter</div>', unsafe_allow_html=True)
     
@@ -83,12 +149,8 @@ def main():
         # 入力形式選択
         input_type = st.radio(
             "📥 インプット形式",
-            options=["test", "freee", "streamed"],
-            format_func=lambda x: {
-                "test": "テスト用Excel (B2:日付, C3:金額)",
-                "freee": "freee形式Excel (freee項目名からデータ照合)",
-                "streamed": "リコホテルズ_STREAMED_csv"
-            }[x],
+            options=list(INPUT_FORMATS),
+            format_func=lambda x: INPUT_FORMATS[x]["label"],
             help="処理するファイルの形式を選択してください"
         )
         
@@ -97,11 +159,37 @@ def main():
         # 出力形式選択
         output_type = st.radio(
             "📤 アウトプット形式",
-            options=["test", "freee"],
-            format_func=lambda x: "テスト用Excel" if x == "test" else "freee用Excel",
+            options=list(OUTPUT_FORMATS),
+            format_func=lambda x: OUTPUT_FORMATS[x]["label"],
             help="出力するファイルの形式を選択してください"
         )
         
+        # 並列処理
+        parallel = st.checkbox(
+            "⚡ 複数ファイルを並列処理する",
+            value=False,
+            help="複数ファイルをCPUコア数まで同時に処理します"
+        )
+        
+        # 計測（処理時間の計測は常に行う。メモリ計測・詳細プロファイルは許可されている場合のみ）
+        trace_memory = False
+        profile_run = False
+        if ALLOW_MEMORY_TRACING:
+            trace_memory = st.checkbox(
+                "📊 段階ごとのメモリ使用量も計測する（プロセス全体）",
+                value=False,
+                help="処理時間の計測は常に行います。メモリ計測を有効にすると、計測中はサーバー上の全セッションの処理が遅くなり、"
+                     "値には同時に動く他のセッションの確保分も含まれます。他のセッションが計測中の場合は開始できません"
+            )
+            
+            # 詳細プロファイル
+            profile_run = st.checkbox(
+                "🔬 詳細プロファイルを取得する（cProfile + tracemalloc）",
+                value=False,
+                help="関数ごとの処理時間とメモリ確保の多い行を記録します。処理が数倍遅くなり、並列処理は無効になります。"
+                     "他のセッションが計測中の場合は開始できません"
+            )
+        
         st.divider()
         
         # 設定ファイルアップロード（STREAMED用のみ表示）
@@ -208,87 +296,117 @@ def main():
                     output_type, 
                     freee_partner_file,
                     dept_mapping_file,
-                    partner_list_file
+                    partner_list_file,
+                    parallel=parallel,
+                    trace_memory=trace_memory,
+                    profile_run=profile_run
                 )
             else:
-                process_files(uploaded_files, input_type, output_type)
+                process_files(uploaded_files, input_type, output_type, parallel=parallel, trace_memory=trace_memory, profile_run=profile_run)
 
 
-def process_files(uploaded_files, input_type, output_type, freee_partner_file=None, dept_mapping_file=None, partner_list_file=None):
+def process_files(uploaded_files, input_type, output_type, freee_partner_file=None, dept_mapping_file=None, partner_list_file=None, parallel=False, trace_memory=False, profile_run=False):
     """ファイルを処理する"""
     
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    # 結果の表示（ZIPの読み込み）が終わるまで、作業ディレクトリを他のセッションの evict から保護する
+    workspace = get_session_workspace()
+    tracing = trace_memory or profile_run
+    with workspace.in_use(), (exclusive_memory_tracing() if tracing else nullcontext(False)) as acquired:
+        # tracemalloc はプロセス全体で共有されるため、他のセッションが計測中なら開始しない
+        if tracing and not acquired:
+            st.error("❌ 他のセッションがメモリ計測中のため開始できません。しばらくしてから再度実行するか、メモリ計測・詳細プロファイルを無効にしてください")
+            return
+        
+        # 古い作業ディレクトリ・スナップショットを削除してディスク使用量を上限内に保つ
+        get_workspace_manager().evict(keep=[workspace.session_id])
+        
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        
+        # 段階ごとの処理時間などを計測
+        metrics = RunMetrics(trace_memory=trace_memory)
+        metrics.start()
+        
+        # 詳細プロファイル（cProfile は別プロセスを計測できないため順番に処理する）
+        profiler = RunProfiler() if profile_run else None
+        if profiler:
+            profiler.start()
+        
+        # 一括ダウンロード用のZIP（出力するたびに作業ディレクトリのZIPファイルへ追加する）
+        bundle = None
+        if len(uploaded_files) > 1:
+            bundle = OutputBundle(workspace.path / f"output_files_{output_type}.zip")
+        
+        try:
+            if parallel and len(uploaded_files) > 1 and not profiler:
+                output_files, all_errors = process_files_parallel(
+                    uploaded_files, input_type, output_type,
+                    freee_partner_file, dept_mapping_file, partner_list_file,
+                    progress_bar, status_text, metrics, bundle
+                )
+            else:
+                output_files, all_errors = process_files_serial(
+                    uploaded_files, input_type, output_type,
+                    freee_partner_file, dept_mapping_file, partner_list_file,
+                    progress_bar, status_text, metrics, bundle
+                )
+        finally:
+            if bundle is not None:
+                bundle.close()
+            if profiler:
+                profiler.stop()
+            metrics.finish()
+        
+        progress_bar.empty()
+        status_text.empty()
+        
+        # 結果表示
+        show_results(output_files, all_errors, output_type, metrics, profiler, bundle)
+
+
+def process_files_serial(uploaded_files, input_type, output_type, freee_partner_file, dept_mapping_file, partner_list_file, progress_bar, status_text, metrics, bundle=None):
+    """ファイルを1つずつ順番に処理する
     
+    Returns:
+        tuple: (output_files, all_errors)
+    """
     all_errors = []
     output_files = []
     
     total_files = len(uploaded_files)
     
+    # STREAMED用のマスタ（初回のファイル処理時に読み込む）
+    dept_normalizer = None
+    partner_resolver = None
+    
     for idx, uploaded_file in enumerate(uploaded_files):
         try:
             status_text.text(f"処理中... ({idx + 1}/{total_files}) {uploaded_file.name}")
             progress_bar.progress((idx + 1) / total_files)
             
-            # 一時ファイルとして保存
-            temp_path = TEMP_DIR / uploaded_file.name
-            temp_path.write_bytes(uploaded_file.getvalue())
-            
-            # Reader選択
-            if input_type == "test":
-                reader = TestExcelReader(str(temp_path))
-            elif input_type == "freee":
-                reader = FreeeExcelReader(str(temp_path))
-            elif input_type == "streamed":
-                reader = RicoStreamedCSVReader(str(temp_path))
+            # マスタは全ファイル共通のため、最初のファイルで1回だけ読み込む
+            # （取引先の解決結果もPartnerResolver内で全ファイル分共有される）
+            if input_type == "streamed" and partner_resolver is None:
+                with metrics.stage('masters'):
+                    dept_normalizer, partner_resolver = load_streamed_masters(
+                        freee_partner_file, dept_mapping_file, partner_list_file
+                    )
             
-            # データ読み込み
-            data_list, errors = reader.read_and_validate()
-            
-            # STREAMED処理
-            if input_type == "streamed":
-                # freee取引先CSVを一時保存
-                freee_csv_path = TEMP_DIR / "freee_partners.csv"
-                freee_csv_path.write_bytes(freee_partner_file.getvalue())
-                
-                # 設定ファイルのパスを決定（アップロードされていればそちらを使用）
-                if dept_mapping_file:
-                    dept_mapping_path = TEMP_DIR / "temp_dept_mapping.xlsx"
-                    dept_mapping_path.write_bytes(dept_mapping_file.getvalue())
-                    st.sidebar.info("✅ アップロードされた部署マッピングを使用")
-                else:
-                    dept_mapping_path = PROJECT_ROOT / "config" / "dept_mapping.xlsx"
-                    st.sidebar.info("📁 configフォルダの部署マッピングを使用")
-                
-                if partner_list_file:
-                    partner_list_path = TEMP_DIR / "temp_partner_list.xlsx"
-                    partner_list_path.write_bytes(partner_list_file.getvalue())
-                    st.sidebar.info("✅ アップロードされた取引先一覧を使用")
-                else:
-                    partner_list_path = PROJECT_ROOT / "config" / "partner_list.xlsx"
-                    st.sidebar.info("📁 configフォルダの取引先一覧を使用")
-                
-                dept_normalizer = DeptNormalizer(str(dept_mapping_path))
-                data_list = dept_normalizer.normalize(data_list)
-                
-                partner_resolver = PartnerResolver(
-                    str(partner_list_path),
-                    str(freee_csv_path)
-                )
-                data_list = partner_resolver.resolve(data_list)
-                
-                voucher_formatter = VoucherFormatter("STREAMED")
-                data_list = voucher_formatter.format(data_list)
-            
-            # Exporter選択
-            if output_type == "test":
-                exporter = TestExcelExporter(output_dir=str(TEMP_DIR))
-            elif output_type == "freee":
-                exporter = FreeeExcelExporter(output_dir=str(TEMP_DIR))
-            
-            # Excel出力
-            output_path = exporter.export(data_list, uploaded_file.name)
-            output_files.append((uploaded_file.name, output_path))
+            # 読み込み → 変換 → Excel出力（大きなSTREAMED CSVはchunk単位で処理）
+            # アップロード内容をメモリ上で読み込み、出力もメモリ上に作成する（一時ファイルを使わない）
+            output_buffer, errors = convert_file(
+                uploaded_file.getvalue(),
+                uploaded_file.name,
+                input_type,
+                output_type,
+                str(get_session_workspace().path),
+                dept_normalizer=dept_normalizer,
+                partner_resolver=partner_resolver,
+                streaming=uploaded_file.size >= STREAMING_THRESHOLD_BYTES,
+                metrics=metrics,
+                to_buffer=True
+            )
+            output_files.append(keep_output(uploaded_file.name, output_buffer, bundle))
             
             if errors:
                 all_errors.extend([f"{uploaded_file.name}: {e}" for e in errors])
@@ -296,14 +414,142 @@ def process_files(uploaded_files, input_type, output_type, freee_partner_file=No
         except Exception as e:
             all_errors.append(f"{uploaded_file.name}: {str(e)}")
     
-    progress_bar.empty()
-    status_text.empty()
+    return output_files, all_errors
+
+
+def process_files_parallel(uploaded_files, input_type, output_type, freee_partner_file, dept_mapping_file, partner_list_file, progress_bar, status_text, metrics, bundle=None):
+    """複数ファイルをプロセスプールで並列に処理する
+    
+    結果・エラーはアップロード順に並べる
+    
+    Returns:
+        tuple: (output_files, all_errors)
+    """
+    all_errors = []
+    output_files = []
+    
+    master_paths = None
+    if input_type == "streamed":
+        try:
+            master_paths = prepare_master_paths(freee_partner_file, dept_mapping_file, partner_list_file)
+            
+            # 親プロセスで1回読み込んでスナップショットを作成しておく
+            # （各ワーカーはスナップショットから読み込む）
+            with metrics.stage('masters'):
+                load_streamed_masters_from_paths(*master_paths)
+        except Exception as e:
+            all_errors.extend([f"{uploaded_file.name}: {str(e)}" for uploaded_file in uploaded_files])
+            return output_files, all_errors
+    
+    # アップロード内容をそのままワーカーに渡す（一時ファイルを使わない）
+    jobs = [
+        (uploaded_file.getvalue(), uploaded_file.name, uploaded_file.size >= STREAMING_THRESHOLD_BYTES)
+        for uploaded_file in uploaded_files
+    ]
+    
+    def on_progress(completed, total, name):
+        status_text.text(f"処理中... ({completed}/{total}) {name} 完了")
+        progress_bar.progress(completed / total)
+    
+    results = convert_files_parallel(
+        jobs,
+        input_type,
+        output_type,
+        str(get_session_workspace().path),
+        master_paths=master_paths,
+        cache_dir=str(MASTER_CACHE_DIR),
+        max_workers=min(len(jobs), os.cpu_count() or 1),
+        on_progress=on_progress,
+        metrics=metrics,
+        to_buffer=True
+    )
+    
+    for uploaded_file, result in zip(uploaded_files, results):
+        if isinstance(result, Exception):
+            all_errors.append(f"{uploaded_file.name}: {str(result)}")
+            continue
+        
+        output_buffer, errors = result
+        output_files.append(keep_output(uploaded_file.name, output_buffer, bundle))
+        
+        if errors:
+            all_errors.extend([f"{uploaded_file.name}: {e}" for e in errors])
+    
+    return output_files, all_errors
+
+
+def keep_output(original_name, output_buffer, bundle=None):
+    """出力ファイルを結果表示まで保持する
+    
+    複数ファイルの場合はZIP（作業ディレクトリ上）に追加し、メモリ上の出力は保持しない
+    （ZIPを唯一の保存先とし、ダウンロード時にZIPから読み出す）。
+    1ファイルの場合はZIPを作らず、メモリ上の出力だけを保持する。
+    
+    Returns:
+        tuple: (元のファイル名, 出力ファイル名, メモリ上の出力（ZIPに追加した場合は None）)
+    """
+    if bundle is not None:
+        return original_name, bundle.add(output_buffer.name, output_buffer), None
+    return original_name, output_buffer.name, output_buffer
+
+
+def load_streamed_masters(freee_partner_file, dept_mapping_file=None, partner_list_file=None):
+    """STREAMED処理用の部門・取引先マスタを読み込む
+    
+    Returns:
+        tuple: (DeptNormalizer, PartnerResolver)
+    """
+    return load_streamed_masters_from_paths(
+        *prepare_master_paths(freee_partner_file, dept_mapping_file, partner_list_file)
+    )
+
+
+def load_streamed_masters_from_paths(dept_mapping_path, partner_list_path, freee_csv_path):
+    """マスタファイルのパスから部門・取引先マスタを取得する
+    
+    Returns:
+        tuple: (DeptNormalizer, PartnerResolver)
+    """
+    # 同じ内容のマスタは全セッションで共有（読み取り専用）
+    registry = get_master_registry()
+    dept_normalizer = registry.get_dept_normalizer(dept_mapping_path)
+    partner_resolver = registry.get_partner_resolver(partner_list_path, freee_csv_path)
+    
+    return dept_normalizer, partner_resolver
+
+
+def prepare_master_paths(freee_partner_file, dept_mapping_file=None, partner_list_file=None):
+    """STREAMED処理用のマスタファイルのパスを決定する
+    
+    Returns:
+        tuple: (dept_mapping_path, partner_list_path, freee_csv_path)
+    """
+    # freee取引先CSVをこのセッションの作業ディレクトリに保存
+    work_dir = get_session_workspace().path
+    freee_csv_path = work_dir / "freee_partners.csv"
+    freee_csv_path.write_bytes(freee_partner_file.getvalue())
+    
+    # 設定ファイルのパスを決定（アップロードされていればそちらを使用）
+    if dept_mapping_file:
+        dept_mapping_path = work_dir / "temp_dept_mapping.xlsx"
+        dept_mapping_path.write_bytes(dept_mapping_file.getvalue())
+        st.sidebar.info("✅ アップロードされた部署マッピングを使用")
+    else:
+        dept_mapping_path = PROJECT_ROOT / "config" / "dept_mapping.xlsx"
+        st.sidebar.info("📁 configフォルダの部署マッピングを使用")
+    
+    if partner_list_file:
+        partner_list_path = work_dir / "temp_partner_list.xlsx"
+        partner_list_path.write_bytes(partner_list_file.getvalue())
+        st.sidebar.info("✅ アップロードされた取引先一覧を使用")
+    else:
+        partner_list_path = PROJECT_ROOT / "config" / "partner_list.xlsx"
+        st.sidebar.info("📁 configフォルダの取引先一覧を使用")
     
-    # 結果表示
-    show_results(output_files, all_errors, output_type)
+    return dept_mapping_path, partner_list_path, freee_csv_path
 
 
-def show_results(output_files, all_errors, output_type):
+def show_results(output_files, all_errors, output_type, metrics=None, profiler=None, bundle=None):
     """処理結果を表示する"""
     
     st.markdown('<div class="step-header">✅ 処理完了</div>', unsafe_allow_html=True)
@@ -326,26 +572,16 @@ def show_results(output_files, all_errors, output_type):
     st.markdown("### 📥 ダウンロード")
     
     # 一括ダウンロードボタン
-    if len(output_files) > 1:
+    if bundle is not None and len(bundle) > 1:
         st.markdown("#### 🎁 一括ダウンロード")
         
-        import zipfile
-        import io
-        
-        # ZIPファイルを作成
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for original_name, output_path in output_files:
-                output_path = Path(output_path)
-                with open(output_path, "rb") as f:
-                    zip_file.writestr(output_path.name, f.read())
-        
-        zip_buffer.seek(0)
-        
+        # ZIPは作業ディレクトリに作成済み（xlsx は圧縮済みのため無圧縮で格納）
+        # クリックされた時点で読み出す（表示のたびにZIP全体をメモリに載せない。
+        # Streamlit はダウンロード内容を bytes としてメモリ上に保持するため、クリック時はZIP全体の大きさを使う）
         st.download_button(
             label="📦 すべてのファイルをZIPでダウンロード",
-            data=zip_buffer,
-            file_name=f"output_files_{output_type}.zip",
+            data=bundle.read_all,
+            file_name=bundle.path.name,
             mime="application/zip",
             key="download_all_zip",
             use_container_width=True
@@ -356,30 +592,119 @@ def show_results(output_files, all_errors, output_type):
     # 個別ダウンロード
     st.markdown("#### 📄 個別ダウンロード")
     
-    for idx, (original_name, output_path) in enumerate(output_files):
-        output_path = Path(output_path)
-        
-        with open(output_path, "rb") as f:
-            file_data = f.read()
-        
+    for idx, (original_name, output_name, output_buffer) in enumerate(output_files):
         col1, col2 = st.columns([3, 1])
         with col1:
-            st.text(f"📄 {output_path.name}")
+            st.text(f"📄 {output_name}")
         with col2:
             st.download_button(
                 label="⬇️ DL",
-                data=file_data,
-                file_name=output_path.name,
+                # ZIPに追加済みのファイルはクリックされた時点でZIPから読み出す
+                data=output_buffer if output_buffer is not None else partial(bundle.read, output_name),
+                file_name=output_name,
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                key=f"download_{idx}_{output_path.name}",
+                key=f"download_{idx}_{output_name}",
                 use_container_width=True
             )
     
+    # 計測結果
+    if metrics:
+        show_metrics(metrics)
+    
+    # 詳細プロファイル
+    if profiler:
+        show_profile(profiler)
+    
     # リセットボタン
     st.divider()
     if st.button("🔄 新しいファイルを処理する", type="primary", use_container_width=True):
         st.rerun()
 
 
+
+def show_metrics(metrics):
+    """段階ごとの計測結果を表示する"""
+    
+    report = metrics.to_dict()
+    
+    with st.expander("📊 処理の計測結果"):
+        if report['total_seconds'] is not None:
+            st.caption(f"全体の処理時間: {report['total_seconds']:.2f}秒")
+        
+        # 段階ごとの処理時間・行数・メモリ
+        rows = []
+        for record in report['stages']:
+            peak_memory = record['peak_memory_bytes']
+            rows.append({
+                "ファイル": record['file'] or "（共通）",
+                "段階": record['stage'],
+                "処理時間(秒)": round(record['seconds'], 3),
+                "行数": record['rows'],
+                "行/秒": record['rows_per_second'],
+                "ピークメモリ(MB・プロセス全体)": round(peak_memory / 1024 / 1024, 1) if peak_memory is not None else None,
+            })
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        
+        # 取引先照合
+        resolver = report['partner_resolver']
+        if resolver:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("取引先キャッシュヒット率", f"{resolver.get('cache_hit_rate', 0):.1%}")
+            with col2:
+                st.metric("類似度マッチング件数", f"{resolver.get('fuzzy_searches', 0):,}")
+            with col3:
+                st.metric("類似度計算回数", f"{resolver.get('fuzzy_comparisons', 0):,}")
+        
+        st.download_button(
+            label="📄 計測レポート（JSON）をダウンロード",
+            data=metrics.to_json(),
+            file_name=f"run_report_{metrics.created_at.strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json",
+            key="download_run_report"
+        )
+
+
+
+def show_profile(profiler):
+    """詳細プロファイル（処理時間・メモリ確保の上位）を表示する"""
+    
+    with st.expander("🔬 詳細プロファイル"):
+        if profiler.peak_memory_bytes is not None:
+            st.caption(f"ピークメモリ（プロセス全体）: {profiler.peak_memory_bytes / 1024 / 1024:.1f} MB")
+        
+        # 処理時間の上位関数
+        st.markdown(f"**処理時間の上位関数（累積時間順、上位{profiler.top_n}件）**")
+        rows = []
+        for row in profiler.hot_functions():
+            rows.append({
+                "関数": row['function'],
+                "呼出回数": row['calls'],
+                "自身(秒)": round(row['tottime'], 3),
+                "累積(秒)": round(row['cumtime'], 3),
+            })
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        
+        # メモリ確保の上位行
+        st.markdown(f"**メモリ確保の上位行（開始時との差分、上位{profiler.top_n}件）**")
+        rows = []
+        for row in profiler.allocation_sites():
+            rows.append({
+                "場所": row['location'],
+                "増加(KB)": round(row['size_diff_bytes'] / 1024, 1),
+                "個数": row['count_diff'],
+            })
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        
+        st.download_button(
+            label="📄 プロファイル（.prof）をダウンロード",
+            data=profiler.profile_bytes(),
+            file_name=f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof",
+            mime="application/octet-stream",
+            key="download_profile",
+            help="snakeviz などで表示できます"
+        )
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,37 @@
+"""
+tests/conftest.py - テスト共通のフィクスチャ
+"""
+
+import csv
+import sys
+from pathlib import Path
+
+import pytest
+
+
+# リポジトリ直下のモジュール（processor, reader など）を import できるようにする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def write_freee_csv(path, rows):
+    """freee取引先CSV（A列: 取引先名, Q列: ステータス）を書き込む
+
+    Args:
+        path: Path - 出力先
+        rows: list[tuple[str, str]] - (取引先名, ステータス)
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['取引先名'] + [f'列{i}' for i in range(1, 16)] + ['ステータス'])
+        for partner_name, status in rows:
+            writer.writerow([partner_name] + [''] * 15 + [status])
+
+
+@pytest.fixture
+def partner_list_path(tmp_path):
+    """固定リスト（partner_list.xlsx）"""
+    import pandas as pd
+
+    path = tmp_path / 'partner_list.xlsx'
+    pd.DataFrame({'元の名称': ['固定取引先'], '正式名称': ['固定取引先株式会社']}).to_excel(path, index=False)
+    return path
@@ -0,0 +1,72 @@
+"""
+tests/test_batch_convert.py - 一括変換CLIの終了コード・マスタの読み込みの確認
+"""
+
+import shutil
+
+import pytest
+
+import batch_convert
+from benchmark.generators import generate_dataset
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    paths = generate_dataset(tmp_path / 'data', streamed_rows=50, freee_partners=200)
+    inputs = tmp_path / 'inputs'
+    inputs.mkdir()
+    for name in ('a.csv', 'b.csv'):
+        shutil.copy(paths['streamed_csv'], inputs / name)
+    return paths, inputs
+
+
+def _args(paths, inputs, tmp_path, *extra):
+    return [
+        str(inputs),
+        '--freee-csv', paths['freee_csv'],
+        '--dept-mapping', paths['dept_mapping'],
+        '--partner-list', paths['partner_list'],
+        '--output-dir', str(tmp_path / 'out'),
+        '--cache-dir', str(tmp_path / 'cache'),
+        '--quiet',
+        *extra,
+    ]
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_broken_master_exits_with_2(tmp_path, dataset, capsys, jobs):
+    paths, inputs = dataset
+    # 読み込めないfreee取引先CSV（空ファイル）
+    with open(paths['freee_csv'], 'wb'):
+        pass
+
+    assert batch_convert.main(_args(paths, inputs, tmp_path, '--jobs', jobs)) == 2
+
+    # ファイルごとではなく1回だけ報告する
+    assert capsys.readouterr().err.count('freee取引先CSV読み込みエラー') == 1
+
+
+def test_parallel_run_compiles_masters_in_parent(tmp_path, dataset):
+    paths, inputs = dataset
+
+    assert batch_convert.main(_args(paths, inputs, tmp_path, '--jobs', '2')) == 0
+
+    snapshots = sorted(path.name.split('_v')[0] for path in (tmp_path / 'cache').glob('*.pkl'))
+    assert snapshots == ['dept_mapping', 'freee_csv', 'partner_list']
+    assert len(list((tmp_path / 'out').glob('*.xlsx'))) == 2
+
+
+def test_parallel_run_keeps_outputs_with_same_stem(tmp_path, dataset):
+    paths, inputs = dataset
+    # 別のディレクトリにある同じ名前の入力（出力ファイル名が同じになる）
+    for name in ('x', 'y'):
+        (inputs / name).mkdir()
+        shutil.copy(paths['streamed_csv'], inputs / name / 'same.csv')
+
+    args = _args(paths, inputs, tmp_path, '--jobs', '2')
+    args[0:1] = [str(inputs / 'x'), str(inputs / 'y')]
+    assert batch_convert.main(args) == 0
+
+    outputs = sorted((tmp_path / 'out').glob('same_*.xlsx'))
+    assert len(outputs) == 2
+    assert all(output.stat().st_size > 0 for output in outputs)
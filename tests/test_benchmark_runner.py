@@ -0,0 +1,27 @@
+"""
+tests/test_benchmark_runner.py - ベンチマークの劣化判定（ベースラインとの比較）の確認
+"""
+
+from benchmark import runner
+
+
+def _args(tmp_path, *extra):
+    return [
+        '--size', '1k', '--freee-size', '1k', '--repeat', '1',
+        '--data-dir', str(tmp_path / 'data'),
+        '--baseline', str(tmp_path / 'baseline.json'),
+        *extra,
+    ]
+
+
+def test_missing_baseline_fails(tmp_path, capsys):
+    assert runner.main(_args(tmp_path)) == 2
+    assert 'ベースラインがないため比較できません' in capsys.readouterr().err
+
+    # 計測だけ行う場合は比較しない
+    assert runner.main(_args(tmp_path, '--no-compare')) == 0
+
+
+def test_compares_with_baseline(tmp_path):
+    assert runner.main(_args(tmp_path, '--update-baseline')) == 0
+    assert runner.main(_args(tmp_path, '--tolerance', '100')) == 0
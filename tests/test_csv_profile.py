@@ -0,0 +1,70 @@
+"""
+tests/test_csv_profile.py - CSVの読み込み条件（読み込む列・型・パーサー）の確認
+"""
+
+import pytest
+
+from reader.csv_profile import CSVParseProfile
+from reader.rico_streamed_csvreader import RicoStreamedCSVReader
+from test_rico_streamed_csvreader import _csv_bytes, _row
+
+
+def test_usecols_keeps_header_order():
+    profile = CSVParseProfile(['日付', '金額'], ['メモ'])
+
+    assert profile.usecols(['金額', '不要な列', 'メモ', '日付']) == ['金額', 'メモ', '日付']
+    assert profile.usecols(['日付']) == ['日付']
+
+
+def test_engine_selection():
+    header = ['日付', '金額']
+
+    assert CSVParseProfile(header).read_options(header) == {'usecols': header, 'dtype': str, 'engine': 'c'}
+    assert CSVParseProfile(header, engine='python').read_options(header)['engine'] == 'python'
+    # chunk単位の読み込みは pyarrow が対応していないため C パーサー
+    assert CSVParseProfile(header, engine='pyarrow').read_options(header, chunked=True)['engine'] == 'c'
+
+
+WIDE_COLUMNS = RicoStreamedCSVReader.REQUIRED_COLUMNS + ['借方品目', '不要な列1', '不要な列2']
+
+WIDE_ROWS = [
+    _row(伝票番号='007', 借方品目='宿泊', 不要な列1='x', 不要な列2='1'),
+    _row(伝票番号='1.0', 借方金額='12.5', 貸方金額='0012', 不要な列1='y', 不要な列2='2'),
+]
+
+
+def test_reader_reads_only_profile_columns_as_text():
+    source = _csv_bytes(WIDE_ROWS, columns=WIDE_COLUMNS)
+    data_list, errors = RicoStreamedCSVReader(source).read_and_validate()
+    chunks = list(RicoStreamedCSVReader(source).iter_chunks(chunksize=1))
+
+    assert not errors
+    assert [entry.to_dict() for entry in data_list] == [entry.to_dict() for chunk in chunks for entry in chunk]
+
+    # 必須列以外は出力に使う列だけを読み込む
+    assert [entry['借方品目'] for entry in data_list] == ['宿泊', '']
+    assert all('不要な列1' not in entry and '不要な列2' not in entry for entry in data_list)
+
+    # 伝票番号は文字列のまま、整数の金額は int
+    assert [entry['伝票番号'] for entry in data_list] == ['007', '1.0']
+    assert [entry['借方金額'] for entry in data_list] == [1000, 12.5]
+    assert [entry['貸方金額'] for entry in data_list] == [1000, 12]
+    assert type(data_list[0]['借方金額']) is int
+
+
+def test_missing_columns_reported_before_body_is_parsed(monkeypatch):
+    columns = [col for col in RicoStreamedCSVReader.REQUIRED_COLUMNS if col != '摘要']
+    reader = RicoStreamedCSVReader(_csv_bytes([_row()], columns=columns))
+
+    calls = []
+    original_read_csv = RicoStreamedCSVReader._read_csv
+    monkeypatch.setattr(
+        RicoStreamedCSVReader, '_read_csv',
+        lambda self, **kwargs: calls.append(kwargs) or original_read_csv(self, **kwargs)
+    )
+
+    with pytest.raises(Exception, match='必須列が見つかりません: 摘要'):
+        reader.read_and_validate()
+
+    # ヘッダー行だけを読み込んだ時点で止まる
+    assert [call.get('nrows') for call in calls] == [0]
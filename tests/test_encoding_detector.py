@@ -0,0 +1,57 @@
+"""
+tests/test_encoding_detector.py - 文字コード判定（STREAMED CSV の読み込み）の確認
+"""
+
+import pytest
+
+from reader.encoding_detector import EncodingDetector
+from reader.rico_streamed_csvreader import RicoStreamedCSVReader
+
+
+def _streamed_csv(encoding, rows=30):
+    columns = RicoStreamedCSVReader.REQUIRED_COLUMNS
+    lines = [','.join(columns)]
+    for idx in range(rows):
+        values = {
+            '日付': '2024/04/01', '伝票番号': str(idx + 1), '借方勘定科目': '旅費交通費', '借方部門': '本社',
+            '借方金額': '1000', '貸方勘定科目': '現金', '貸方部門': '本社', '貸方金額': '1000', '摘要': 'タクシー代',
+        }
+        lines.append(','.join(values.get(column, '') for column in columns))
+    return ('\n'.join(lines) + '\n').encode(encoding)
+
+
+def test_bytes_sources_are_not_hashed(monkeypatch):
+    def fail_hash(self, source):
+        raise AssertionError('メモリ上の内容の全体ハッシュを計算した')
+
+    monkeypatch.setattr(EncodingDetector, '_content_hash', fail_hash)
+    detected = []
+    original_sniff = EncodingDetector._sniff
+    monkeypatch.setattr(
+        EncodingDetector, '_sniff', lambda self, source: detected.append(1) or original_sniff(self, source)
+    )
+
+    data_list, errors = RicoStreamedCSVReader(_streamed_csv('cp932')).read_and_validate()
+
+    assert len(data_list) == 30
+    assert not errors
+    # ヘッダー・本体の読み込みで判定は1回だけ
+    assert len(detected) == 1
+
+
+@pytest.mark.parametrize('as_path', [False, True])
+def test_iter_chunks_verifies_encoding_before_streaming(tmp_path, monkeypatch, as_path):
+    # 先頭部分での判定が外れた場合（CP932 のファイルを UTF-8 と判定した場合）を再現する
+    monkeypatch.setattr(EncodingDetector, '_sniff', lambda self, source: 'utf-8')
+
+    source = _streamed_csv('cp932')
+    if as_path:
+        path = tmp_path / 'streamed.csv'
+        path.write_bytes(source)
+        source = str(path)
+
+    reader = RicoStreamedCSVReader(source)
+    chunks = list(reader.iter_chunks(chunksize=7))
+
+    assert sum(len(chunk) for chunk in chunks) == 30
+    assert chunks[0][0].摘要 == 'タクシー代'
@@ -0,0 +1,113 @@
+"""
+tests/test_freee_exporter.py - freee用Excel出力の確認
+"""
+
+from openpyxl import load_workbook
+from openpyxl.styles import PatternFill
+import pandas as pd
+import pytest
+
+from exporter.freee_exporter import FreeeExcelExporter
+
+
+ROWS = [
+    {'日付': '2024-04-01', '金額': 1000, '借方勘定科目': '旅費交通費', '摘要': '出張 東京',
+     '借方取引先': '株式会社A', '借方取引先_match_type': 'partner_list',
+     '貸方取引先': '株式会社B', '貸方取引先_match_type': 'fuzzy', '候補': '株式会社BB'},
+    {'日付': '2024-04-02', '金額': 2500, '借方勘定科目': '消耗品費', '摘要': 'とても長い摘要の文字列' * 5,
+     '借方取引先': '株式会社C', '借方取引先_match_type': 'freee_exact',
+     '_errors': ['貸方勘定科目が空です', '金額が不正です']},
+    {'日付': '2024-04-03', '金額': 300, '借方勘定科目': '会議費',
+     '借方取引先': '未登録', '借方取引先_match_type': 'fuzzy', '_errors': ['取引先が見つかりません']},
+]
+
+
+def _baseline_workbook(path, rows):
+    """変更前の出力方法（to_excel の後に塗りつぶし・列幅を設定）で出力する"""
+    exporter = FreeeExcelExporter(output_dir=path.parent)
+    output_columns = exporter.FREEE_COLUMNS + ['候補', 'エラー内容']
+    built = [exporter._build_row(data) for data in rows]
+
+    df = pd.DataFrame([row for row, _ in built], columns=output_columns)
+    df.to_excel(path, index=False, sheet_name='freee_data', engine='openpyxl')
+
+    wb = load_workbook(path)
+    ws = wb['freee_data']
+    green_fill = PatternFill(start_color='CCFFCC', end_color='CCFFCC', fill_type='solid')
+    pink_fill = PatternFill(start_color='FFCCCC', end_color='FFCCCC', fill_type='solid')
+    for row_num, (row, partner_colors) in enumerate(built, start=2):
+        if row['エラー内容']:
+            for col_num in range(1, len(output_columns) + 1):
+                ws.cell(row=row_num, column=col_num).fill = pink_fill
+        for col, color in partner_colors.items():
+            cell = ws.cell(row=row_num, column=output_columns.index(col) + 1)
+            cell.fill = green_fill if color == 'green' else pink_fill
+
+    for col_idx, column in enumerate(output_columns, start=1):
+        letter = ws.cell(row=1, column=col_idx).column_letter
+        if not any(value not in ['', None, 'nan'] for value in df[column]):
+            ws.column_dimensions[letter].width = 8
+            continue
+        max_length = len(column)
+        for value in map(str, df[column]):
+            if value and value != 'nan':
+                max_length = max(max_length, sum(2 if ord(c) > 127 else 1 for c in value))
+        ws.column_dimensions[letter].width = min(max_length + 2, 50)
+
+    wb.save(path)
+    return path
+
+
+def _formatting(source):
+    """セルごとの (値, 太字, 罫線, 配置, 塗りつぶし) と列幅"""
+    ws = load_workbook(source)['freee_data']
+    cells = [
+        [
+            (
+                cell.value, cell.font.b,
+                (cell.border.left.style, cell.border.right.style,
+                 cell.border.top.style, cell.border.bottom.style),
+                (cell.alignment.horizontal, cell.alignment.vertical),
+                cell.fill.fill_type, cell.fill.fgColor.rgb,
+            )
+            for cell in row
+        ]
+        for row in ws.iter_rows()
+    ]
+    widths = {letter: dimension.width for letter, dimension in ws.column_dimensions.items()}
+    return cells, widths
+
+
+def test_export_matches_to_excel_baseline(tmp_path):
+    buffer = FreeeExcelExporter(output_dir=tmp_path).export_to_buffer(ROWS, 'x.csv')
+    baseline = _baseline_workbook(tmp_path / 'baseline.xlsx', ROWS)
+
+    cells, widths = _formatting(buffer)
+    expected_cells, expected_widths = _formatting(baseline)
+
+    # ヘッダー行の書式（書き込み専用モードで書いても to_excel と同じ）
+    assert cells[0] == expected_cells[0]
+    assert cells[1:] == expected_cells[1:]
+    assert widths == expected_widths
+
+
+def test_generate_filename_reserves_name(tmp_path):
+    # 別々のプロセスの Exporter が同じ入力名を出力しても、同じファイル名にならない
+    first = FreeeExcelExporter(output_dir=tmp_path)._generate_filename('data/a/x.csv')
+    second = FreeeExcelExporter(output_dir=tmp_path)._generate_filename('data/b/x.csv')
+
+    assert first != second
+    assert (tmp_path / first).exists() and (tmp_path / second).exists()
+
+
+def test_failed_export_releases_reserved_name(tmp_path, monkeypatch):
+    exporter = FreeeExcelExporter(output_dir=tmp_path)
+
+    def fail(*args):
+        raise RuntimeError('書き込み失敗')
+
+    monkeypatch.setattr(exporter, '_write', fail)
+    with pytest.raises(RuntimeError):
+        exporter.export([], 'x.csv')
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,118 @@
+"""
+tests/test_fuzzy_cache.py - 類似度マッチング結果の永続キャッシュ（FuzzyMatchCache）の確認
+"""
+
+import sqlite3
+
+import pytest
+
+from processor import fuzzy_cache
+from processor.fuzzy_cache import FuzzyMatchCache
+from processor.partner_resolver import PartnerResolver
+from conftest import write_freee_csv
+
+
+FREEE_PARTNERS = ['山田商店', '鈴木工業株式会社', '株式会社田中建設', 'ABCトレーディング']
+
+NAMES = ['山田商会', '鈴木工業', '田中建設', 'XYZ', 'ABCトレード']
+
+
+def test_results_persist_across_instances(tmp_path):
+    FuzzyMatchCache.in_dir(tmp_path).put_many('v1', {'山田商会': ('山田商店', 0.75), 'XYZ': ('', None)})
+
+    cache = FuzzyMatchCache(tmp_path / FuzzyMatchCache.FILE_NAME)
+
+    # 候補なしの結果も保存する
+    assert cache.get_many('v1', ['山田商会', 'XYZ', '未照合']) == {
+        '山田商会': ('山田商店', 0.75), 'XYZ': ('', None),
+    }
+    # マスタのバージョンが違う結果は使わない
+    assert cache.get_many('v2', ['山田商会']) == {}
+    assert len(cache) == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(fuzzy_cache.time, 'time', lambda: now[0])
+    cache = FuzzyMatchCache.in_dir(tmp_path, max_entries=2)
+
+    cache.put_many('v1', {'a': ('A', 0.9)})
+    now[0] = 1.0
+    cache.put_many('v1', {'b': ('B', 0.9)})
+    now[0] = 2.0
+    # 取得した結果は最終使用日時が更新される
+    assert cache.get_many('v1', ['a']) == {'a': ('A', 0.9)}
+    now[0] = 3.0
+    cache.put_many('v1', {'c': ('C', 0.9)})
+
+    assert cache.get_many('v1', ['a', 'b', 'c']) == {'a': ('A', 0.9), 'c': ('C', 0.9)}
+    assert len(cache) == 2
+
+
+def test_get_many_in_batches(tmp_path):
+    cache = FuzzyMatchCache.in_dir(tmp_path)
+    results = {f'name{idx}': (f'candidate{idx}', 0.7) for idx in range(fuzzy_cache._BATCH_SIZE * 2 + 1)}
+
+    cache.put_many('v1', results)
+
+    assert cache.get_many('v1', list(results)) == results
+
+
+def test_sqlite_errors_fall_back_to_no_cache(tmp_path):
+    # SQLiteファイルではない内容のファイル
+    path = tmp_path / FuzzyMatchCache.FILE_NAME
+    path.write_bytes(b'not a database' * 100)
+    cache = FuzzyMatchCache(path)
+
+    cache.put_many('v1', {'a': ('A', 0.9)})
+    assert cache.get_many('v1', ['a']) == {}
+
+    with pytest.raises(sqlite3.Error):
+        len(cache)
+
+
+@pytest.fixture
+def freee_csv_path(tmp_path):
+    path = tmp_path / 'freee.csv'
+    write_freee_csv(path, [(name, '使用') for name in FREEE_PARTNERS])
+    return path
+
+
+@pytest.mark.parametrize('batch_fuzzy_min_names', [None, 1])
+def test_resolver_with_cache_matches_resolver_without_cache(tmp_path, partner_list_path, freee_csv_path,
+                                                           batch_fuzzy_min_names):
+    expected = PartnerResolver(
+        partner_list_path, freee_csv_path, batch_fuzzy_min_names=batch_fuzzy_min_names
+    ).resolve_names(NAMES)
+
+    def resolve():
+        stats = {}
+        resolver = PartnerResolver(
+            partner_list_path, freee_csv_path, batch_fuzzy_min_names=batch_fuzzy_min_names,
+            fuzzy_cache=FuzzyMatchCache.in_dir(tmp_path / 'cache')
+        )
+        return resolver.resolve_names(NAMES, stats=stats), stats
+
+    first, first_stats = resolve()
+    second, second_stats = resolve()
+
+    assert first == expected
+    assert second == expected
+    assert first_stats.get('fuzzy_cache_hits', 0) == 0
+    # 2回目は照合せず、すべて保存済みの結果を使う
+    assert second_stats['fuzzy_cache_hits'] == first_stats['fuzzy_searches']
+    assert second_stats.get('fuzzy_searches', 0) == 0
+
+
+def test_changed_freee_master_is_not_served_from_cache(tmp_path, partner_list_path, freee_csv_path):
+    cache = FuzzyMatchCache.in_dir(tmp_path / 'cache')
+    PartnerResolver(partner_list_path, freee_csv_path, fuzzy_cache=cache).resolve_names(NAMES)
+
+    write_freee_csv(freee_csv_path, [(name, '使用') for name in FREEE_PARTNERS + ['XYZ商事']])
+    stats = {}
+    resolved = PartnerResolver(partner_list_path, freee_csv_path, fuzzy_cache=cache).resolve_names(
+        NAMES, stats=stats
+    )
+
+    assert resolved['XYZ'] == ('fuzzy', 'XYZ商事')
+    assert stats.get('fuzzy_cache_hits', 0) == 0
@@ -0,0 +1,48 @@
+"""
+tests/test_fuzzy_engine.py - BatchFuzzyMatcher と全件走査（SequenceMatcher）の結果の比較
+"""
+
+import random
+from difflib import SequenceMatcher
+
+import pytest
+
+from processor.fuzzy_engine import BatchFuzzyMatcher
+
+
+CHARS = '山田鈴木商店工業ABCアイ'
+
+
+def _random_names(rng, count):
+    return [''.join(rng.choice(CHARS) for _ in range(rng.randint(2, 6))) for _ in range(count)]
+
+
+def _brute_force(query, names, threshold):
+    """全件を SequenceMatcher で採点し、最高スコアの候補（同点は先頭側）を返す"""
+    best = None
+    for name in names:
+        score = SequenceMatcher(None, query, name).ratio()
+        if score >= threshold and (best is None or score > best['score']):
+            best = {'name': name, 'score': score}
+    return best
+
+
+@pytest.mark.parametrize('block_cells', [1, 997, 10_000_000])
+@pytest.mark.parametrize('threshold', [0.0, 0.6])
+def test_best_matches_equal_brute_force(block_cells, threshold):
+    rng = random.Random(3)
+    names = list(dict.fromkeys(_random_names(rng, 300)))
+    queries = list(dict.fromkeys(_random_names(rng, 200)))
+
+    matcher = BatchFuzzyMatcher(names, block_cells=block_cells)
+    results = matcher.best_matches(queries, threshold=threshold)
+
+    assert results == {query: _brute_force(query, names, threshold) for query in queries}
+
+
+def test_ties_follow_order():
+    # 'AB' と 'AC' は 'A' に対して同点
+    names = ['AC', 'AB']
+
+    assert BatchFuzzyMatcher(names).best_matches(['A'])['A']['name'] == 'AC'
+    assert BatchFuzzyMatcher(names, order=[1, 0]).best_matches(['A'])['A']['name'] == 'AB'
@@ -0,0 +1,124 @@
+"""
+tests/test_input_source.py - メモリ上の入力・出力（アップロードを一時ファイルに書かない変換）の確認
+"""
+
+import io
+from pathlib import Path
+
+from openpyxl import load_workbook
+import pytest
+
+from benchmark.generators import generate_dataset
+from exporter import freee_exporter
+from pipeline import convert_file
+from processor.dept_normalizer import DeptNormalizer
+from processor.partner_resolver import PartnerResolver
+from reader.encoding_detector import EncodingDetector
+from reader.input_source import iter_blocks, load_source, open_source
+from reader.rico_streamed_csvreader import RicoStreamedCSVReader
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    return generate_dataset(tmp_path / 'data', streamed_rows=60, freee_partners=100)
+
+
+def _sheet(source):
+    """出力したExcelの全シートのセルの値・塗りつぶし"""
+    wb = load_workbook(source)
+    return {
+        ws.title: [[(cell.value, cell.fill.fgColor.rgb) for cell in row] for row in ws.iter_rows()]
+        for ws in wb.worksheets
+    }
+
+
+def test_load_source_keeps_bytes_without_copy():
+    data = b'a,b\n1,2\n'
+
+    assert load_source(data) is data
+    assert load_source('x.csv') == 'x.csv'
+    assert load_source(bytearray(data)) == data
+    assert load_source(memoryview(data)) == data
+    assert load_source(io.BytesIO(data)) == data
+    assert load_source(io.BufferedReader(io.BytesIO(data))) == data
+
+    with pytest.raises(TypeError):
+        load_source(123)
+
+    # 読み込むたびに先頭から読める
+    assert open_source(data).read() == data
+    assert open_source(data).read() == data
+
+
+def test_iter_blocks_same_for_bytes_and_path(tmp_path):
+    data = bytes(range(256)) * 10
+    path = tmp_path / 'x.bin'
+    path.write_bytes(data)
+
+    from_bytes = [bytes(block) for block in iter_blocks(data, block_size=100)]
+    from_path = list(iter_blocks(path, block_size=100))
+
+    assert from_bytes == from_path
+    assert b''.join(from_bytes) == data
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'utf-8-sig', 'cp932'])
+def test_encoding_same_for_bytes_and_path(tmp_path, encoding):
+    data = '日付,摘要\n2024/04/01,タクシー代\n'.encode(encoding)
+    path = tmp_path / 'x.csv'
+    path.write_bytes(data)
+
+    assert EncodingDetector().detect(data) == EncodingDetector().detect(str(path))
+    assert EncodingDetector().detect_full(data) == EncodingDetector().detect_full(str(path))
+
+
+def test_reader_same_result_for_path_and_memory(dataset):
+    path = dataset['streamed_csv']
+    data = open(path, 'rb').read()
+
+    def read(source):
+        data_list, errors = RicoStreamedCSVReader(source).read_and_validate()
+        return [dict(entry) for entry in data_list], errors
+
+    expected = read(path)
+    assert expected[0]
+    for source in (data, bytearray(data), memoryview(data), io.BytesIO(data)):
+        assert read(source) == expected
+
+
+def test_convert_to_buffer_equals_file_output(tmp_path, dataset):
+    data = open(dataset['streamed_csv'], 'rb').read()
+
+    def convert(source, to_buffer):
+        return convert_file(
+            source, 'streamed.csv', 'streamed', 'freee', str(tmp_path),
+            DeptNormalizer(dataset['dept_mapping']),
+            PartnerResolver(dataset['partner_list'], dataset['freee_csv']),
+            to_buffer=to_buffer
+        )
+
+    output_path, errors = convert(dataset['streamed_csv'], False)
+    buffer, buffer_errors = convert(data, True)
+
+    assert buffer_errors == errors
+    assert buffer.name.endswith('.xlsx')
+    assert _sheet(buffer) == _sheet(output_path)
+    # メモリ上への出力はディスクに書き込まない
+    assert list(tmp_path.glob('*.xlsx')) == [Path(output_path)]
+
+
+def test_test_exporter_buffer_equals_file_output(tmp_path):
+    data_list = [
+        {'シート名': 'A', '日付': '2024/04/01', '金額': 100},
+        {'シート名': 'B', '日付': '2024/04/02', '金額': 200, '_errors': ['金額が不正です']},
+    ]
+    exporter = freee_exporter.TestExcelExporter(output_dir=tmp_path)
+
+    output_path = exporter.export(data_list, 'x.xlsx')
+    buffer = exporter.export_to_buffer(data_list, 'x.xlsx')
+
+    cells = _sheet(buffer)['test_data']
+    assert cells == _sheet(output_path)['test_data']
+    # エラー行だけ塗りつぶす
+    assert {rgb for _, rgb in cells[2]} == {'00FFCCCC'}
+    assert {rgb for _, rgb in cells[1]} == {'00000000'}
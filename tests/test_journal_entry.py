@@ -0,0 +1,120 @@
+"""
+tests/test_journal_entry.py - 仕訳1行分のデータ（JournalEntry）の確認
+"""
+
+import copy
+import pickle
+
+import pandas as pd
+import pytest
+
+from processor.dept_normalizer import DeptNormalizer
+from processor.journal_entry import JournalEntry, as_entries
+
+
+ROW = {'日付': '2024/04/01', '借方部門': '営業', '金額': 1000, '備考': '追加列'}
+
+
+def test_dict_operations_match_dict():
+    entry = JournalEntry(ROW)
+
+    assert entry['日付'] == '2024/04/01'
+    assert entry['備考'] == '追加列'
+    assert entry.借方部門 == '営業'
+    assert entry.get('候補') is None and entry.get('候補', '') == ''
+    assert entry.get('不明な列', 'x') == 'x'
+    assert '金額' in entry and '備考' in entry
+    assert '候補' not in entry and '不明な列' not in entry
+    assert dict(entry.items()) == ROW
+    assert len(entry) == len(ROW)
+    assert entry == ROW
+
+    with pytest.raises(KeyError):
+        entry['候補']
+    with pytest.raises(KeyError):
+        entry['不明な列']
+
+
+def test_unset_field_behaves_as_missing_key():
+    entry = JournalEntry({'日付': '2024/04/01'})
+
+    # 追加列がない行は辞書を持たない
+    assert entry._extra is None
+
+    entry['候補'] = 'A'
+    entry['備考'] = 'B'
+    del entry['候補']
+    del entry['備考']
+
+    assert entry.to_dict() == {'日付': '2024/04/01'}
+    with pytest.raises(KeyError):
+        del entry['候補']
+    with pytest.raises(KeyError):
+        del entry['備考']
+
+
+def test_copy_and_pickle_keep_all_columns():
+    entry = JournalEntry(ROW)
+    entry._errors = ['エラー']
+
+    copied = entry.copy()
+    copied['日付'] = '2024/04/02'
+    copied['備考'] = '変更'
+
+    assert entry['日付'] == '2024/04/01' and entry['備考'] == '追加列'
+    # 浅いコピー（dict.copy() と同じ）
+    assert copied['_errors'] is entry['_errors']
+
+    restored = pickle.loads(pickle.dumps(entry))
+    assert type(restored) is JournalEntry
+    assert restored.to_dict() == entry.to_dict()
+    assert copy.deepcopy(entry).to_dict() == entry.to_dict()
+
+
+def test_from_columns_equals_row_construction():
+    table = {
+        '日付': ['2024/04/01', '2024/04/02'],
+        '金額': [1000, 2000],
+        '備考': ['a', 'b'],
+    }
+
+    entries = JournalEntry.from_columns(table)
+    rows = [dict(zip(table, values)) for values in zip(*table.values())]
+
+    assert [entry.to_dict() for entry in entries] == rows
+    assert [entry.to_dict() for entry in JournalEntry.from_columns({'日付': ['2024/04/01']})] == [
+        {'日付': '2024/04/01'}
+    ]
+    assert JournalEntry.from_columns({}) == []
+
+
+def test_as_entries_converts_only_dict_rows():
+    entries = [JournalEntry(ROW)]
+    assert as_entries(entries) is entries
+
+    mixed = as_entries([ROW, entries[0]])
+    assert all(type(data) is JournalEntry for data in mixed)
+    assert mixed[1] is entries[0]
+    assert mixed[0].to_dict() == ROW
+
+
+def test_dept_normalizer_same_result_for_dict_and_entry(tmp_path):
+    mapping_path = tmp_path / 'dept_mapping.xlsx'
+    pd.DataFrame({'元の名称': ['営業'], '正式名称': ['営業部']}).to_excel(mapping_path, index=False)
+    normalizer = DeptNormalizer(mapping_path)
+
+    rows = [
+        {'借方部門': '営業', '貸方部門': ''},
+        {'借方部門': '未知', '貸方部門': '営業', '_errors': '既存のエラー', '備考': 'x'},
+    ]
+
+    from_dicts = normalizer.normalize([dict(row) for row in rows])
+    from_entries = normalizer.normalize([JournalEntry(row) for row in rows])
+
+    assert [data.to_dict() for data in from_dicts] == [data.to_dict() for data in from_entries]
+    # 空欄には最初に見つかった部門（正式名称）を使う
+    assert from_dicts[0].to_dict() == {'借方部門': '営業部', '貸方部門': '営業部'}
+    # 文字列の _errors はリストに変換して追記する
+    assert from_dicts[1]['_errors'] == ['既存のエラー', '借方部門が未登録: 未知']
+    assert from_dicts[1]['借方部門'] == '未登録_未知'
+    assert from_dicts[1]['備考'] == 'x'
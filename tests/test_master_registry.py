@@ -0,0 +1,71 @@
+"""
+tests/test_master_registry.py - 共有マスタのレジストリ（同時読み込み）の確認
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from processor.master_registry import MasterRegistry
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = {}
+    for name in ('a', 'b'):
+        paths[name] = tmp_path / f'{name}.csv'
+        paths[name].write_text(name, encoding='utf-8')
+    return paths
+
+
+def test_slow_load_does_not_block_other_keys(sources):
+    registry = MasterRegistry()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_factory():
+        started.set()
+        assert release.wait(10)
+        return 'a'
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(registry._get, 'master', [sources['a']], slow_factory)
+        assert started.wait(10)
+
+        # 別のキーは、読み込み中のキーの完了を待たずに取得できる
+        assert registry._get('master', [sources['b']], lambda: 'b') == 'b'
+
+        release.set()
+        assert future.result(10) == 'a'
+
+
+def test_same_key_is_loaded_once(sources):
+    registry = MasterRegistry()
+    calls = []
+    release = threading.Event()
+
+    def factory():
+        calls.append(1)
+        assert release.wait(10)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(registry._get, 'master', [sources['a']], factory) for _ in range(4)]
+        release.set()
+        instances = [future.result(10) for future in futures]
+
+    assert len(calls) == 1
+    assert all(instance is instances[0] for instance in instances)
+
+
+def test_failed_load_is_retried(sources):
+    registry = MasterRegistry()
+
+    def broken():
+        raise ValueError('読み込み失敗')
+
+    with pytest.raises(ValueError):
+        registry._get('master', [sources['a']], broken)
+
+    assert registry._get('master', [sources['a']], lambda: 'a') == 'a'
@@ -0,0 +1,24 @@
+"""
+tests/test_output_bundle.py - 一括ダウンロード用ZIPの作成・読み出しの確認
+"""
+
+import io
+import zipfile
+
+from exporter.output_bundle import OutputBundle
+
+
+def test_bundle_is_the_only_copy_after_add(tmp_path):
+    bundle = OutputBundle(tmp_path / 'output.zip')
+    first = bundle.add('freee_a.xlsx', io.BytesIO(b'first'))
+    second = bundle.add('freee_a.xlsx', b'second')
+
+    assert (first, second) == ('freee_a.xlsx', 'freee_a_01.xlsx')
+
+    # 呼び出し側の出力を破棄した後でも、ZIPから読み出せる
+    assert bundle.read(first) == b'first'
+    assert bundle.read(second) == b'second'
+
+    with zipfile.ZipFile(io.BytesIO(bundle.read_all())) as zip_file:
+        assert zip_file.namelist() == [first, second]
+        assert all(info.compress_type == zipfile.ZIP_STORED for info in zip_file.infolist())
@@ -0,0 +1,172 @@
+"""
+tests/test_partner_resolver.py - PartnerResolver の照合結果の確認
+"""
+
+import random
+from difflib import SequenceMatcher
+
+import pytest
+
+from processor.name_normalizer import normalize_partner_name
+from processor.partner_resolver import PartnerResolver
+from conftest import write_freee_csv
+
+
+FREEE_PARTNERS = ['山田商店', '鈴木工業株式会社', '株式会社田中建設', 'ABCトレーディング']
+
+CHARS = '山田鈴木商店工業ABCアイ'
+
+
+def _random_names(rng, count):
+    return [''.join(rng.choice(CHARS) for _ in range(rng.randint(2, 6))) for _ in range(count)]
+
+
+def _baseline_fuzzy_match(freee_partners, partner_name, threshold=0.6, max_candidates=1):
+    """インデックス導入前の類似度マッチング（全件を SequenceMatcher で採点し、スコア降順に安定ソート）"""
+    candidates = []
+    for freee_partner in freee_partners:
+        score = SequenceMatcher(None, partner_name, freee_partner).ratio()
+        if score >= threshold:
+            candidates.append({'name': freee_partner, 'score': score})
+    candidates.sort(key=lambda x: x['score'], reverse=True)
+    return candidates[:max_candidates]
+
+
+def _baseline_fuzzy(freee_partners, partner_name):
+    """インデックス導入前の類似度マッチングでの解決結果"""
+    candidates = _baseline_fuzzy_match(freee_partners, partner_name)
+    return ('fuzzy', candidates[0]['name']) if candidates else ('none', '')
+
+
+def _resolver(tmp_path, partner_list_path, freee_partners, **kwargs):
+    path = tmp_path / 'freee_partners.csv'
+    write_freee_csv(path, [(partner_name, '使用') for partner_name in freee_partners])
+    return PartnerResolver(str(partner_list_path), str(path), **kwargs)
+
+
+@pytest.fixture
+def freee_csv_path(tmp_path):
+    path = tmp_path / 'freee_partners.csv'
+    write_freee_csv(path, [(partner_name, '使用') for partner_name in FREEE_PARTNERS])
+    return path
+
+
+def test_resolution_cache_is_bounded(partner_list_path, freee_csv_path):
+    resolver = PartnerResolver(str(partner_list_path), str(freee_csv_path), resolution_cache_max_entries=3)
+
+    first = resolver.resolve_names(['山田商店', '鈴木工業株式会社', '山田商会'])
+    resolver.resolve_names(['山田商店'])  # 最近使ったものとして残す
+    resolver.resolve_names(['ABCトレーディング', 'XYZ'])
+
+    assert list(resolver._resolution_cache) == ['山田商店', 'ABCトレーディング', 'XYZ']
+
+    # 破棄された名称も、もう一度照合して同じ結果を返す
+    stats = {}
+    again = resolver.resolve_names(['山田商店', '鈴木工業株式会社', '山田商会'], stats)
+    assert again == first
+    assert stats['cache_hits'] == 1
+    assert stats['cache_misses'] == 2
+    assert len(resolver._resolution_cache) == 3
+
+
+@pytest.mark.parametrize('batch_fuzzy_min_names', [None, 1])
+def test_fuzzy_results_equal_baseline(tmp_path, partner_list_path, batch_fuzzy_min_names):
+    rng = random.Random(11)
+    freee_partners = list(dict.fromkeys(_random_names(rng, 400)))
+    queries = [name for name in dict.fromkeys(_random_names(rng, 300)) if name not in freee_partners]
+
+    resolver = _resolver(tmp_path, partner_list_path, freee_partners, batch_fuzzy_min_names=batch_fuzzy_min_names)
+
+    # 上位の候補（スコア・同点の順序を含む）が全件走査と同じ
+    for query in queries:
+        assert resolver._fuzzy_match(query, max_candidates=5) == _baseline_fuzzy_match(
+            freee_partners, query, max_candidates=5
+        )
+
+    # まとめて照合しても同じ
+    assert resolver._resolve_fuzzy(queries) == {query: _baseline_fuzzy(freee_partners, query) for query in queries}
+
+
+@pytest.mark.parametrize('batch_fuzzy_min_names', [None, 1])
+def test_fuzzy_ties_keep_csv_order(tmp_path, partner_list_path, batch_fuzzy_min_names):
+    # 'A' に対してすべて同点（2/3）
+    freee_partners = ['AC', 'AB', 'XA', 'AD']
+
+    resolver = _resolver(tmp_path, partner_list_path, freee_partners, batch_fuzzy_min_names=batch_fuzzy_min_names)
+
+    assert resolver._fuzzy_match('A', max_candidates=4) == _baseline_fuzzy_match(freee_partners, 'A', max_candidates=4)
+    assert [candidate['name'] for candidate in resolver._fuzzy_match('A', max_candidates=4)] == freee_partners
+    assert resolver.resolve_names(['A'])['A'] == ('fuzzy', 'AC')
+
+
+def _expected_resolution(partner_map, freee_partners, partner_name):
+    """照合キー導入前の解決結果に、照合キーが一意に一致する場合だけ 'normalized' を加えたもの"""
+    if partner_name in partner_map:
+        return 'partner_list', ''
+    if partner_name in freee_partners:
+        return 'freee_exact', ''
+
+    key = normalize_partner_name(partner_name)
+    # 同じ照合キーの値が複数ある場合は決められないため一致としない
+    for names in (partner_map, freee_partners):
+        values = {partner_map.get(name, name) for name in names if normalize_partner_name(name) == key}
+        if len(values) == 1:
+            return 'normalized', values.pop()
+
+    return _baseline_fuzzy(freee_partners, partner_name)
+
+
+def test_normalized_keys_only_change_unambiguous_matches(tmp_path, partner_list_path):
+    rng = random.Random(5)
+    freee_partners = list(dict.fromkeys(
+        ['株式会社山田商店', '鈴木工業', 'ABCトレーディング', 'タナカ(株)', 'タナカ(有)', 'サトウ商事']
+        + _random_names(rng, 300)
+    ))
+    queries = list(dict.fromkeys(
+        ['山田商店', '(株)山田商店', 'すずき工業', '鈴木 工業', 'ａｂｃトレーディング', 'タナカ', 'タナカ(名)',
+         'サトウ・商事', '(株)固定取引先', '固定取引先', 'サトウ商会']
+        + _random_names(rng, 200)
+    ))
+
+    resolver = _resolver(tmp_path, partner_list_path, freee_partners)
+    results = resolver.resolve_names(queries)
+
+    partner_map = {'固定取引先': '固定取引先株式会社'}
+    assert results == {query: _expected_resolution(partner_map, freee_partners, query) for query in queries}
+    assert results['(株)山田商店'] == ('normalized', '株式会社山田商店')
+    assert results['(株)固定取引先'] == ('normalized', '固定取引先株式会社')
+    # 照合キーを持たない名称は、照合キー導入前と同じ結果
+    assert results['サトウ商会'] == _baseline_fuzzy(freee_partners, 'サトウ商会')
+
+
+@pytest.mark.parametrize('freee_partners, expected', [
+    (['タナカ(株)', 'タナカ(有)'], 'タナカ(株)'),
+    (['タナカ(有)', 'タナカ(株)'], 'タナカ(有)'),
+])
+def test_ambiguous_normalized_key_falls_back_to_fuzzy_in_csv_order(tmp_path, partner_list_path,
+                                                                   freee_partners, expected):
+    resolver = _resolver(tmp_path, partner_list_path, freee_partners)
+
+    # 'タナカ(名)' の照合キー 'タナカ' は2件に一致するため、類似度マッチング（同点はCSVの順）で解決する
+    assert resolver.resolve_names(['タナカ(名)'])['タナカ(名)'] == ('fuzzy', expected)
+    assert _baseline_fuzzy(freee_partners, 'タナカ(名)') == ('fuzzy', expected)
+
+
+def test_resolve_matches_each_name_once(partner_list_path, freee_csv_path):
+    resolver = PartnerResolver(str(partner_list_path), str(freee_csv_path))
+    data_list = [
+        {'借方取引先': '山田商会', '貸方取引先': ''},
+        {'借方取引先': '山田商会', '貸方取引先': '固定取引先'},
+        {'借方取引先': '', '貸方取引先': '鈴木工業株式会社'},
+    ]
+
+    stats = {}
+    entries = resolver.resolve(data_list, stats)
+
+    # 空欄はもう一方からコピーし、一意の名称（3件）だけを照合する
+    assert [(entry.借方取引先, entry.貸方取引先) for entry in entries] == [
+        ('山田商会', '山田商会'), ('山田商会', '固定取引先'), ('鈴木工業株式会社', '鈴木工業株式会社'),
+    ]
+    assert (stats['names'], stats['unique_names'], stats['fuzzy_searches']) == (6, 3, 1)
+    assert [entry.借方取引先_match_type for entry in entries] == ['fuzzy', 'fuzzy', 'freee_exact']
+    assert [entry.候補 for entry in entries] == ['山田商店', '山田商店', '']
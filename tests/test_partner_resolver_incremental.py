@@ -0,0 +1,86 @@
+"""
+tests/test_partner_resolver_incremental.py - freee取引先CSVの差分更新と最初からのコンパイルの照合結果の比較
+"""
+
+import random
+
+import pytest
+
+from processor.master_cache import MasterCache
+from processor.partner_resolver import PartnerResolver
+from conftest import write_freee_csv
+
+
+# 同点が多く出るよう、少ない文字から短い名前を作る
+CHARS = '山田鈴木商店工業ABCアイ'
+
+
+def _random_names(rng, count):
+    names = [''.join(rng.choice(CHARS) for _ in range(rng.randint(2, 6))) for _ in range(count)]
+    return list(dict.fromkeys(names))
+
+
+def _changed_rows(rng, rows):
+    """前回のCSVから、一部の行の削除・「使用しない」への変更・追加・並び替えをしたCSVの行を作る"""
+    rows = list(rows)
+    for idx in rng.sample(range(len(rows)), 15):
+        rows[idx] = (rows[idx][0], '使用しない')
+    del rows[40:55]
+    existing = {partner_name for partner_name, _status in rows}
+    added = [name for name in _random_names(rng, 40) if name not in existing]
+    for partner_name in added:
+        rows.insert(rng.randrange(len(rows) + 1), (partner_name, '使用'))
+    return rows
+
+
+@pytest.fixture
+def freee_csvs(tmp_path):
+    rng = random.Random(7)
+    previous_rows = [(partner_name, '使用') for partner_name in _random_names(rng, 400)]
+    current_rows = _changed_rows(rng, previous_rows)
+
+    previous_path = tmp_path / 'freee_previous.csv'
+    current_path = tmp_path / 'freee_current.csv'
+    write_freee_csv(previous_path, previous_rows)
+    write_freee_csv(current_path, current_rows)
+    queries = _random_names(rng, 600)
+    return previous_path, current_path, queries
+
+
+@pytest.mark.parametrize('batch_fuzzy_min_names', [None, 1])
+def test_incremental_update_matches_fresh_compile(tmp_path, partner_list_path, freee_csvs, batch_fuzzy_min_names):
+    previous_path, current_path, queries = freee_csvs
+
+    # 前回のCSVのスナップショットがあるキャッシュ → 差分更新
+    master_cache = MasterCache(tmp_path / 'cache_incremental')
+    PartnerResolver(str(partner_list_path), str(previous_path), master_cache=master_cache)
+    incremental = PartnerResolver(
+        str(partner_list_path), str(current_path), master_cache=master_cache,
+        batch_fuzzy_min_names=batch_fuzzy_min_names
+    )
+
+    # 空のキャッシュ → 最初からコンパイル
+    fresh = PartnerResolver(
+        str(partner_list_path), str(current_path), master_cache=MasterCache(tmp_path / 'cache_fresh'),
+        batch_fuzzy_min_names=batch_fuzzy_min_names
+    )
+
+    # 差分更新で並びが変わっていること（変わっていなければ比較の意味がない）
+    assert incremental.freee_partners != fresh.freee_partners
+    assert sorted(incremental.freee_partners) == sorted(fresh.freee_partners)
+
+    assert incremental.freee_version == fresh.freee_version
+    assert incremental.normalized_freee_map == fresh.normalized_freee_map
+    assert incremental.resolve_names(queries) == fresh.resolve_names(queries)
+
+
+def test_incremental_update_is_used(tmp_path, partner_list_path, freee_csvs, monkeypatch):
+    previous_path, current_path, _queries = freee_csvs
+    master_cache = MasterCache(tmp_path / 'cache')
+    PartnerResolver(str(partner_list_path), str(previous_path), master_cache=master_cache)
+
+    def fail_compile(cls, freee_statuses):
+        raise AssertionError('差分更新されずに最初からコンパイルされた')
+
+    monkeypatch.setattr(PartnerResolver, '_compile_freee_statuses', classmethod(fail_compile))
+    PartnerResolver(str(partner_list_path), str(current_path), master_cache=master_cache)
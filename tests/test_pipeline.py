@@ -0,0 +1,65 @@
+"""
+tests/test_pipeline.py - 変換処理（一括・chunk単位のストリーミング）の確認
+"""
+
+from openpyxl import load_workbook
+import pytest
+
+from benchmark.generators import generate_dataset
+from exporter.freee_exporter import FreeeExcelExporter
+from pipeline import convert_file, convert_streamed_streaming
+from processor.dept_normalizer import DeptNormalizer
+from processor.partner_resolver import PartnerResolver
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    return generate_dataset(tmp_path / 'data', streamed_rows=120, freee_partners=200)
+
+
+def _masters(dataset):
+    return (
+        DeptNormalizer(dataset['dept_mapping']),
+        PartnerResolver(dataset['partner_list'], dataset['freee_csv']),
+    )
+
+
+def _sheet(buffer):
+    """出力したExcelの (セルの値・塗りつぶし, 列幅)"""
+    ws = load_workbook(buffer)['freee_data']
+    cells = [[(cell.value, cell.fill.fgColor.rgb) for cell in row] for row in ws.iter_rows()]
+    widths = {letter: dimension.width for letter, dimension in ws.column_dimensions.items()}
+    return cells, widths
+
+
+def test_streaming_output_equals_in_memory_output(tmp_path, dataset):
+    source = open(dataset['streamed_csv'], 'rb').read()
+
+    expected, expected_errors = convert_file(
+        source, 'streamed.csv', 'streamed', 'freee', str(tmp_path), *_masters(dataset), to_buffer=True
+    )
+    # chunk の境目をまたいでも同じ結果になる
+    streamed, streamed_errors = convert_streamed_streaming(
+        source, 'streamed.csv', *_masters(dataset), FreeeExcelExporter(output_dir=tmp_path),
+        chunksize=7, to_buffer=True
+    )
+
+    assert streamed_errors == expected_errors
+    assert _sheet(streamed) == _sheet(expected)
+
+
+def test_stream_widths_come_from_sample_rows(tmp_path):
+    rows = [
+        {'日付': '2024-04-01', '摘要': 'A'},
+        {'日付': '2024-04-01', '摘要': 'とても長い摘要の文字列'},
+    ]
+    exporter = FreeeExcelExporter(output_dir=tmp_path)
+
+    sampled = exporter.export_stream_to_buffer([rows[:1], rows[1:]], 'x.csv', width_sample_rows=1)
+    full = exporter.export_stream_to_buffer([rows[:1], rows[1:]], 'x.csv', width_sample_rows=2)
+
+    # 摘要列（AG）の幅は先頭の width_sample_rows 行だけから決まる（ヘッダーの文字数2 + 2）
+    assert _sheet(sampled)[1]['AG'] == 4
+    assert _sheet(full)[1]['AG'] == len('とても長い摘要の文字列') * 2 + 2
+    # 書き出した行は同じ
+    assert _sheet(sampled)[0] == _sheet(full)[0]
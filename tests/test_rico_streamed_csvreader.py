@@ -0,0 +1,97 @@
+"""
+tests/test_rico_streamed_csvreader.py - STREAMED CSV の読み込み・検証の確認
+"""
+
+import csv
+import io
+
+import pytest
+
+from reader.rico_streamed_csvreader import RicoStreamedCSVReader
+
+
+def _row(**values):
+    row = {
+        '日付': '2024/04/01', '伝票番号': '1', '借方勘定科目': '旅費交通費', '借方補助科目': '山田商店',
+        '借方部門': '本社', '借方金額': '1000', '借方税区分': '課対仕入10%', '貸方勘定科目': '現金',
+        '貸方補助科目': '', '貸方部門': '本社', '貸方金額': '1000', '貸方税区分': '対象外', '摘要': 'タクシー代',
+    }
+    row.update(values)
+    return row
+
+
+def _csv_bytes(rows, columns=RicoStreamedCSVReader.REQUIRED_COLUMNS, encoding='cp932'):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([row.get(column, '') for column in columns])
+    return buffer.getvalue().encode(encoding)
+
+
+ROWS = [
+    _row(),
+    _row(日付='20240402', 借方補助科目=' 鈴木工業 ', 借方金額='12.5', 貸方金額='12.5'),
+    _row(日付='', 借方金額='abc'),
+    _row(日付='2024/13/01', 貸方金額=''),
+    _row(日付='2024/4/1'),
+]
+
+
+def test_columns_are_converted_like_row_by_row():
+    data_list, errors = RicoStreamedCSVReader(_csv_bytes(ROWS)).read_and_validate()
+
+    assert [entry['日付'] for entry in data_list] == [
+        '2024-04-01', '2024-04-02', '形式エラー', '形式エラー', '2024-04-01',
+    ]
+    assert [entry['借方金額'] for entry in data_list] == [1000, 12.5, '形式エラー', 1000, 1000]
+    assert [entry['金額'] for entry in data_list] == [entry['借方金額'] for entry in data_list]
+    assert [entry['貸方金額'] for entry in data_list] == [1000, 12.5, 1000, '形式エラー', 1000]
+
+    # 補助科目は取引先に変換し、前後の空白を除去する
+    assert [entry['借方取引先'] for entry in data_list][:2] == ['山田商店', '鈴木工業']
+    assert all('借方補助科目' not in entry and '貸方補助科目' not in entry for entry in data_list)
+    assert all(entry['_errors'] == [] and entry['候補'] == '' for entry in data_list)
+    assert data_list[0]['伝票番号'] == '1'
+
+    # エラーは行順・1行の中では日付・借方金額・貸方金額の順
+    assert errors == [
+        "4行目: 日付が空白です",
+        "4行目: 借方金額が形式エラー（値: abc）",
+        "5行目: 日付が形式エラー（値: 2024/13/01）",
+        "5行目: 貸方金額が空白です",
+    ]
+
+
+def test_same_values_are_validated_once(monkeypatch):
+    parsed = []
+    original = RicoStreamedCSVReader._parse_date
+    monkeypatch.setattr(
+        RicoStreamedCSVReader, '_parse_date', lambda self, value: parsed.append(value) or original(self, value)
+    )
+
+    data_list, errors = RicoStreamedCSVReader(_csv_bytes([_row()] * 50 + [_row(日付='20240402')])).read_and_validate()
+
+    assert len(data_list) == 51
+    assert not errors
+    assert sorted(parsed) == ['2024/04/01', '20240402']
+
+
+def test_missing_required_columns():
+    columns = [column for column in RicoStreamedCSVReader.REQUIRED_COLUMNS if column != '摘要']
+
+    with pytest.raises(Exception, match='必須列が見つかりません: 摘要'):
+        RicoStreamedCSVReader(_csv_bytes([_row()], columns)).read_and_validate()
+
+
+def test_iter_chunks_equals_read_and_validate():
+    source = _csv_bytes(ROWS * 3)
+    expected, expected_errors = RicoStreamedCSVReader(source).read_and_validate()
+
+    reader = RicoStreamedCSVReader(source)
+    chunks = list(reader.iter_chunks(chunksize=4))
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 4, 3]
+    assert [dict(entry) for chunk in chunks for entry in chunk] == [dict(entry) for entry in expected]
+    # 行番号は chunk をまたいでもファイル全体での行番号
+    assert reader.errors == expected_errors
@@ -0,0 +1,30 @@
+"""
+tests/test_run_metrics.py - 計測（tracemalloc の共有）の確認
+"""
+
+import tracemalloc
+
+from run_metrics import RunMetrics, exclusive_memory_tracing
+
+
+def test_exclusive_memory_tracing_refuses_second_user():
+    with exclusive_memory_tracing() as first:
+        assert first
+        with exclusive_memory_tracing() as second:
+            assert not second
+
+    with exclusive_memory_tracing() as again:
+        assert again
+
+
+def test_exclusive_memory_tracing_refuses_while_tracing():
+    metrics = RunMetrics(trace_memory=True)
+    metrics.start()
+    try:
+        with exclusive_memory_tracing() as acquired:
+            assert not acquired
+    finally:
+        metrics.finish()
+
+    assert not tracemalloc.is_tracing()
+    assert metrics.to_dict()['memory_scope'] == 'process'
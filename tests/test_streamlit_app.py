@@ -0,0 +1,59 @@
+"""
+tests/test_streamlit_app.py - Streamlitアプリの実行結果（ダウンロード）の確認
+"""
+
+import zipfile
+from unittest import mock
+
+import pytest
+import streamlit as st
+
+from benchmark import load_test
+
+
+@pytest.fixture
+def app_run(tmp_path):
+    """STREAMED CSV 2ファイルを freee 形式で変換した後の AppTest を返す"""
+    uploads = load_test.prepare_uploads(tmp_path / 'data', session_count=1, rows=50, files=2, freee_partners=200)
+    with mock.patch.object(st, 'file_uploader', load_test._fake_file_uploader):
+        at = load_test.AppTest.from_file(str(load_test.APP_PATH), default_timeout=120)
+        at.session_state[load_test.UPLOADS_STATE_KEY] = uploads[0]
+        at.run()
+        load_test._find(at.radio, "📥 インプット形式").set_value("streamed")
+        load_test._find(at.radio, "📤 アウトプット形式").set_value("freee")
+        at.run()
+        load_test._find(at.button, load_test.EXECUTE_BUTTON_LABEL).click().run()
+    assert not at.exception
+    return at
+
+
+def test_multiple_outputs_are_bundled_into_zip(app_run):
+    labels = [button.label for button in app_run.get('download_button')]
+    assert "📦 すべてのファイルをZIPでダウンロード" in labels
+    assert labels.count("⬇️ DL") == 2
+
+    output_names = [element.value.removeprefix("📄 ") for element in app_run.text if element.value.startswith("📄 ")]
+    assert len(output_names) == 2
+
+    # 出力ファイルはすべて作業ディレクトリのZIPに格納され、ZIPは閉じられている
+    zip_path = app_run.session_state["workspace"].path / "output_files_freee.zip"
+    with zipfile.ZipFile(zip_path) as zip_file:
+        assert zip_file.namelist() == output_names
+        assert all(zip_file.read(name)[:2] == b'PK' for name in output_names)
+
+
+def test_load_test_fingerprint_covers_downloads(tmp_path):
+    uploads = load_test.prepare_uploads(tmp_path / 'data', session_count=2, rows=50, files=2, freee_partners=200)
+    with mock.patch.object(st, 'file_uploader', load_test._fake_file_uploader), \
+            mock.patch.object(st, 'download_button', load_test._recording_download_button):
+        first, again = (load_test.run_session(uploads[0], timeout=120) for _ in range(2))
+        other = load_test.run_session(uploads[1], timeout=120)
+
+    downloads = first['fingerprint'][-1]
+    assert [download[0] for download in downloads].count("📦 すべてのファイルをZIPでダウンロード") == 1
+    # ZIP・個別の出力ファイル2つは内容のハッシュまで比較する（計測レポートはラベルのみ）
+    assert len([download for download in downloads if len(download) == 3]) == 3
+
+    # 同じ入力なら同じ結果、別のセッションのデータなら出力ファイルの内容が異なる
+    assert again['fingerprint'] == first['fingerprint']
+    assert other['fingerprint'][-1] != downloads
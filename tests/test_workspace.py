@@ -0,0 +1,68 @@
+"""
+tests/test_workspace.py - 作業ディレクトリの削除（evict）で使用中のセッションを削除しないことの確認
+"""
+
+import os
+import time
+
+from workspace import WorkspaceManager
+
+
+def _write(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'x' * size)
+
+
+def _age(path, seconds):
+    """ファイル・ディレクトリの更新日時を seconds 秒前にする"""
+    past = time.time() - seconds
+    for child in [path, *path.rglob('*')] if path.is_dir() else [path]:
+        os.utime(child, (past, past))
+
+
+def test_evict_keeps_sessions_in_use(tmp_path):
+    manager = WorkspaceManager(tmp_path / 'sessions', max_total_bytes=100, lease_seconds=0)
+
+    busy = manager.session_dir('busy')
+    idle = manager.session_dir('idle')
+    _write(busy / 'output.zip', 80)
+    _write(idle / 'output.zip', 80)
+    _age(busy, 60)
+    _age(idle, 30)
+    time.sleep(0.01)  # session_dir() で記録したリースを期限切れにする
+
+    with manager.in_use('busy'):
+        removed = manager.evict(keep=['caller'])
+
+    # 最も長く使われていない busy ではなく、使用中でない idle を削除する
+    assert removed == [idle]
+    assert (busy / 'output.zip').exists()
+
+
+def test_evict_keeps_recently_touched_sessions(tmp_path):
+    manager = WorkspaceManager(tmp_path / 'sessions', max_total_bytes=0, lease_seconds=60)
+
+    live = manager.session_dir('live')
+    _write(live / 'freee_partners.csv', 10)
+    _age(live, 3600)
+    manager.touch('live')
+
+    assert manager.evict() == []
+
+    # リースが切れたら削除対象になる
+    manager.lease_seconds = 0
+    time.sleep(0.01)
+    assert manager.evict() == [live]
+
+
+def test_evict_skips_keep_files(tmp_path):
+    shared = tmp_path / 'master_cache'
+    _write(shared / 'fuzzy_matches.sqlite3', 50)
+    _write(shared / 'fuzzy_matches.sqlite3-journal', 50)
+    _write(shared / 'freee_csv_v5_abc.pkl', 50)
+    manager = WorkspaceManager(
+        tmp_path / 'sessions', max_total_bytes=0, shared_dirs=[shared], keep_files=['fuzzy_matches.sqlite3']
+    )
+
+    assert manager.evict() == [shared / 'freee_csv_v5_abc.pkl']
+    assert (shared / 'fuzzy_matches.sqlite3').exists()
@@ -0,0 +1,243 @@
+"""
+workspace.py - セッションごとの作業ディレクトリと、一時ディレクトリ全体のディスク使用量を管理する
+"""
+
+import os
+import shutil
+import threading
+import time
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class WorkspaceManager:
+    """セッションごとの作業ディレクトリを作成し、古いものから削除してディスク使用量を制限するクラス
+
+    - 作業ディレクトリは root/<セッションID>/ に作成し、使うたびに更新日時を更新する
+    - evict() で、max_age_seconds より長く使われていない作業ディレクトリを削除し、
+      合計が max_total_bytes を超えている場合は最も長く使われていないものから削除する（LRU）
+    - shared_dirs（マスタのスナップショットなど）内のファイルも同じ基準で削除対象にする
+      （keep_files に指定した名前のファイルは、自身で件数を制限しているため対象にしない）
+    - 使用中のセッションの作業ディレクトリは、上限を超えていても削除しない
+      - in_use() のブロック内（変換処理中）のセッション
+      - lease_seconds 以内に touch() されたセッション（Streamlit の再実行ごとに touch() する）
+
+    同じプロセス内の複数セッションから呼ばれるため、操作はロックで保護する。
+    """
+
+    def __init__(self, root, max_total_bytes=500 * 1024 * 1024, max_age_seconds=24 * 60 * 60, shared_dirs=(),
+                 lease_seconds=60 * 60, keep_files=()):
+        """
+        Args:
+            root: str | Path - 作業ディレクトリを作成するディレクトリ
+            max_total_bytes: int - 作業ディレクトリと shared_dirs の合計サイズの上限
+            max_age_seconds: float - 使われていない作業ディレクトリ・ファイルを残す秒数
+            shared_dirs: list - 中のファイルも削除対象にするディレクトリ
+            lease_seconds: float - 最後の touch() からセッションを使用中とみなす秒数
+            keep_files: list[str] - shared_dirs 内で削除しないファイル名（この名前で始まるファイル。
+                SQLite のジャーナルファイルなども含む）
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_total_bytes = max_total_bytes
+        self.max_age_seconds = max_age_seconds
+        self.shared_dirs = [Path(path) for path in shared_dirs]
+        self.lease_seconds = lease_seconds
+        self.keep_files = tuple(keep_files)
+        self._leases = {}          # セッションID → 最後に touch() した時刻
+        self._in_use = Counter()   # セッションID → 実行中の in_use() ブロックの数
+        self._lock = threading.Lock()
+
+    def session_dir(self, session_id: str) -> Path:
+        """セッションの作業ディレクトリを返す（なければ作成し、最終使用日時を更新）
+
+        Args:
+            session_id: str - セッションID
+
+        Returns:
+            Path - 作業ディレクトリ
+        """
+        path = self.root / session_id
+        with self._lock:
+            path.mkdir(parents=True, exist_ok=True)
+            os.utime(path)
+            self._leases[session_id] = time.time()
+        return path
+
+    def touch(self, session_id: str):
+        """セッションを使用中として記録する（lease_seconds の間は evict() で削除しない）
+
+        Args:
+            session_id: str - セッションID
+        """
+        with self._lock:
+            self._leases[session_id] = time.time()
+
+    @contextmanager
+    def in_use(self, session_id: str):
+        """ブロック内ではセッションの作業ディレクトリを evict() で削除しない（変換処理中など）
+
+        Args:
+            session_id: str - セッションID
+        """
+        with self._lock:
+            self._in_use[session_id] += 1
+            self._leases[session_id] = time.time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_use[session_id] -= 1
+                if self._in_use[session_id] <= 0:
+                    del self._in_use[session_id]
+                self._leases[session_id] = time.time()
+
+    def remove_session(self, session_id: str):
+        """セッションの作業ディレクトリを削除する
+
+        Args:
+            session_id: str - セッションID
+        """
+        with self._lock:
+            self._leases.pop(session_id, None)
+            shutil.rmtree(self.root / session_id, ignore_errors=True)
+
+    def total_bytes(self) -> int:
+        """作業ディレクトリと shared_dirs の合計サイズ（バイト）を返す"""
+        return sum(size for _path, _last_used, size in self._entries())
+
+    def evict(self, keep=()) -> list[Path]:
+        """古い作業ディレクトリ・ファイルを削除する
+
+        使用中のセッション（in_use() のブロック内・lease_seconds 以内に touch() されたもの）は削除しない。
+
+        Args:
+            keep: list[str] - 削除しないセッションID（呼び出し元のセッションなど）
+
+        Returns:
+            list[Path] - 削除したパス
+        """
+        removed = []
+
+        with self._lock:
+            now = time.time()
+            keep_paths = {self.root / session_id for session_id in [*keep, *self._active_sessions(now)]}
+            entries = sorted(self._entries(), key=lambda entry: entry[1])
+            total = sum(size for _path, _last_used, size in entries)
+
+            # 最も長く使われていないものから順に判定
+            for path, last_used, size in entries:
+                if path in keep_paths:
+                    continue
+                if now - last_used <= self.max_age_seconds and total <= self.max_total_bytes:
+                    continue
+
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        pass
+                total -= size
+                removed.append(path)
+
+        return removed
+
+    def _active_sessions(self, now: float) -> list[str]:
+        """使用中のセッションIDを返す（期限切れのリースは破棄する。ロック内で呼ぶ）"""
+        for session_id, touched_at in list(self._leases.items()):
+            if now - touched_at > self.lease_seconds and session_id not in self._in_use:
+                del self._leases[session_id]
+        return [*self._leases, *self._in_use]
+
+    def _entries(self) -> list[tuple]:
+        """削除対象の単位（作業ディレクトリ・shared_dirs 内のファイル）を返す
+
+        Returns:
+            list[tuple] - (パス, 最終使用日時, サイズ)
+        """
+        entries = []
+
+        for path in self.root.iterdir():
+            if path.is_dir():
+                try:
+                    entries.append((path, _last_used(path), _dir_size(path)))
+                except FileNotFoundError:
+                    # 別のセッションが削除した
+                    continue
+
+        for shared_dir in self.shared_dirs:
+            if not shared_dir.is_dir():
+                continue
+            for path in shared_dir.iterdir():
+                if path.name.startswith(self.keep_files):
+                    continue
+                if path.is_file():
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((path, stat.st_mtime, stat.st_size))
+
+        return entries
+
+
+class SessionWorkspace:
+    """1セッション分の作業ディレクトリ
+
+    このオブジェクトがガベージコレクションされた時点（セッション終了後、
+    Streamlit がセッションの状態を破棄した時点）で作業ディレクトリを削除する。
+    """
+
+    def __init__(self, manager: WorkspaceManager, session_id: str):
+        """
+        Args:
+            manager: WorkspaceManager
+            session_id: str - セッションID
+        """
+        self.manager = manager
+        self.session_id = session_id
+        self._finalizer = weakref.finalize(self, manager.remove_session, session_id)
+
+    @property
+    def path(self) -> Path:
+        """作業ディレクトリ（使うたびに最終使用日時を更新）"""
+        return self.manager.session_dir(self.session_id)
+
+    def touch(self):
+        """セッションを使用中として記録する（WorkspaceManager.touch を参照）"""
+        self.manager.touch(self.session_id)
+
+    def in_use(self):
+        """ブロック内では作業ディレクトリを削除しない（WorkspaceManager.in_use を参照）"""
+        return self.manager.in_use(self.session_id)
+
+    def cleanup(self):
+        """作業ディレクトリを削除する"""
+        self._finalizer()
+
+
+def _last_used(path: Path) -> float:
+    """ディレクトリとその中のファイルの最終更新日時を返す"""
+    latest = path.stat().st_mtime
+    for child in path.rglob('*'):
+        try:
+            latest = max(latest, child.stat().st_mtime)
+        except FileNotFoundError:
+            continue
+    return latest
+
+
+def _dir_size(path: Path) -> int:
+    """ディレクトリ内のファイルの合計サイズ（バイト）を返す"""
+    total = 0
+    for child in path.rglob('*'):
+        try:
+            if child.is_file():
+                total += child.stat().st_size
+        except FileNotFoundError:
+            continue
+    return total